@@ -1,5 +1,7 @@
 # Monitoring Hub Configuration
 
+import os
+
 # Supported Target Distributions
 SUPPORTED_DISTROS = ["el8", "el9", "el10"]
 SUPPORTED_DEB_DISTROS = ["ubuntu-22.04", "ubuntu-24.04", "debian-12", "debian-13"]
@@ -20,6 +22,13 @@ DEB_BUILD_IMAGES = {
     "debian-13": "debian:trixie",
 }
 
+# RPM Build Images
+RPM_BUILD_IMAGES = {
+    "el8": "almalinux:8",
+    "el9": "almalinux:9",
+    "el10": "quay.io/centos/centos:stream10",
+}
+
 # Supported Architectures
 SUPPORTED_ARCHITECTURES = ["amd64", "arm64"]
 
@@ -32,12 +41,107 @@ DEFAULT_BASE_IMAGE = "registry.access.redhat.com/ubi9/ubi-minimal"
 # Site & Catalog
 DEFAULT_CATALOG_URL = "https://sckyzo.github.io/monitoring-hub/catalog/index.json"
 REPO_ROOT_URL = "https://sckyzo.github.io/monitoring-hub"
+# Base URL of upstream release assets and checksum files (a mirror, or the
+# local release server of core.engine.benchmark)
+GITHUB_RELEASES_URL = os.environ.get(
+    "MONITORING_HUB_GITHUB_RELEASES_URL", "https://github.com"
+).rstrip("/")
 
 # Paths (relative to project root)
 TEMPLATES_DIR = "core/templates"
 EXPORTERS_DIR = "exporters"
 BUILD_DIR = "build"
 
+# Local Caches
+# Root of every on-disk cache (upstream downloads, ...). CI can point this at a
+# directory restored by actions/cache to share it across jobs.
+CACHE_DIR = os.environ.get(
+    "MONITORING_HUB_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "monitoring-hub"),
+)
+# Size cap for cached upstream archives (least recently used entries are evicted)
+DOWNLOAD_CACHE_MAX_BYTES = 4 * 1024**3
+# Size cap for binaries extracted from upstream archives (core.engine.binary_store)
+BINARY_STORE_MAX_BYTES = 2 * 1024**3
+# Upstream licenses detected through the GitHub API are reused this long
+LICENSE_CACHE_TTL = 30 * 24 * 3600
+# A release found without checksum file is not asked again for this long
+CHECKSUMS_MISSING_TTL = 24 * 3600
+# Precompiled Jinja2 templates (python -m core.engine.templating)
+PRECOMPILED_TEMPLATES_DIR = os.environ.get(
+    "MONITORING_HUB_PRECOMPILED_TEMPLATES",
+    os.path.join(CACHE_DIR, "templates", "compiled"),
+)
+
+# Build Staging
+# Ways to stage local binaries and extra files, tried in order (copy is always
+# the last resort), see core.engine.staging
+STAGING_METHODS = tuple(
+    os.environ.get("MONITORING_HUB_STAGING", "reflink,hardlink,copy").split(",")
+)
+
+# HTTP Client
+# Retries for connection errors and 429/5xx responses (Retry-After is honoured)
+HTTP_RETRIES = 3
+# Longest Retry-After wait honoured, in seconds (a rate limit reset can be an
+# hour away; the rate limit budget handles those, not a sleeping worker)
+HTTP_MAX_RETRY_AFTER = 60
+# Concurrent connections allowed per host (extra requests wait for a free slot)
+HTTP_MAX_CONNECTIONS_PER_HOST = 8
+# Large downloads can be split into this many parallel ranged requests
+# (1 disables splitting; only files of at least DOWNLOAD_SEGMENT_MIN_BYTES are split)
+DOWNLOAD_SEGMENTS = int(os.environ.get("MONITORING_HUB_DOWNLOAD_SEGMENTS", "1"))
+DOWNLOAD_SEGMENT_MIN_BYTES = 64 * 1024**2
+
+# Upstream Watcher
+# Release lookups in flight at once (beyond HTTP_MAX_CONNECTIONS_PER_HOST they
+# wait for a pooled connection anyway)
+WATCHER_CONCURRENCY = int(
+    os.environ.get("MONITORING_HUB_WATCHER_CONCURRENCY", HTTP_MAX_CONNECTIONS_PER_HOST)
+)
+# Repositories per GraphQL release query (each one costs a node of the query
+# budget, GitHub caps a query at 500,000 nodes and 10 seconds)
+WATCHER_GRAPHQL_BATCH_SIZE = 50
+# Polling schedule (watcher --due-only, see core.engine.scan_state): an upstream
+# is checked again after this fraction of the median time between its observed
+# releases, within the bounds below
+WATCHER_CADENCE_FRACTION = 0.25
+WATCHER_MIN_INTERVAL = int(os.environ.get("MONITORING_HUB_WATCHER_MIN_INTERVAL", 3600))
+WATCHER_MAX_INTERVAL = int(
+    os.environ.get("MONITORING_HUB_WATCHER_MAX_INTERVAL", 3 * 24 * 3600)
+)
+# Interval until two releases of an upstream have been observed
+WATCHER_DEFAULT_INTERVAL = int(
+    os.environ.get("MONITORING_HUB_WATCHER_DEFAULT_INTERVAL", 24 * 3600)
+)
+# Observed release timestamps kept per upstream
+WATCHER_RELEASE_HISTORY = 10
+
+# GitHub API Rate Limit (core.engine.rate_limit)
+# Calls a scan leaves for the jobs that run after it (more than the number of
+# concurrent lookups, whose calls can be in flight before the budget sees them)
+GITHUB_RATE_LIMIT_RESERVE = 10
+# Seconds a scan waits for the rate limit to reset before it stops with
+# partial results
+GITHUB_RATE_LIMIT_MAX_WAIT = 60
+
+# Watch Daemon (core.engine.watch_daemon)
+WATCH_DAEMON_HOST = os.environ.get("MONITORING_HUB_WATCH_DAEMON_HOST", "127.0.0.1")
+WATCH_DAEMON_PORT = int(os.environ.get("MONITORING_HUB_WATCH_DAEMON_PORT", 8787))
+# Seconds between two polls of the exporter files for changes
+WATCH_DAEMON_RELOAD_INTERVAL = 5
+# Seconds between two revalidations of the remote catalog (a 304 when unchanged)
+WATCH_DAEMON_CATALOG_INTERVAL = 300
+# Seconds between two lookups of the upstreams due for a check (0: webhooks only)
+WATCH_DAEMON_SCAN_INTERVAL = 900
+# Secret of the release webhooks (X-Hub-Signature-256); without it, unsigned
+# deliveries are accepted
+WATCH_DAEMON_WEBHOOK_SECRET = os.environ.get("MONITORING_HUB_WEBHOOK_SECRET")
+
+# CI Build Plan
+# GitHub Actions rejects a matrix with more jobs than this
+BUILD_PLAN_MAX_JOBS = 256
+
 # Versioning
 
 CORE_VERSION = "v0.18.0"
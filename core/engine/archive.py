@@ -0,0 +1,179 @@
+"""
+Single-pass extraction of binaries from upstream release archives.
+
+Archives are read as a stream (HTTP body, cached blob or local file) and only
+the wanted members are written out. Tar archives are never indexed: reading
+stops as soon as every wanted binary has been found.
+
+A binary shipped as a link (bin/exporter -> exporter-1.2.3) is resolved to
+the member it points to. When that member comes later, it is extracted as it
+streams by; when it came earlier (always the case for hard links), a seekable
+archive is read a second time for it.
+"""
+
+import contextlib
+import gzip
+import hashlib
+import io
+import os
+import posixpath
+import tarfile
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Readable file over an iterator of byte chunks (e.g. Response.iter_content).
+
+    The iterator may have side effects (core.engine.downloader.stream saves
+    and hashes every chunk), so the bytes that flow through the extractor are
+    kept without a second read; drain() consumes what the extractor left.
+    """
+
+    def __init__(self, chunks):
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def drain(self):
+        """Consume the rest of the stream without extracting it."""
+        for _chunk in self._chunks:
+            pass
+
+
+def is_single_gz(filename):
+    """A plain .gz release asset holds exactly one compressed binary."""
+    return filename.endswith(".gz") and not filename.endswith(".tar.gz")
+
+
+def write_executable(fileobj, final_path):
+    """Write fileobj to final_path as an executable; return its digest record."""
+    sha256 = hashlib.sha256()
+    size = 0
+    # A previous build may have staged final_path as a hard link (see
+    # core.engine.staging): replace it rather than writing through it.
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(final_path)
+    with open(final_path, "wb") as f_out:
+        for block in iter(lambda: fileobj.read(1024 * 1024), b""):
+            f_out.write(block)
+            sha256.update(block)
+            size += len(block)
+    os.chmod(final_path, 0o755)  # nosec B103 - Executable binary requires execute permissions
+    return {"sha256": sha256.hexdigest(), "size": size}
+
+
+def _matches(member_name, binary_name):
+    # The binary may be nested in a subfolder (project-1.0.0.linux-amd64/binary)
+    return member_name == binary_name or member_name.endswith(f"/{binary_name}")
+
+
+def _link_target(member):
+    """Archive path of the member a symlink or hard link member points to."""
+    if member.islnk():
+        # Hard links name the member itself
+        return posixpath.normpath(member.linkname)
+    return posixpath.normpath(
+        posixpath.join(posixpath.dirname(member.name), member.linkname)
+    )
+
+
+def _write_member(tar, member, b_names, output_dir, digests):
+    """Write a regular member as every binary of b_names."""
+    first = os.path.join(output_dir, b_names[0])
+    digests[b_names[0]] = write_executable(tar.extractfile(member), first)
+    for b_name in b_names[1:]:
+        with open(first, "rb") as f:
+            digests[b_name] = write_executable(f, os.path.join(output_dir, b_name))
+
+
+def extract_binaries(stream, filename, binaries, output_dir, digests=None):
+    """
+    Extract the wanted binaries from an archive stream into output_dir.
+
+    Args:
+        stream: Readable binary file positioned at the start of the archive
+        filename: Archive file name, used to detect single-binary .gz assets
+        binaries: Binary names to extract (the first one names a .gz asset)
+        output_dir: Directory receiving the flattened binaries
+        digests: Optional dict filled with {binary: {"sha256", "size"}},
+            computed while the binaries are written
+
+    Returns:
+        List of the binary names that were found, in archive order. A
+        binary linking to a member read before it is only found when the
+        stream is seekable.
+    """
+    if digests is None:
+        digests = {}
+
+    if is_single_gz(filename):
+        with gzip.GzipFile(fileobj=stream, mode="rb") as f_in:
+            digests[binaries[0]] = write_executable(
+                f_in, os.path.join(output_dir, binaries[0])
+            )
+        return [binaries[0]]
+
+    found = []
+    claimed = set()
+    # {member name: binaries linking to it}, for members not read yet
+    waiting = {}
+    # {member name: binaries linking to it}, for members already read past
+    earlier = {}
+    links = {}
+    passed = set()
+    start = stream.tell() if stream.seekable() else None
+    # "r|*": forward-only stream, compression detected from the data
+    with tarfile.open(fileobj=stream, mode="r|*") as tar:
+        for member in tar:
+            name = posixpath.normpath(member.name)
+            is_link = member.issym() or member.islnk()
+            if not (is_link or member.isreg()):
+                continue
+            wanted = waiting.pop(name, [])
+            for b_name in binaries:
+                if b_name not in claimed and _matches(name, b_name):
+                    claimed.add(b_name)
+                    wanted.append(b_name)
+                    break
+            if is_link:
+                target = links[name] = _link_target(member)
+                for _hop in range(8):
+                    if target not in links:
+                        break
+                    target = links[target]
+                if wanted:
+                    pending = earlier if target in passed else waiting
+                    pending.setdefault(target, []).extend(wanted)
+                continue
+            passed.add(name)
+            if wanted:
+                _write_member(tar, member, wanted, output_dir, digests)
+                found.extend(wanted)
+            if len(found) == len(binaries):
+                break
+
+    if earlier and start is not None:
+        stream.seek(start)
+        with tarfile.open(fileobj=stream, mode="r|*") as tar:
+            for member in tar:
+                wanted = earlier.pop(posixpath.normpath(member.name), None)
+                if wanted and member.isreg():
+                    _write_member(tar, member, wanted, output_dir, digests)
+                    found.extend(wanted)
+                if not earlier:
+                    break
+    return found
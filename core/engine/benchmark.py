@@ -0,0 +1,486 @@
+"""
+Builder benchmarks against a local fake release server.
+
+    python -m core.engine.benchmark                   # quick profile
+    python -m core.engine.benchmark --profile full --save-baseline
+    python -m core.engine.benchmark --fail-on-regression
+
+Synthetic release assets are generated once in the work directory: .tar.gz
+archives of 1 to 10,000 members in nested directories and single-binary .gz
+files, with binaries from 64 KiB (quick profile) up to 1 GiB (full profile).
+An HTTP server on 127.0.0.1 serves them with their sha256sums.txt and stands
+in for github.com (MONITORING_HUB_GITHUB_RELEASES_URL). Each case runs in a
+fresh process, --repeat times:
+
+- download: download_and_extract of one asset, without the download cache
+- local: copy_local_binary of one binary
+- render: plan_target of every exporter manifest (spec, debian/ and
+  Dockerfile templates rendered in memory)
+
+and records the median wall time, the throughput (MiB/s, or targets/s for
+render), the peak RSS of the process and the bytes it read from and wrote to
+storage per run (/proc/self/io).
+
+The results are compared with a baseline of the same machine (by default
+<CACHE_DIR>/benchmarks/baseline.json, written by --save-baseline): a case
+whose median time or peak RSS grew by more than the thresholds is a
+regression.
+"""
+
+import concurrent.futures
+import contextlib
+import functools
+import gzip
+import http.server
+import io
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tarfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import click
+
+from core.config.settings import CACHE_DIR, EXPORTERS_DIR
+from core.engine import builder
+from core.engine.manifests import manifest_paths
+from core.engine.staging import file_digest, stage_file
+
+KiB, MiB, GiB = 1024, 1024**2, 1024**3
+
+BINARY = "bench_exporter"
+VERSION = "v1.0.0"
+
+# "size" is the size of the binary; the binary is the last of "members"
+# archive entries, so the extractor reads the whole archive
+QUICK_CASES = {
+    "tar-64k-1": {"kind": "download", "format": "tar.gz", "size": 64 * KiB},
+    "tar-16m-100": {
+        "kind": "download",
+        "format": "tar.gz",
+        "size": 16 * MiB,
+        "members": 100,
+    },
+    "tar-1m-10k": {
+        "kind": "download",
+        "format": "tar.gz",
+        "size": 1 * MiB,
+        "members": 10_000,
+    },
+    "gz-64k": {"kind": "download", "format": "gz", "size": 64 * KiB},
+    "gz-16m": {"kind": "download", "format": "gz", "size": 16 * MiB},
+    "local-64k": {"kind": "local", "size": 64 * KiB},
+    "local-16m": {"kind": "local", "size": 16 * MiB},
+    "render": {"kind": "render"},
+}
+FULL_CASES = {
+    **QUICK_CASES,
+    "tar-256m-10": {
+        "kind": "download",
+        "format": "tar.gz",
+        "size": 256 * MiB,
+        "members": 10,
+    },
+    "tar-1g-1": {"kind": "download", "format": "tar.gz", "size": 1 * GiB},
+    "gz-1g": {"kind": "download", "format": "gz", "size": 1 * GiB},
+    "local-1g": {"kind": "local", "size": 1 * GiB},
+}
+PROFILES = {"quick": QUICK_CASES, "full": FULL_CASES}
+
+DEFAULT_WORKDIR = os.path.join(CACHE_DIR, "benchmarks")
+DEFAULT_BASELINE = os.path.join(DEFAULT_WORKDIR, "baseline.json")
+
+# Relative growth of a case's median time or peak RSS reported as a regression
+DEFAULT_TIME_THRESHOLD = 0.25
+DEFAULT_RSS_THRESHOLD = 0.2
+# Ignore time regressions on cases faster than this, they are mostly noise
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def _write_binary(path, size, seed):
+    """A binary of size bytes that compresses about 2:1, like Go binaries."""
+    rng = random.Random(seed)
+    with open(path, "wb") as f:
+        left = size
+        while left:
+            block = (rng.randbytes(32 * KiB) + bytes(32 * KiB))[:left]
+            f.write(block)
+            left -= len(block)
+    os.chmod(path, 0o755)  # nosec B103 - staged as an executable binary
+
+
+def _write_tar(path, binary_path, members):
+    rng = random.Random(members)
+    with tarfile.open(path, "w:gz", compresslevel=1) as tar:
+        for i in range(members - 1):
+            info = tarfile.TarInfo(f"{BINARY}/docs/d{i % 10}/d{i // 10 % 10}/f{i}.txt")
+            info.size = 512
+            tar.addfile(info, io.BytesIO(rng.randbytes(info.size)))
+        tar.add(binary_path, arcname=f"{BINARY}/bin/{BINARY}")
+
+
+def _write_gz(path, binary_path):
+    with open(binary_path, "rb") as f_in, gzip.open(path, "wb", 1) as f_out:
+        shutil.copyfileobj(f_in, f_out, MiB)
+
+
+def asset_filename(case):
+    return f"{BINARY}-{VERSION.lstrip('v')}.linux-amd64.{case['format']}"
+
+
+def make_asset(case, assets_dir):
+    """
+    Generate the binary of a case, and its release asset for download cases,
+    unless an earlier run did. Returns the path of the file to benchmark.
+    """
+    os.makedirs(assets_dir, exist_ok=True)
+    binary_path = os.path.join(assets_dir, f"{case['size']}.bin")
+    if not os.path.exists(binary_path):
+        _write_binary(f"{binary_path}.tmp", case["size"], case["size"])
+        os.replace(f"{binary_path}.tmp", binary_path)
+    if case["kind"] == "local":
+        return binary_path
+
+    members = case.get("members", 1)
+    path = os.path.join(assets_dir, f"{case['size']}-{members}.{case['format']}")
+    if not os.path.exists(path):
+        if case["format"] == "gz":
+            _write_gz(f"{path}.tmp", binary_path)
+        else:
+            _write_tar(f"{path}.tmp", binary_path, members)
+        os.replace(f"{path}.tmp", path)
+    return path
+
+
+def publish(name, case, asset, releases_dir):
+    """Lay out an asset and its sha256sums.txt like a GitHub release."""
+    release_dir = os.path.join(
+        releases_dir, "bench", name, "releases", "download", VERSION
+    )
+    os.makedirs(release_dir, exist_ok=True)
+    filename = asset_filename(case)
+    stage_file(asset, os.path.join(release_dir, filename))
+
+    digest_path = f"{asset}.sha256"
+    if not os.path.exists(digest_path):
+        with open(digest_path, "w") as f:
+            f.write(file_digest(asset)["sha256"])
+    with open(digest_path) as f:
+        sha256 = f.read()
+    with open(os.path.join(release_dir, "sha256sums.txt"), "w") as f:
+        f.write(f"{sha256}  {filename}\n")
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class ReleaseServer:
+    """Static HTTP server on 127.0.0.1 for root, run in a background thread."""
+
+    def __init__(self, root):
+        self.root = root
+        self.url = None
+        self._httpd = None
+
+    def __enter__(self):
+        handler = functools.partial(_QuietHandler, directory=self.root)
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def _manifest_data(name, case):
+    return {
+        "name": BINARY,
+        "version": VERSION,
+        "upstream": {
+            "type": "github",
+            "repo": f"bench/{name}",
+            "archive_name": asset_filename(case),
+            "checksum_file": "sha256sums.txt",
+        },
+        "build": {"binary_name": BINARY},
+    }
+
+
+def _io_bytes():
+    """(read, written) bytes of storage I/O of this process so far."""
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["read_bytes"]), int(fields["write_bytes"])
+    except (OSError, KeyError, ValueError):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return usage.ru_inblock * 512, usage.ru_oublock * 512
+
+
+def _peak_rss():
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return maxrss if sys.platform == "darwin" else maxrss * KiB
+
+
+def run_case(name, case, workdir, repeat=3, exporters_dir=EXPORTERS_DIR):
+    """
+    Run one case repeat times in this process (meant to be a fresh one, see
+    run_benchmarks) and return its metrics.
+    """
+    run_dir = os.path.join(workdir, "runs", name)
+    if case["kind"] == "render":
+        work = manifest_paths(exporters_dir)
+        amount, unit = len(work), "targets/s"
+    else:
+        asset = make_asset(case, os.path.join(workdir, "assets"))
+        amount, unit = os.path.getsize(asset) / MiB, "MiB/s"
+
+    timings = []
+    read_start, write_start = _io_bytes()
+    with open(os.devnull, "w") as devnull:
+        for _ in range(repeat):
+            shutil.rmtree(run_dir, ignore_errors=True)
+            os.makedirs(run_dir)
+            with contextlib.ExitStack() as stack:
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+                stack.enter_context(contextlib.redirect_stderr(devnull))
+                start = time.perf_counter()
+                if case["kind"] == "download":
+                    builder.download_and_extract(
+                        _manifest_data(name, case), run_dir, "amd64"
+                    )
+                elif case["kind"] == "local":
+                    data = {
+                        "upstream": {"local_binary": os.path.basename(asset)},
+                        "build": {"binary_name": BINARY},
+                    }
+                    builder.copy_local_binary(data, run_dir, os.path.dirname(asset))
+                else:
+                    for manifest in work:
+                        builder.plan_target(manifest, "amd64")
+                timings.append(time.perf_counter() - start)
+    read_end, write_end = _io_bytes()
+    shutil.rmtree(run_dir, ignore_errors=True)
+
+    seconds = statistics.median(timings)
+    return {
+        "kind": case["kind"],
+        "seconds": round(seconds, 4),
+        "throughput": round(amount / seconds, 1) if seconds else None,
+        "unit": unit,
+        "peak_rss_mib": round(_peak_rss() / MiB, 1),
+        "read_mib": round((read_end - read_start) / repeat / MiB, 2),
+        "write_mib": round((write_end - write_start) / repeat / MiB, 2),
+    }
+
+
+@contextlib.contextmanager
+def _environ(**values):
+    saved = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def run_benchmarks(
+    cases, workdir=DEFAULT_WORKDIR, repeat=3, exporters_dir=EXPORTERS_DIR
+):
+    """
+    Generate and serve the assets of cases, then run every case in its own
+    spawned process so that its peak RSS and I/O are its own. Echoes one line
+    per case and returns {case: metrics}.
+    """
+    releases_dir = os.path.join(workdir, "releases")
+    for name, case in cases.items():
+        if case["kind"] == "download":
+            asset = make_asset(case, os.path.join(workdir, "assets"))
+            publish(name, case, asset, releases_dir)
+    os.makedirs(releases_dir, exist_ok=True)
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    with contextlib.ExitStack() as stack:
+        server = stack.enter_context(ReleaseServer(releases_dir))
+        # Read by the settings of the spawned processes
+        stack.enter_context(
+            _environ(
+                MONITORING_HUB_GITHUB_RELEASES_URL=server.url,
+                MONITORING_HUB_CACHE_DIR=os.path.join(workdir, "cache"),
+            )
+        )
+        for name, case in cases.items():
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=1, mp_context=context
+            ) as pool:
+                result = pool.submit(
+                    run_case, name, case, workdir, repeat, exporters_dir
+                ).result()
+            results[name] = result
+            click.echo(
+                f"{name:<14} {result['seconds']:>9.4f}s "
+                f"{result['throughput'] or 0:>9.1f} {result['unit']:<9} "
+                f"{result['peak_rss_mib']:>7.1f} MiB RSS "
+                f"{result['read_mib']:>8.2f} MiB read "
+                f"{result['write_mib']:>8.2f} MiB written"
+            )
+    return results
+
+
+def regressions(
+    results,
+    baseline,
+    time_threshold=DEFAULT_TIME_THRESHOLD,
+    rss_threshold=DEFAULT_RSS_THRESHOLD,
+):
+    """
+    Cases whose median time or peak RSS grew by more than the thresholds
+    (relative) since the baseline, as [(case, metric, before, after)].
+    """
+    found = []
+    for name, result in sorted(results.items()):
+        before = baseline.get("cases", {}).get(name)
+        if not before:
+            continue
+        for metric, threshold in (
+            ("seconds", time_threshold),
+            ("peak_rss_mib", rss_threshold),
+        ):
+            if metric == "seconds" and result[metric] < MIN_REGRESSION_SECONDS:
+                continue
+            if result[metric] > before[metric] * (1 + threshold):
+                found.append((name, metric, before[metric], result[metric]))
+    return found
+
+
+@click.command()
+@click.option(
+    "--profile",
+    type=click.Choice(sorted(PROFILES)),
+    default="quick",
+    show_default=True,
+    help="quick: binaries up to 16 MiB; full: up to 1 GiB",
+)
+@click.option("--case", "names", multiple=True, help="Only run this case (repeatable)")
+@click.option("--repeat", type=click.IntRange(min=1), default=3, show_default=True)
+@click.option(
+    "--workdir",
+    default=DEFAULT_WORKDIR,
+    show_default=True,
+    help="Generated assets and scratch space",
+)
+@click.option(
+    "--exporters-dir",
+    default=EXPORTERS_DIR,
+    show_default=True,
+    help="Manifests rendered by the render case",
+)
+@click.option(
+    "--output", "-o", type=click.Path(dir_okay=False), help="Write results JSON"
+)
+@click.option(
+    "--baseline",
+    type=click.Path(dir_okay=False),
+    default=DEFAULT_BASELINE,
+    show_default=True,
+    help="Results to compare with (skipped when missing)",
+)
+@click.option(
+    "--save-baseline", is_flag=True, help="Store these results as the baseline"
+)
+@click.option(
+    "--time-threshold",
+    type=float,
+    default=DEFAULT_TIME_THRESHOLD,
+    show_default=True,
+    help="Relative slowdown of a case reported as a regression",
+)
+@click.option(
+    "--rss-threshold",
+    type=float,
+    default=DEFAULT_RSS_THRESHOLD,
+    show_default=True,
+    help="Relative peak RSS growth of a case reported as a regression",
+)
+@click.option(
+    "--fail-on-regression", is_flag=True, help="Exit non-zero on any regression"
+)
+def main(
+    profile,
+    names,
+    repeat,
+    workdir,
+    exporters_dir,
+    output,
+    baseline,
+    save_baseline,
+    time_threshold,
+    rss_threshold,
+    fail_on_regression,
+):
+    """Benchmark download_and_extract, copy_local_binary and template rendering."""
+    cases = PROFILES[profile]
+    unknown = set(names) - set(cases)
+    if unknown:
+        raise click.BadParameter(
+            f"unknown case(s) {sorted(unknown)} in profile {profile}",
+            param_hint="--case",
+        )
+    if names:
+        cases = {name: case for name, case in cases.items() if name in names}
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "profile": profile,
+        "repeat": repeat,
+        "python": sys.version.split()[0],
+        "cases": run_benchmarks(cases, workdir, repeat, exporters_dir),
+    }
+
+    found = []
+    if os.path.exists(baseline):
+        with open(baseline) as f:
+            found = regressions(
+                report["cases"], json.load(f), time_threshold, rss_threshold
+            )
+        click.echo(f"\nCompared with {baseline}: {len(found)} regression(s)")
+        for name, metric, before, after in found:
+            click.echo(f"  ✗ {name} {metric}: {before} → {after}", err=True)
+        report["regressions"] = [
+            {"case": name, "metric": metric, "before": before, "after": after}
+            for name, metric, before, after in found
+        ]
+
+    for path in [output] + ([baseline] if save_baseline else []):
+        if not path:
+            continue
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if save_baseline:
+        click.echo(f"Baseline saved to {baseline}")
+
+    if found and fail_on_regression:
+        raise click.ClickException(f"{len(found)} benchmark regression(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Content-addressed store of binaries extracted from upstream archives.
+
+The RPM, DEB and Docker builds of an exporter×arch all extract the same
+binaries from the same archive. The store keeps every extracted binary once,
+named by its SHA-256, and remembers which binaries came out of which archive
+(upstream URL and archive SHA-256). Later builds of the same archive stage
+the binaries from the store (as reflinks or hard links, see
+core.engine.staging) instead of reading the archive again, so each upstream
+asset is extracted once.
+
+Layout (next to the download cache, under CACHE_DIR/downloads/binaries):
+    index.json          "<archive sha256> <url>" -> {"archive_size": ...,
+                        "binaries": {name: {"sha256", "size"} or null}}
+    blobs/ab/abcd...    binary content, named by its SHA-256
+    .lock               flock() guarding index.json and eviction across processes
+"""
+
+import contextlib
+import fcntl
+import json
+import os
+import tempfile
+
+from core.config import settings
+from core.engine.staging import stage_file
+
+# Staged binaries are executables
+BINARY_MODE = 0o755
+
+
+class BinaryStore:
+    """
+    Size-capped, LRU store of extracted binaries.
+
+    Safe to share between concurrent builder processes: blobs are published
+    with an atomic rename and the index is only rewritten under an exclusive
+    lock.
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.path.join(settings.CACHE_DIR, "downloads", "binaries")
+        self.max_bytes = (
+            settings.BINARY_STORE_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        self.blobs_dir = os.path.join(self.root, "blobs")
+        self.index_path = os.path.join(self.root, "index.json")
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with open(os.path.join(self.root, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".index-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    @staticmethod
+    def _key(url, archive_sha256):
+        return f"{archive_sha256} {url}"
+
+    def stage(self, url, archive_sha256, binaries, output_dir):
+        """
+        Stage the binaries extracted from an archive into output_dir.
+
+        Returns {"archive_size", "binaries": {name: {"sha256", "size"}},
+        "methods": {name: staging method}} for the binaries found in the
+        archive, or None when this archive was never extracted for all the
+        requested binaries (or a blob has been evicted).
+        """
+        with self._locked():
+            entry = self._read_index().get(self._key(url, archive_sha256))
+        if not entry or any(name not in entry["binaries"] for name in binaries):
+            return None
+
+        found = {
+            name: entry["binaries"][name]
+            for name in binaries
+            if entry["binaries"][name] is not None
+        }
+        if not all(
+            os.path.isfile(self._blob_path(d["sha256"])) for d in found.values()
+        ):
+            return None
+
+        methods = {}
+        for name, digest in found.items():
+            blob = self._blob_path(digest["sha256"])
+            try:
+                os.utime(blob)
+                methods[name] = stage_file(
+                    blob, os.path.join(output_dir, name), mode=BINARY_MODE
+                )
+            except FileNotFoundError:  # evicted by a concurrent build
+                return None
+        return {
+            "archive_size": entry["archive_size"],
+            "binaries": found,
+            "methods": methods,
+        }
+
+    def add(self, url, archive_sha256, archive_size, binaries, output_dir, digests):
+        """
+        Record the binaries just extracted from an archive into output_dir.
+        digests holds {name: {"sha256", "size"}} for the binaries that were
+        found; the other requested binaries are recorded as absent.
+        """
+        for name, digest in digests.items():
+            blob = self._blob_path(digest["sha256"])
+            if os.path.exists(blob):
+                continue
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(blob), prefix=".")
+            os.close(fd)
+            stage_file(os.path.join(output_dir, name), tmp_path, mode=BINARY_MODE)
+            os.replace(tmp_path, blob)
+
+        with self._locked():
+            index = self._read_index()
+            index[self._key(url, archive_sha256)] = {
+                "archive_size": archive_size,
+                "binaries": {name: digests.get(name) for name in binaries},
+            }
+            self._evict(index, keep={d["sha256"] for d in digests.values()})
+            self._write_index(index)
+
+    def _evict(self, index, keep=()):
+        """Delete least recently used blobs until the store fits max_bytes."""
+        blobs = []
+        for dirpath, _dirs, files in os.walk(self.blobs_dir):
+            for name in files:
+                if name.startswith("."):  # in-flight blob of another process
+                    continue
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                blobs.append((st.st_mtime, st.st_size, name, path))
+
+        total = sum(size for _mtime, size, _name, _path in blobs)
+        for _mtime, size, name, path in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            if name in keep:
+                continue
+            os.remove(path)
+            total -= size
+
+        for key, entry in list(index.items()):
+            digests = [d for d in entry["binaries"].values() if d is not None]
+            if not all(os.path.exists(self._blob_path(d["sha256"])) for d in digests):
+                del index[key]
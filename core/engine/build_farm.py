@@ -0,0 +1,306 @@
+"""
+Local build farm: stage every exporter × architecture in parallel.
+
+    python -m core.engine.build_farm --jobs 8
+    python -m core.engine.build_farm -e node_exporter -e redis_exporter -a amd64
+
+Each target runs core.engine.builder.build_target in a pool of worker
+processes and is staged in OUTPUT_DIR/<exporter>/<arch>. The workers share
+the upstream download cache (safe across processes), so an archive is only
+downloaded once per run, and once across runs. The builder output of each
+target goes to OUTPUT_DIR/logs/<exporter>-<arch>.log; the console shows one
+progress line per finished target, then a summary of durations per exporter
+and of the failures.
+
+With --dry-run nothing is downloaded or written: every target is only
+checked by core.engine.builder.plan_target (URL resolution, extra files,
+templates rendered in memory), which takes seconds for the whole fleet.
+"""
+
+import concurrent.futures
+import contextlib
+import json
+import os
+import time
+
+import click
+import yaml
+from marshmallow import ValidationError
+
+from core.config.settings import EXPORTERS_DIR
+from core.engine import builder
+from core.engine.download_cache import DownloadCache
+from core.engine.manifests import load_validated, manifest_paths
+
+
+def collect_targets(exporters_dir=EXPORTERS_DIR, exporters=None, archs=None):
+    """
+    List the (exporter, arch, manifest path) targets to stage, and the
+    manifests that could not be loaded as [(exporter, error)].
+
+    exporters and archs restrict the selection; architectures not listed in
+    a manifest's build.archs are never staged.
+    """
+    targets = []
+    invalid = []
+    for path in manifest_paths(exporters_dir):
+        exporter = os.path.basename(os.path.dirname(path))
+        if exporters and exporter not in exporters:
+            continue
+        try:
+            manifest = load_validated(path)
+        except ValidationError as e:
+            invalid.append((exporter, f"Invalid manifest: {e.messages}"))
+            continue
+        except yaml.YAMLError as e:
+            invalid.append((exporter, f"Invalid YAML: {e}"))
+            continue
+        for arch in manifest["build"]["archs"]:
+            if not archs or arch in archs:
+                targets.append((exporter, arch, path))
+    return targets, invalid
+
+
+def _last_error(log_path):
+    """Last "Error: ..." line written by the builder, if any."""
+    try:
+        with open(log_path) as f:
+            errors = [line.strip() for line in f if line.startswith("Error")]
+    except OSError:
+        return None
+    return errors[-1] if errors else None
+
+
+def stage_target(exporter, arch, manifest, output_dir, cache_dir, cache_max_bytes):
+    """
+    Stage one target in a worker process, with its output in a log file.
+
+    Returns {"exporter", "arch", "ok", "seconds", "error", "log"}.
+    """
+    target_dir = os.path.join(output_dir, exporter, arch)
+    log_path = os.path.join(output_dir, "logs", f"{exporter}-{arch}.log")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    cache = None
+    if cache_dir is not False:
+        cache = DownloadCache(cache_dir, cache_max_bytes)
+
+    error = None
+    start = time.monotonic()
+    with contextlib.ExitStack() as stack:
+        log = stack.enter_context(open(log_path, "w"))
+        stack.enter_context(contextlib.redirect_stdout(log))
+        stack.enter_context(contextlib.redirect_stderr(log))
+        try:
+            builder.build_target(manifest, target_dir, arch, cache=cache)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+    seconds = time.monotonic() - start
+
+    if error is not None:
+        error = _last_error(log_path) or error
+    return {
+        "exporter": exporter,
+        "arch": arch,
+        "ok": error is None,
+        "seconds": round(seconds, 3),
+        "error": error,
+        "log": log_path,
+    }
+
+
+def plan_stage(exporter, arch, manifest):
+    """Dry-run one target (builder.plan_target), as a stage_target result."""
+    start = time.monotonic()
+    plan = builder.plan_target(manifest, arch)
+    return {
+        "exporter": exporter,
+        "arch": arch,
+        "ok": not plan["errors"],
+        "seconds": round(time.monotonic() - start, 3),
+        "error": "; ".join(plan["errors"]) or None,
+        "log": None,
+    }
+
+
+def summarize(results):
+    """Per-exporter {"targets", "failed", "seconds"}, in exporter order."""
+    summary = {}
+    for result in sorted(results, key=lambda r: (r["exporter"], r["arch"])):
+        entry = summary.setdefault(
+            result["exporter"], {"targets": 0, "failed": 0, "seconds": 0.0}
+        )
+        entry["targets"] += 1
+        entry["failed"] += 0 if result["ok"] else 1
+        entry["seconds"] = round(entry["seconds"] + result["seconds"], 3)
+    return summary
+
+
+def run(
+    targets, output_dir, jobs=4, cache_dir=None, cache_max_bytes=None, dry_run=False
+):
+    """
+    Stage the targets in up to jobs worker processes, echoing one progress
+    line per finished target. Returns the results in completion order.
+
+    cache_dir=False disables the download cache. With dry_run the targets
+    are only checked (plan_stage), nothing is downloaded or written.
+    """
+    results = []
+    width = len(str(len(targets)))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        if dry_run:
+            futures = [pool.submit(plan_stage, *target) for target in targets]
+        else:
+            futures = [
+                pool.submit(
+                    stage_target,
+                    exporter,
+                    arch,
+                    manifest,
+                    output_dir,
+                    cache_dir,
+                    cache_max_bytes,
+                )
+                for exporter, arch, manifest in targets
+            ]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            results.append(result)
+            mark = "✓" if result["ok"] else "✗"
+            click.echo(
+                f"[{len(results):>{width}}/{len(targets)}] {mark} "
+                f"{result['exporter']} ({result['arch']}) {result['seconds']:.1f}s"
+            )
+    return results
+
+
+@click.command(name="build-all")
+@click.option(
+    "--exporter",
+    "-e",
+    "exporters",
+    multiple=True,
+    help="Exporter to stage (repeatable, default: all)",
+)
+@click.option(
+    "--arch",
+    "-a",
+    "archs",
+    multiple=True,
+    help="Architecture to stage (repeatable, default: each manifest's build.archs)",
+)
+@click.option("--output-dir", "-o", help="Output directory", default="./build")
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Worker processes (default: number of CPUs)",
+    default=None,
+)
+@click.option(
+    "--exporters-dir",
+    default=EXPORTERS_DIR,
+    show_default=True,
+    help="Directory containing the exporter manifests",
+)
+@click.option(
+    "--cache-dir",
+    help="Upstream download cache directory (default: <CACHE_DIR>/downloads)",
+    default=None,
+)
+@click.option(
+    "--cache-max-mb",
+    envvar="MONITORING_HUB_CACHE_MAX_MB",
+    type=int,
+    help="Size cap of the download cache in MiB",
+    default=None,
+)
+@click.option("--no-cache", is_flag=True, help="Disable the upstream download cache")
+@click.option(
+    "--summary-json",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the per-target results to this JSON file",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Only resolve URLs, check extra files and render templates in memory",
+)
+def main(
+    exporters,
+    archs,
+    output_dir,
+    jobs,
+    exporters_dir,
+    cache_dir,
+    cache_max_mb,
+    no_cache,
+    summary_json,
+    dry_run,
+):
+    """Stage every exporter × architecture in parallel worker processes."""
+    targets, invalid = collect_targets(exporters_dir, exporters, archs)
+    jobs = jobs or os.cpu_count() or 1
+    workers = min(jobs, len(targets) or 1)
+    if dry_run:
+        click.echo(f"Checking {len(targets)} target(s) with {workers} worker(s)")
+    else:
+        click.echo(
+            f"Staging {len(targets)} target(s) with {workers} worker(s), "
+            f"logs in {os.path.join(output_dir, 'logs')}"
+        )
+
+    start = time.monotonic()
+    results = run(
+        targets,
+        output_dir,
+        jobs,
+        False if no_cache else cache_dir,
+        cache_max_mb * 1024**2 if cache_max_mb is not None else None,
+        dry_run,
+    )
+    wall = time.monotonic() - start
+    failures = [r for r in results if not r["ok"]]
+
+    click.echo("\nExporter                         Targets  Failed  Build time")
+    for exporter, entry in summarize(results).items():
+        click.echo(
+            f"{exporter:<32} {entry['targets']:>7}  {entry['failed']:>6}  "
+            f"{entry['seconds']:>9.1f}s"
+        )
+    click.echo(
+        f"\n{'Checked' if dry_run else 'Staged'} "
+        f"{len(results) - len(failures)}/{len(results)} target(s) in {wall:.1f}s"
+    )
+
+    for exporter, error in invalid:
+        click.echo(f"  ✗ {exporter}: {error}", err=True)
+    for result in sorted(failures, key=lambda r: (r["exporter"], r["arch"])):
+        log = f" [{result['log']}]" if result["log"] else ""
+        click.echo(
+            f"  ✗ {result['exporter']} ({result['arch']}): {result['error']}{log}",
+            err=True,
+        )
+
+    if summary_json:
+        with open(summary_json, "w") as f:
+            json.dump(
+                {
+                    "wall_seconds": round(wall, 3),
+                    "invalid": [{"exporter": e, "error": err} for e, err in invalid],
+                    "targets": sorted(
+                        results, key=lambda r: (r["exporter"], r["arch"])
+                    ),
+                },
+                f,
+                indent=2,
+            )
+
+    if failures or invalid:
+        raise click.ClickException(
+            f"{len(failures) + len(invalid)} exporter target(s) failed"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Per-phase timings of the builder, and their roll-up across CI jobs.
+
+Every target staged by core.engine.builder writes a build-trace.json next to
+the generated files:
+
+    {"name": "node_exporter", "version": "v1.8.2", "arch": "amd64",
+     "started_at": "2026-01-01T00:00:00+00:00", "ok": true, "error": null,
+     "total_seconds": 4.2,
+     "phases": {"license": 0.01, "resolve": 0.3, "download": 3.1,
+                "extract": 0.4, "extra_sources": 0.0, "staging": 0.01,
+                "render": 0.05},
+     "counters": {"bytes_downloaded": 10485760, "cache_hits": 0,
+                  "cache_misses": 1}}
+
+The aggregator collects the traces of a whole run (e.g. the downloaded
+artifacts of every matrix job), sums them per exporter and per phase, and
+compares the result with the report of a previous run to spot regressions:
+
+    python -m core.engine.build_trace artifacts/ --output report.json \\
+        --baseline previous-report.json
+"""
+
+import contextlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import click
+
+TRACE_FILE = "build-trace.json"
+
+# Relative increase of an exporter's mean target time reported as a regression
+DEFAULT_THRESHOLD = 0.2
+# Ignore regressions on targets faster than this, they are mostly noise
+MIN_REGRESSION_SECONDS = 5.0
+
+
+class BuildTrace:
+    """Phase timings and counters of one builder target."""
+
+    def __init__(self, arch=None):
+        self.name = None
+        self.version = None
+        self.arch = arch
+        self.phases = {}
+        self.counters = {"bytes_downloaded": 0, "cache_hits": 0, "cache_misses": 0}
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._start = time.monotonic()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time a block; repeated phases (e.g. retries) add up."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.monotonic() - start
+
+    def count(self, counter, value=1):
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def to_dict(self, error=None):
+        return {
+            "name": self.name,
+            "version": self.version,
+            "arch": self.arch,
+            "started_at": self.started_at,
+            "ok": error is None,
+            "error": error,
+            "total_seconds": round(time.monotonic() - self._start, 3),
+            "phases": {name: round(s, 3) for name, s in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+    def write(self, output_dir, error=None):
+        path = os.path.join(output_dir, TRACE_FILE)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(error), f, indent=2)
+            f.write("\n")
+        return path
+
+
+def load_traces(paths):
+    """Read every build-trace.json found in paths (files or directories)."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                if TRACE_FILE in filenames:
+                    files.append(os.path.join(dirpath, TRACE_FILE))
+        else:
+            files.append(path)
+
+    traces = []
+    for file in files:
+        try:
+            with open(file) as f:
+                traces.append(json.load(f))
+        except (OSError, ValueError) as e:
+            click.echo(f"Warning: Skipping {file}: {e}", err=True)
+    return traces
+
+
+def _add_phases(totals, phases):
+    for name, seconds in phases.items():
+        totals[name] = round(totals.get(name, 0.0) + seconds, 3)
+
+
+def aggregate(traces):
+    """
+    Roll traces up into a report: run totals, seconds per phase and, per
+    exporter, the number of targets, failures, total and mean seconds.
+    """
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "targets": len(traces),
+        "failed": 0,
+        "total_seconds": 0.0,
+        "counters": {},
+        "phases": {},
+        "exporters": {},
+    }
+    for trace in sorted(
+        traces, key=lambda t: (t.get("name") or "", t.get("arch") or "")
+    ):
+        name = trace.get("name") or "unknown"
+        exporter = report["exporters"].setdefault(
+            name,
+            {
+                "version": trace.get("version"),
+                "targets": 0,
+                "failed": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+                "phases": {},
+            },
+        )
+        seconds = trace.get("total_seconds", 0.0)
+        failed = 0 if trace.get("ok", True) else 1
+
+        exporter["targets"] += 1
+        exporter["failed"] += failed
+        exporter["total_seconds"] = round(exporter["total_seconds"] + seconds, 3)
+        exporter["max_seconds"] = max(exporter["max_seconds"], seconds)
+        _add_phases(exporter["phases"], trace.get("phases", {}))
+
+        report["failed"] += failed
+        report["total_seconds"] = round(report["total_seconds"] + seconds, 3)
+        _add_phases(report["phases"], trace.get("phases", {}))
+        for counter, value in trace.get("counters", {}).items():
+            report["counters"][counter] = report["counters"].get(counter, 0) + value
+
+    for exporter in report["exporters"].values():
+        exporter["mean_seconds"] = round(
+            exporter["total_seconds"] / exporter["targets"], 3
+        )
+    return report
+
+
+def regressions(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Exporters whose mean target time grew by more than threshold (relative)
+    since the baseline report, as [(exporter, before, after)], worst first.
+    """
+    found = []
+    for name, exporter in report["exporters"].items():
+        before = baseline.get("exporters", {}).get(name, {}).get("mean_seconds")
+        after = exporter["mean_seconds"]
+        if not before or after < MIN_REGRESSION_SECONDS:
+            continue
+        if after > before * (1 + threshold):
+            found.append((name, before, after))
+    return sorted(found, key=lambda r: r[2] / r[1], reverse=True)
+
+
+def format_markdown(report, found=(), top=10):
+    """Markdown summary of a report: phases, slowest exporters, regressions."""
+    counters = report["counters"]
+    lines = [
+        "## ⏱️ Build Time Report",
+        "",
+        f"{report['targets']} target(s), {report['failed']} failed, "
+        f"{report['total_seconds']:.0f}s of builder time, "
+        f"{counters.get('bytes_downloaded', 0) / 1024**2:.1f} MiB downloaded, "
+        f"{counters.get('cache_hits', 0)} cache hit(s) / "
+        f"{counters.get('cache_misses', 0)} miss(es)",
+        "",
+        "| Phase | Seconds | Share |",
+        "|---|---:|---:|",
+    ]
+    total = report["total_seconds"] or 1.0
+    for phase, seconds in sorted(report["phases"].items(), key=lambda p: -p[1]):
+        lines.append(f"| {phase} | {seconds:.1f} | {seconds / total:.0%} |")
+
+    slowest = sorted(report["exporters"].items(), key=lambda e: -e[1]["mean_seconds"])[
+        :top
+    ]
+    lines += [
+        "",
+        f"**Slowest exporters** (top {len(slowest)})",
+        "",
+        "| Exporter | Targets | Mean (s) | Max (s) | Slowest phase |",
+        "|---|---:|---:|---:|---|",
+    ]
+    for name, exporter in slowest:
+        phase = max(exporter["phases"], key=exporter["phases"].get, default="-")
+        lines.append(
+            f"| {name} | {exporter['targets']} | {exporter['mean_seconds']:.1f} | "
+            f"{exporter['max_seconds']:.1f} | {phase} |"
+        )
+
+    if found:
+        lines += ["", "**Regressions**", ""]
+        for name, before, after in found:
+            lines.append(
+                f"- {name}: {before:.1f}s → {after:.1f}s (+{after / before - 1:.0%})"
+            )
+    return "\n".join(lines) + "\n"
+
+
+@click.command()
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--output", "-o", type=click.Path(dir_okay=False), help="Write the report JSON"
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Report of a previous run to compare with",
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=DEFAULT_THRESHOLD,
+    show_default=True,
+    help="Relative slowdown of an exporter reported as a regression",
+)
+@click.option(
+    "--markdown",
+    type=click.Path(dir_okay=False),
+    help="Append the summary to this file (e.g. $GITHUB_STEP_SUMMARY)",
+)
+@click.option("--top", type=int, default=10, show_default=True)
+@click.option(
+    "--fail-on-regression", is_flag=True, help="Exit non-zero on any regression"
+)
+def main(paths, output, baseline, threshold, markdown, top, fail_on_regression):
+    """Aggregate the build-trace.json files found in PATHS."""
+    report = aggregate(load_traces(paths))
+
+    found = []
+    if baseline:
+        with open(baseline) as f:
+            found = regressions(report, json.load(f), threshold)
+        report["regressions"] = [
+            {"exporter": name, "before": before, "after": after}
+            for name, before, after in found
+        ]
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    summary = format_markdown(report, found, top)
+    click.echo(summary)
+    if markdown:
+        with open(markdown, "a") as f:
+            f.write(summary)
+
+    if found and fail_on_regression:
+        raise click.ClickException(f"{len(found)} exporter(s) got slower")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,38 @@
-import gzip
+import concurrent.futures
+import contextlib
+import copy
+import json
 import os
-import shutil
-import tarfile
 
 import click
 import requests
 import yaml
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound, select_autoescape
+from jinja2 import TemplateNotFound
 from marshmallow import ValidationError
 from tenacity import (
     retry,
     retry_if_exception_type,
+    retry_if_not_exception_type,
     stop_after_attempt,
     wait_exponential,
 )
 
-from core.config.settings import ARCH_MAP, SUPPORTED_ARCHITECTURES, TEMPLATES_DIR
-from core.engine.schema import ManifestSchema
+from core.config.settings import (
+    ARCH_MAP,
+    GITHUB_RELEASES_URL,
+    SUPPORTED_ARCHITECTURES,
+)
+from core.engine import checksums, downloader, templating
+from core.engine.archive import extract_binaries
+from core.engine.binary_store import BinaryStore
+from core.engine.build_trace import BuildTrace
+from core.engine.download_cache import DownloadCache
+from core.engine.license_cache import LicenseCache
+from core.engine.manifests import load_validated
+from core.engine.staging import file_digest, stage_file
+
+# Digests of the staged inputs, written next to the generated files
+BUILD_MANIFEST = "build-manifest.json"
 
 
 def load_manifest(path):
@@ -24,37 +40,29 @@ def load_manifest(path):
     Loads and validates the manifest YAML file against the strict schema.
     This ensures we fail early if the user input is invalid.
     """
-    with open(path) as f:
-        data = yaml.safe_load(f)
-
-    schema = ManifestSchema()
     try:
-        return schema.load(data)
+        return load_validated(path)
     except ValidationError as err:
         click.echo(f"Validation error in {path}: {err.messages}", err=True)
         raise click.Abort() from err
 
 
-@retry(
-    stop=stop_after_attempt(6),
-    wait=wait_exponential(multiplier=2, min=4, max=60),
-    retry=retry_if_exception_type((requests.exceptions.RequestException, OSError)),
-    reraise=True,
-)
-def download_and_extract(data, output_dir, arch):
+def resolve_download_url(data, arch):
     """
-    Downloads the upstream binary release and extracts it.
+    Return (filename, url) of the upstream release asset for arch.
 
-    This function handles the complexity of GitHub release naming conventions:
+    This handles the complexity of GitHub release naming conventions:
     1. Some projects use 'v' prefixes in tags but not in filenames.
     2. Some projects use dashes, others dots.
     3. We support custom 'archive_name' patterns to handle any edge case.
-    4. Supports .tar.gz archives and simple .gz compressed binaries.
+
+    Raises:
+        ValueError: archive_name is a dict without an entry for arch
+        KeyError: archive_name uses an unknown {placeholder}
     """
     name = data["name"]
     version = data["version"]
     repo = data["upstream"]["repo"]
-    binary_name = data["build"]["binary_name"]
     archive_pattern = data["upstream"].get("archive_name")
 
     # We strip the 'v' prefix for filename construction because Go projects
@@ -69,11 +77,9 @@ def download_and_extract(data, output_dir, arch):
         if isinstance(archive_pattern, dict):
             # Dict format: lookup the pattern for this specific architecture
             if arch not in archive_pattern:
-                click.echo(
-                    f"Error: No archive_name defined for architecture '{arch}' in manifest",
-                    err=True,
+                raise ValueError(
+                    f"No archive_name defined for architecture '{arch}' in manifest"
                 )
-                raise click.Abort()
             pattern = archive_pattern[arch]
         else:
             # String format: use the pattern with variable substitution
@@ -96,73 +102,174 @@ def download_and_extract(data, output_dir, arch):
         upstream_arch = f"linux-{arch}"
         filename = f"{name}-{clean_version}.{upstream_arch}.tar.gz"
 
-    url = f"https://github.com/{repo}/releases/download/{version}/{filename}"
+    url = f"{GITHUB_RELEASES_URL}/{repo}/releases/download/{version}/{filename}"
+    return filename, url
 
-    click.echo(f"Downloading {url}...")
-    local_file = os.path.join(output_dir, filename)
+
+@retry(
+    stop=stop_after_attempt(6),
+    wait=wait_exponential(multiplier=2, min=4, max=60),
+    # A checksum mismatch (an OSError) would only be downloaded again
+    retry=retry_if_exception_type((requests.exceptions.RequestException, OSError))
+    & retry_if_not_exception_type(downloader.ChecksumMismatch),
+    reraise=True,
+)
+def download_and_extract(data, output_dir, arch, cache=None, trace=None):
+    """
+    Downloads the upstream binary release and extracts it.
+
+    The asset is found with resolve_download_url. Supports .tar.gz archives
+    and simple .gz compressed binaries.
+
+    When a DownloadCache is given, the archive is read from (or stored into)
+    the cache instead of being downloaded again. Interrupted downloads resume
+    where they stopped on the next attempt.
+
+    The archive is checked against the release's checksum file when upstream
+    publishes one. Returns the digests of the archive and of the extracted
+    binaries, for the build manifest.
+
+    The resolve, download and extract phases are timed in trace (a
+    BuildTrace), along with the bytes downloaded and the cache hits.
+    """
+    trace = trace or BuildTrace(arch)
+    version = data["version"]
+    repo = data["upstream"]["repo"]
+    binary_name = data["build"]["binary_name"]
+
+    try:
+        filename, url = resolve_download_url(data, arch)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort() from e
+
+    with trace.phase("resolve"):
+        checksum_file, upstream_checksums = checksums.get_upstream_checksums(
+            repo, version, checksums.checksum_candidates(data)
+        )
+    expected_sha256 = upstream_checksums.get(filename)
+    if expected_sha256:
+        click.echo(f"Verifying {filename} against upstream {checksum_file}")
+    else:
+        click.echo(f"Warning: No upstream checksum for {filename}, not verified.")
+
+    with trace.phase("download"):
+        archive_path = cache.lookup(url) if cache else None
+    # Cached blobs are named by their SHA-256
+    if (
+        archive_path
+        and expected_sha256
+        and os.path.basename(archive_path) != expected_sha256
+    ):
+        click.echo(f"Warning: Cached {filename} does not match {checksum_file}")
+        archive_path = None
+    if cache:
+        trace.count("cache_hits" if archive_path else "cache_misses")
 
     # We look for the main binary AND any extra binaries (like promtool)
     binaries_to_find = [binary_name] + data["build"].get("extra_binaries", [])
-    found_binaries = []
+
+    # Binaries already extracted from this archive (same URL and SHA-256) by
+    # an earlier build are staged from the binary store instead
+    store = BinaryStore(os.path.join(cache.root, "binaries")) if cache else None
+    known_sha256 = os.path.basename(archive_path) if archive_path else expected_sha256
 
     try:
-        with requests.get(url, stream=True, timeout=30) as r:
-            r.raise_for_status()
-            with open(local_file, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
-        # Case 1: Simple .gz file (single binary)
-        if filename.endswith(".gz") and not filename.endswith(".tar.gz"):
-            click.echo(f"Decompressing single binary {filename}...")
-            final_path = os.path.join(output_dir, binary_name)
-            with gzip.open(local_file, "rb") as f_in, open(final_path, "wb") as f_out:
-                shutil.copyfileobj(f_in, f_out)
-            os.chmod(final_path, 0o755)  # nosec B103 - Executable binary requires execute permissions
-            found_binaries.append(binary_name)
-            click.echo(f"Binary ready: {final_path}")
-
-        # Case 2: .tar.gz archive
+        stored = None
+        if store and known_sha256:
+            with trace.phase("extract"):
+                stored = store.stage(url, known_sha256, binaries_to_find, output_dir)
+
+        if stored:
+            archive_sha256, archive_size = known_sha256, stored["archive_size"]
+            binary_digests = stored["binaries"]
+            found_binaries = list(binary_digests)
+            trace.count("binary_store_hits")
+            for b_name, method in stored["methods"].items():
+                click.echo(f"Staged {b_name} from the binary store ({method})")
         else:
-            click.echo(f"Extracting binaries {binaries_to_find}...")
-            # We need to track extracted dirs to clean them up later
-            extracted_dirs = set()
-            with tarfile.open(local_file, "r:gz") as tar:
-                members = tar.getmembers()
-                for b_name in binaries_to_find:
-                    member_to_extract = None
-                    # Search for the binary, even if nested in a subfolder
-                    for member in members:
-                        if member.name.endswith(f"/{b_name}") or member.name == b_name:
-                            member_to_extract = member
-                            break
-
-                    if member_to_extract:
-                        # Flatten: we extract everything to the root of output_dir
-                        tar.extract(member_to_extract, path=output_dir, filter="data")
-                        extracted_path = os.path.join(
-                            output_dir, member_to_extract.name
+            binary_digests = {}
+            with contextlib.ExitStack() as stack:
+                if cache and not archive_path:
+                    # One job at a time downloads a given archive; the jobs
+                    # waiting for it then use the copy it cached. A cached
+                    # copy that fails the upstream checksum is downloaded again
+                    archive_path = stack.enter_context(
+                        cache.download_lock(url, expected_sha256)
+                    )
+                if archive_path:
+                    click.echo(f"Using cached {url}")
+                    click.echo(f"Extracting binaries {binaries_to_find}...")
+                    archive_sha256 = os.path.basename(archive_path)
+                    archive_size = os.path.getsize(archive_path)
+                    with trace.phase("extract"), open(archive_path, "rb") as stream:
+                        found_binaries = extract_binaries(
+                            stream,
+                            filename,
+                            binaries_to_find,
+                            output_dir,
+                            binary_digests,
                         )
-                        final_path = os.path.join(output_dir, b_name)
-
-                        if extracted_path != final_path:
-                            shutil.move(extracted_path, final_path)
-
-                        parts = member_to_extract.name.split("/")
-                        if len(parts) > 1:
-                            extracted_dirs.add(parts[0])
-
-                        os.chmod(final_path, 0o755)  # nosec B103 - Executable binary requires execute permissions
-                        found_binaries.append(b_name)
-                        click.echo(f"Binary ready: {final_path}")
+                else:
+                    click.echo(f"Downloading {url}...")
+                    click.echo(f"Extracting binaries {binaries_to_find}...")
+                    # The binaries are extracted in one pass as the archive
+                    # streams in (the extraction time counts as download
+                    # time). The archive is saved to a .part file on the way,
+                    # which a retry resumes with a Range request and which
+                    # becomes the cached copy; its SHA-256 is checked once the
+                    # whole archive has been read.
+                    dest = (
+                        cache.tmp_path(url)
+                        if cache
+                        else os.path.join(output_dir, filename)
+                    )
+                    with trace.phase("download"):
+                        try:
+                            with downloader.stream(
+                                url, dest, expected_sha256=expected_sha256
+                            ) as download:
+                                found_binaries = extract_binaries(
+                                    download.reader,
+                                    filename,
+                                    binaries_to_find,
+                                    output_dir,
+                                    binary_digests,
+                                )
+                        except downloader.ChecksumMismatch:
+                            for b_name in binary_digests:
+                                os.remove(os.path.join(output_dir, b_name))
+                            raise
+                    result = download.result
+                    missing = [b for b in binaries_to_find if b not in found_binaries]
+                    if missing:
+                        # A binary linking to a member that streamed by before
+                        # the link is read from the saved, seekable archive
+                        with trace.phase("extract"), open(result.path, "rb") as saved:
+                            found_binaries += extract_binaries(
+                                saved, filename, missing, output_dir, binary_digests
+                            )
+                    archive_sha256, archive_size = result.sha256, result.size
+                    trace.count("bytes_downloaded", archive_size)
+                    if cache:
+                        cache.add(url, result.path, result.sha256, result.size)
                     else:
-                        click.echo(f"Warning: Binary '{b_name}' not found.")
+                        os.remove(result.path)
+            if store and found_binaries:
+                store.add(
+                    url,
+                    archive_sha256,
+                    archive_size,
+                    binaries_to_find,
+                    output_dir,
+                    binary_digests,
+                )
 
-            # Clean up the folder structure from the tarball (we keep only binaries)
-            for d in extracted_dirs:
-                dir_to_remove = os.path.join(output_dir, d)
-                if os.path.isdir(dir_to_remove):
-                    shutil.rmtree(dir_to_remove, ignore_errors=True)
+        for b_name in binaries_to_find:
+            if b_name in found_binaries:
+                click.echo(f"Binary ready: {os.path.join(output_dir, b_name)}")
+            else:
+                click.echo(f"Warning: Binary '{b_name}' not found.")
 
         if not found_binaries:
             click.echo(
@@ -178,34 +285,72 @@ def download_and_extract(data, output_dir, arch):
     except Exception as e:
         click.echo(f"Failed to process artifact: {e}", err=True)
         raise e
-    finally:
-        if os.path.exists(local_file):
-            os.remove(local_file)
+
+    return {
+        "source": {
+            "url": url,
+            "sha256": archive_sha256,
+            "size": archive_size,
+            "verified_against": checksum_file if expected_sha256 else None,
+        },
+        "binaries": binary_digests,
+    }
 
 
 @retry(
     stop=stop_after_attempt(6),
     wait=wait_exponential(multiplier=2, min=4, max=60),
-    retry=retry_if_exception_type(requests.exceptions.RequestException),
+    retry=retry_if_exception_type((requests.exceptions.RequestException, OSError)),
     reraise=True,
 )
-def download_extra_sources(data, output_dir):
+def download_extra_source(source, output_dir):
+    """
+    Download one extra source to output_dir.
+
+    The body is written to a .part file that is renamed once complete, so a
+    failed attempt never leaves a truncated file behind, and the next retry
+    resumes it. Retries only repeat this file.
+    """
+    return downloader.download(
+        source["url"], os.path.join(output_dir, source["filename"])
+    )
+
+
+def download_extra_sources(data, output_dir, max_workers=4):
     """
     Download additional files (like config examples) that are not in the release tarball.
+
+    Files are fetched concurrently over the pooled HTTP client, each with its
+    own retries. A file that still fails is reported as a warning, like before.
+
+    Returns {filename: {"sha256", "size"}} for the files that were downloaded.
     """
     extra_sources = data.get("build", {}).get("extra_sources", [])
+    if not extra_sources:
+        return {}
+
     for source in extra_sources:
-        url = source["url"]
-        filename = source["filename"]
-        click.echo(f"Downloading extra source: {url}...")
-        try:
-            r = requests.get(url, timeout=30)
-            r.raise_for_status()
-            with open(os.path.join(output_dir, filename), "wb") as f:
-                f.write(r.content)
-            click.echo(f"Extra source saved as {filename}")
-        except Exception as e:
-            click.echo(f"Warning: Failed to download extra source {url}: {e}")
+        click.echo(f"Downloading extra source: {source['url']}...")
+
+    workers = min(max_workers, len(extra_sources))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(download_extra_source, source, output_dir)
+            for source in extra_sources
+        ]
+
+    digests = {}
+    for source, future in zip(extra_sources, futures):
+        if future.exception() is None:
+            result = future.result()
+            digests[source["filename"]] = {"sha256": result.sha256, "size": result.size}
+            click.echo(f"Extra source saved as {source['filename']}")
+        else:
+            click.echo(
+                f"Warning: Failed to download extra source {source['url']}: "
+                f"{future.exception()}"
+            )
+    return digests
 
 
 def copy_local_binary(data, output_dir, manifest_dir):
@@ -217,12 +362,15 @@ def copy_local_binary(data, output_dir, manifest_dir):
         data: Manifest data
         output_dir: Build output directory
         manifest_dir: Directory containing the manifest (for relative paths)
+
+    Returns the digests of the copied binaries, for the build manifest.
     """
     binary_name = data["build"]["binary_name"]
     local_binary = data["upstream"].get("local_binary")
     local_archive = data["upstream"].get("local_archive")
     binaries_to_find = [binary_name] + data["build"].get("extra_binaries", [])
     found_binaries = []
+    binary_digests = {}
 
     if local_binary:
         # Case 1: Direct binary file
@@ -248,10 +396,11 @@ def copy_local_binary(data, output_dir, manifest_dir):
             )
             raise click.Abort()
 
-        click.echo(f"Copying local binary: {source_path}")
         dest_path = os.path.join(output_dir, binary_name)
-        shutil.copy(source_path, dest_path)
-        os.chmod(dest_path, 0o755)  # nosec B103 - Executable binary requires execute permissions
+        # Executable binary requires execute permissions
+        method = stage_file(source_path, dest_path, mode=0o755)
+        click.echo(f"Staged local binary: {source_path} ({method})")
+        binary_digests[binary_name] = file_digest(dest_path)
         found_binaries.append(binary_name)
         click.echo(f"Binary ready: {dest_path}")
 
@@ -263,81 +412,62 @@ def copy_local_binary(data, output_dir, manifest_dir):
             click.echo(f"Error: Local archive not found: {source_path}", err=True)
             raise click.Abort()
 
-        click.echo(f"Extracting local archive: {source_path}")
-
-        if source_path.endswith(".gz") and not source_path.endswith(".tar.gz"):
-            # Simple .gz file (single binary)
-            click.echo("Decompressing single binary...")
-            final_path = os.path.join(output_dir, binary_name)
-            with gzip.open(source_path, "rb") as f_in, open(final_path, "wb") as f_out:
-                shutil.copyfileobj(f_in, f_out)
-            os.chmod(final_path, 0o755)  # nosec B103 - Executable binary requires execute permissions
-            found_binaries.append(binary_name)
-            click.echo(f"Binary ready: {final_path}")
-
-        elif source_path.endswith(".tar.gz"):
-            # .tar.gz archive - reuse existing logic from download_and_extract
-            click.echo(f"Extracting binaries {binaries_to_find}...")
-            extracted_dirs = set()
-            with tarfile.open(source_path, "r:gz") as tar:
-                members = tar.getmembers()
-                for b_name in binaries_to_find:
-                    member_to_extract = None
-                    for member in members:
-                        if member.name.endswith(f"/{b_name}") or member.name == b_name:
-                            member_to_extract = member
-                            break
-
-                    if member_to_extract:
-                        tar.extract(member_to_extract, path=output_dir, filter="data")
-                        extracted_path = os.path.join(
-                            output_dir, member_to_extract.name
-                        )
-                        final_path = os.path.join(output_dir, b_name)
-
-                        if extracted_path != final_path:
-                            shutil.move(extracted_path, final_path)
-
-                        parts = member_to_extract.name.split("/")
-                        if len(parts) > 1:
-                            extracted_dirs.add(parts[0])
-
-                        os.chmod(final_path, 0o755)  # nosec B103 - Executable binary requires execute permissions
-                        found_binaries.append(b_name)
-                        click.echo(f"Binary ready: {final_path}")
-                    else:
-                        click.echo(f"Warning: Binary '{b_name}' not found in archive.")
-
-            # Cleanup extracted directories
-            for d in extracted_dirs:
-                dir_to_remove = os.path.join(output_dir, d)
-                if os.path.isdir(dir_to_remove):
-                    shutil.rmtree(dir_to_remove, ignore_errors=True)
-        else:
+        if not source_path.endswith(".gz"):
             click.echo(f"Error: Unsupported archive format: {source_path}", err=True)
             raise click.Abort()
 
+        click.echo(f"Extracting local archive: {source_path}")
+        click.echo(f"Extracting binaries {binaries_to_find}...")
+        with open(source_path, "rb") as stream:
+            found_binaries = extract_binaries(
+                stream, source_path, binaries_to_find, output_dir, binary_digests
+            )
+
+        for b_name in binaries_to_find:
+            if b_name in found_binaries:
+                click.echo(f"Binary ready: {os.path.join(output_dir, b_name)}")
+            else:
+                click.echo(f"Warning: Binary '{b_name}' not found in archive.")
+
     if not found_binaries:
         click.echo("Error: No binaries found.", err=True)
         raise click.Abort()
 
+    return {
+        "source": {"path": local_binary or local_archive},
+        "binaries": binary_digests,
+    }
+
+
+def write_build_manifest(output_dir, data, record):
+    """
+    Write build-manifest.json: the SHA-256 and size of the upstream archive,
+    the staged binaries and the extra sources, computed while they were
+    written. Later stages read it instead of hashing the files again.
+    """
+    manifest = {
+        "name": data["name"],
+        "version": data["version"],
+        "arch": data["arch"],
+        **record,
+    }
+    path = os.path.join(output_dir, BUILD_MANIFEST)
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return path
+
 
 def get_upstream_license(repo_slug):
     """
     Fetch license information from GitHub API.
     Returns SPDX ID (e.g. 'MIT', 'Apache-2.0') or None.
+
+    Answers are kept in the persistent license cache, so the API is only
+    called when the repository is missing or its entry has expired.
     """
     try:
-        token = os.environ.get("GITHUB_TOKEN")
-        headers = {"Accept": "application/vnd.github.v3+json"}
-        if token:
-            headers["Authorization"] = f"token {token}"
-
-        url = f"https://api.github.com/repos/{repo_slug}/license"
-        r = requests.get(url, headers=headers, timeout=5)
-        if r.status_code == 200:
-            data = r.json()
-            return data.get("license", {}).get("spdx_id")
+        return LicenseCache().lookup(repo_slug)
     except Exception as e:
         click.echo(f"Warning: Could not fetch license for {repo_slug}: {e}")
     return None
@@ -379,12 +509,12 @@ def render_deb_templates(data, output_dir, arch, env, manifest_dir):
         dst_path = os.path.join(output_dir, dst_name)
 
         if os.path.exists(local_src):
-            shutil.copy(local_src, dst_path)
-            click.echo(f"  Copied extra file: {dst_name}")
+            method = stage_file(local_src, dst_path)
+            click.echo(f"  Staged extra file: {dst_name} ({method})")
         elif os.path.exists(downloaded_src):
             if downloaded_src != dst_path:
-                shutil.copy(downloaded_src, dst_path)
-                click.echo(f"  Copied extra file: {dst_name}")
+                method = stage_file(downloaded_src, dst_path)
+                click.echo(f"  Staged extra file: {dst_name} ({method})")
         else:
             click.echo(f"  Warning: Extra file {source_path} not found")
 
@@ -432,12 +562,38 @@ def render_deb_templates(data, output_dir, arch, env, manifest_dir):
     click.echo("✓ DEB packaging files generated successfully")
 
 
-@click.command()
-@click.option("--manifest", "-m", help="Path to manifest", required=True)
-@click.option("--output-dir", "-o", help="Output directory", default="./build")
-@click.option("--arch", "-a", help="Target arch", default="amd64")
-def build(manifest, output_dir, arch):
+def get_template_env(manifest):
+    """
+    Return the Jinja2 environment for a manifest, with override logic:
+    templates in exporters/<name>/templates win over core/templates.
+
+    Environments are shared per search path, so every exporter without
+    overrides reuses the same environment (and its compiled templates), and
+    compiled templates persist across runs (see core.engine.templating).
+    """
+    override_dir = os.path.join(os.path.dirname(manifest), "templates")
+    override_dirs = [override_dir] if os.path.isdir(override_dir) else []
+    return templating.get_environment("packaging", override_dirs)
+
+
+def build_target(manifest, output_dir, arch, data=None, cache=None):
+    """
+    Stage one exporter×arch: binaries, extra sources, RPM spec, debian/ files
+    and Dockerfile in output_dir.
+
+    Args:
+        manifest: Path to the exporter manifest.yaml
+        output_dir: Build output directory
+        arch: Target architecture
+        data: Already validated manifest data (loaded from manifest if None)
+        cache: Optional DownloadCache for upstream archives
+
+    The duration of each phase is written to output_dir/build-trace.json,
+    also when the build fails (see core.engine.build_trace).
+    """
     click.echo(f"Processing {manifest} ({arch})")
+    trace = BuildTrace(arch)
+    error = None
 
     # Validate architecture
     if arch not in SUPPORTED_ARCHITECTURES:
@@ -449,16 +605,20 @@ def build(manifest, output_dir, arch):
         raise click.Abort()
 
     try:
-        data = load_manifest(manifest)
+        if data is None:
+            with trace.phase("manifest"):
+                data = load_manifest(manifest)
         data["arch"] = arch
         data["rpm_arch"] = ARCH_MAP.get(arch, arch)
+        trace.name, trace.version = data["name"], data["version"]
 
         # License Detection Logic
         if not data.get("license"):
             detected_license = None
             if data["upstream"]["type"] == "github":
                 click.echo(f"Detecting license for {data['upstream']['repo']}...")
-                detected_license = get_upstream_license(data["upstream"]["repo"])
+                with trace.phase("license"):
+                    detected_license = get_upstream_license(data["upstream"]["repo"])
 
             data["license"] = (
                 detected_license
@@ -467,15 +627,8 @@ def build(manifest, output_dir, arch):
             )
             click.echo(f"License set to: {data['license']}")
 
-        # Setup Jinja2 with Override Logic
-        template_dirs = [
-            os.path.join(os.path.dirname(manifest), "templates"),
-            TEMPLATES_DIR,
-        ]
-        env = Environment(
-            loader=FileSystemLoader(template_dirs),
-            autoescape=select_autoescape(["html", "xml", "j2"]),
-        )
+        with trace.phase("render"):
+            env = get_template_env(manifest)
 
         os.makedirs(output_dir, exist_ok=True)
 
@@ -484,9 +637,12 @@ def build(manifest, output_dir, arch):
         manifest_dir = os.path.dirname(os.path.abspath(manifest))
 
         if upstream_type == "github":
-            download_and_extract(data, output_dir, arch)
+            record = download_and_extract(
+                data, output_dir, arch, cache=cache, trace=trace
+            )
         elif upstream_type == "local":
-            copy_local_binary(data, output_dir, manifest_dir)
+            with trace.phase("extract"):
+                record = copy_local_binary(data, output_dir, manifest_dir)
         else:
             click.echo(
                 f"Error: Unknown upstream type '{upstream_type}'. "
@@ -499,7 +655,13 @@ def build(manifest, output_dir, arch):
             )
             raise click.Abort()
 
-        download_extra_sources(data, output_dir)
+        with trace.phase("extra_sources"):
+            record["extra_sources"] = download_extra_sources(data, output_dir)
+        trace.count(
+            "bytes_downloaded", sum(d["size"] for d in record["extra_sources"].values())
+        )
+        with trace.phase("staging"):
+            write_build_manifest(output_dir, data, record)
 
         # Normalize version for artifacts (RPM, Docker)
         # We lstrip 'v' to respect packaging standards
@@ -509,56 +671,297 @@ def build(manifest, output_dir, arch):
         artifacts = data.get("artifacts", {})
         if artifacts.get("rpm", {}).get("enabled"):
             # Smart Copy Logic for sources (local assets OR downloaded sources)
-            for extra_file in artifacts["rpm"].get("extra_files", []):
-                source_path = extra_file["source"]
-                local_src = os.path.join(os.path.dirname(manifest), source_path)
-                downloaded_src = os.path.join(output_dir, source_path)
-
-                dst_name = os.path.basename(source_path)
-
-                if os.path.exists(local_src):
-                    shutil.copy(local_src, os.path.join(output_dir, dst_name))
-                elif os.path.exists(downloaded_src):
-                    if downloaded_src != os.path.join(output_dir, dst_name):
-                        shutil.copy(downloaded_src, os.path.join(output_dir, dst_name))
-                else:
-                    click.echo(f"Warning: Source file {source_path} not found.")
+            with trace.phase("staging"):
+                for extra_file in artifacts["rpm"].get("extra_files", []):
+                    source_path = extra_file["source"]
+                    local_src = os.path.join(os.path.dirname(manifest), source_path)
+                    downloaded_src = os.path.join(output_dir, source_path)
+
+                    dst_name = os.path.basename(source_path)
+
+                    dst_path = os.path.join(output_dir, dst_name)
+                    if os.path.exists(local_src):
+                        method = stage_file(local_src, dst_path)
+                        click.echo(f"Staged {dst_name} ({method})")
+                    elif os.path.exists(downloaded_src):
+                        if downloaded_src != dst_path:
+                            method = stage_file(downloaded_src, dst_path)
+                            click.echo(f"Staged {dst_name} ({method})")
+                    else:
+                        click.echo(f"Warning: Source file {source_path} not found.")
 
-                extra_file["build_source"] = dst_name
+                    extra_file["build_source"] = dst_name
 
-            try:
-                template = env.get_template(f"{data['name']}.spec.j2")
-                click.echo("Using custom spec template")
-            except TemplateNotFound:
-                template = env.get_template("default.spec.j2")
+            with trace.phase("render"):
+                try:
+                    template = env.get_template(f"{data['name']}.spec.j2")
+                    click.echo("Using custom spec template")
+                except TemplateNotFound:
+                    template = env.get_template("default.spec.j2")
 
-            output_content = template.render(data)
-            output_file = os.path.join(output_dir, f"{data['name']}.spec")
-            with open(output_file, "w") as f:
-                f.write(output_content)
+                output_content = template.render(data)
+                output_file = os.path.join(output_dir, f"{data['name']}.spec")
+                with open(output_file, "w") as f:
+                    f.write(output_content)
 
         # 3. Build DEB packaging files
         if artifacts.get("deb", {}).get("enabled"):
             click.echo("\nGenerating DEB packaging files...")
-            render_deb_templates(data, output_dir, arch, env, manifest_dir)
+            with trace.phase("render"):
+                render_deb_templates(data, output_dir, arch, env, manifest_dir)
 
         # 4. Build Dockerfile
         if artifacts.get("docker", {}).get("enabled"):
-            try:
-                template = env.get_template(f"{data['name']}.Dockerfile.j2")
-                click.echo("Using custom Dockerfile template")
-            except TemplateNotFound:
-                template = env.get_template("Dockerfile.j2")
-
-            output_content = template.render(data)
-            output_file = os.path.join(output_dir, "Dockerfile")
-            with open(output_file, "w") as f:
-                f.write(output_content)
+            with trace.phase("render"):
+                try:
+                    template = env.get_template(f"{data['name']}.Dockerfile.j2")
+                    click.echo("Using custom Dockerfile template")
+                except TemplateNotFound:
+                    template = env.get_template("Dockerfile.j2")
+
+                output_content = template.render(data)
+                output_file = os.path.join(output_dir, "Dockerfile")
+                with open(output_file, "w") as f:
+                    f.write(output_content)
 
     except Exception as e:
+        error = str(e) or type(e).__name__
         if not isinstance(e, click.Abort):
             click.echo(f"Error: {e}", err=True)
         raise e
+    finally:
+        if os.path.isdir(output_dir):
+            trace.write(output_dir, error)
+
+
+def _missing_extra_files(data, kind, manifest_dir):
+    """extra_files of an artifact type found neither locally nor in extra_sources."""
+    downloaded = {s["filename"] for s in data["build"].get("extra_sources", [])}
+    missing = []
+    for extra_file in (data["artifacts"].get(kind) or {}).get("extra_files", []):
+        source_path = extra_file["source"]
+        if not os.path.exists(os.path.join(manifest_dir, source_path)) and (
+            source_path not in downloaded
+        ):
+            missing.append(f"{kind} extra file not found: {source_path}")
+        extra_file["build_source"] = os.path.basename(source_path)
+    return missing
+
+
+def plan_target(manifest, arch, data=None):
+    """
+    Dry-run one exporter×arch: everything build_target does except network
+    calls and writing files.
+
+    The upstream URL is resolved from archive_name (or the local binary is
+    checked), every extra file must exist locally or come from extra_sources,
+    and the spec, debian/ and Dockerfile templates are rendered in memory.
+    Without a license in the manifest, the default one is assumed.
+
+    Returns {"url": upstream URL or None, "rendered": [template names],
+    "errors": [messages]}; the target would build when errors is empty.
+    """
+    plan = {"url": None, "rendered": [], "errors": []}
+    errors = plan["errors"]
+    if arch not in SUPPORTED_ARCHITECTURES:
+        errors.append(f"Unsupported architecture '{arch}'")
+        return plan
+    try:
+        data = copy.deepcopy(data) if data is not None else load_validated(manifest)
+    except ValidationError as e:
+        errors.append(f"Invalid manifest: {e.messages}")
+        return plan
+    except (OSError, yaml.YAMLError) as e:
+        errors.append(f"Cannot read manifest: {e}")
+        return plan
+
+    data["arch"] = arch
+    data["rpm_arch"] = ARCH_MAP.get(arch, arch)
+    data["license"] = data.get("license") or "Apache-2.0"
+    manifest_dir = os.path.dirname(os.path.abspath(manifest))
+
+    upstream = data["upstream"]
+    if upstream["type"] == "github":
+        try:
+            plan["url"] = resolve_download_url(data, arch)[1]
+        except (ValueError, KeyError, IndexError) as e:
+            errors.append(f"Cannot resolve archive_name: {e!r}")
+    elif upstream["type"] == "local":
+        local = upstream.get("local_binary") or upstream.get("local_archive")
+        if not local:
+            errors.append("Local upstream without local_binary or local_archive")
+        elif not os.path.isfile(os.path.join(manifest_dir, local)):
+            errors.append(f"Local upstream file not found: {local}")
+    else:
+        errors.append(f"Unknown upstream type '{upstream['type']}'")
+
+    data["version"] = data["version"].lstrip("v")
+    artifacts = data["artifacts"]
+    templates = []
+    if (artifacts.get("rpm") or {}).get("enabled"):
+        errors.extend(_missing_extra_files(data, "rpm", manifest_dir))
+        templates.append([f"{data['name']}.spec.j2", "default.spec.j2"])
+    if (artifacts.get("deb") or {}).get("enabled"):
+        errors.extend(_missing_extra_files(data, "deb", manifest_dir))
+        data["build_date"] = "Thu, 01 Jan 1970 00:00:00 +0000"
+        data["binary_name"] = data["build"]["binary_name"]
+        templates += [
+            ["debian_control.j2"],
+            ["debian_rules.j2"],
+            ["debian_changelog.j2"],
+        ]
+        if (artifacts["deb"].get("systemd") or {}).get("enabled"):
+            templates.append(["debian_service.j2"])
+    if (artifacts.get("docker") or {}).get("enabled"):
+        templates.append([f"{data['name']}.Dockerfile.j2", "Dockerfile.j2"])
+
+    env = get_template_env(manifest)
+    for names in templates:
+        try:
+            template = env.select_template(names)
+            template.render(data)
+            plan["rendered"].append(template.name)
+        except Exception as e:
+            errors.append(f"{names[-1]}: {type(e).__name__}: {e}")
+    return plan
+
+
+@click.command()
+@click.option(
+    "--manifest",
+    "-m",
+    help="Path to manifest (repeat for a batch build)",
+    required=True,
+    multiple=True,
+)
+@click.option("--output-dir", "-o", help="Output directory", default="./build")
+@click.option(
+    "--arch",
+    "-a",
+    help="Target arch (repeat for a batch build)",
+    default=["amd64"],
+    multiple=True,
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Targets built concurrently in batch mode",
+    default=4,
+)
+@click.option(
+    "--cache-dir",
+    help="Upstream download cache directory (default: <CACHE_DIR>/downloads)",
+    default=None,
+)
+@click.option(
+    "--cache-max-mb",
+    envvar="MONITORING_HUB_CACHE_MAX_MB",
+    type=int,
+    help="Size cap of the download cache in MiB",
+    default=None,
+)
+@click.option("--no-cache", is_flag=True, help="Disable the upstream download cache")
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Resolve URLs and render templates in memory, without downloading",
+)
+def build(manifest, output_dir, arch, jobs, cache_dir, cache_max_mb, no_cache, dry_run):
+    """
+    Stage the build files of one or more exporters.
+
+    With a single --manifest and --arch the files are written to OUTPUT_DIR.
+    Repeating either option switches to batch mode: every manifest×arch is
+    staged in OUTPUT_DIR/<exporter>/<arch>, sharing one template environment,
+    the pooled HTTP connections and the download cache, with up to --jobs
+    targets in flight at once.
+
+    With --dry-run nothing is downloaded or written: each manifest×arch is
+    only checked (see plan_target), up to --jobs at once. To check every
+    exporter, use `python -m core.engine.build_farm --dry-run`.
+    """
+    if dry_run:
+        plan_batch(manifest, arch, jobs)
+        return
+
+    cache = None
+    if not no_cache:
+        cache = DownloadCache(
+            cache_dir, cache_max_mb * 1024**2 if cache_max_mb is not None else None
+        )
+
+    if len(manifest) == 1 and len(arch) == 1:
+        build_target(manifest[0], output_dir, arch[0], cache=cache)
+    else:
+        build_batch(manifest, arch, output_dir, jobs, cache)
+
+    if cache and (cache.hits or cache.misses):
+        click.echo(f"Download cache: {cache.summary()}")
+
+
+def plan_batch(manifests, archs, jobs=4):
+    """
+    Dry-run every manifest×arch (see plan_target), up to jobs at once.
+
+    Plans are reported in the order of the targets. Raises click.Abort after
+    all targets were checked if any of them would fail.
+    """
+    targets = [(manifest, arch) for manifest in manifests for arch in archs]
+    failed = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        plans = pool.map(lambda target: plan_target(*target), targets)
+        for (manifest, arch), plan in zip(targets, plans):
+            mark = "✗" if plan["errors"] else "✓"
+            click.echo(f"{mark} {manifest} ({arch}) {plan['url'] or ''}")
+            for error in plan["errors"]:
+                click.echo(f"    {error}", err=True)
+            failed += 1 if plan["errors"] else 0
+    if failed:
+        raise click.Abort()
+
+
+def build_batch(manifests, archs, output_dir, jobs=4, cache=None):
+    """
+    Stage every manifest×arch in one process.
+
+    Manifests are parsed and validated once; each target gets its own copy of
+    the data. Architectures not listed in a manifest's build.archs are skipped.
+    Raises click.Abort after all targets ran if any of them failed.
+    """
+    targets = []
+    failures = []
+    for manifest in manifests:
+        try:
+            data = load_manifest(manifest)
+        except Exception:
+            failures.append((manifest, None))
+            continue
+        for arch in archs:
+            if arch not in data["build"]["archs"]:
+                click.echo(f"Skipping {data['name']} ({arch}): not in build.archs")
+                continue
+            target_dir = os.path.join(output_dir, data["name"], arch)
+            targets.append((manifest, target_dir, arch, copy.deepcopy(data)))
+
+    click.echo(f"Building {len(targets)} target(s) with {jobs} worker(s)")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {}
+        for manifest, target_dir, arch, data in targets:
+            future = pool.submit(build_target, manifest, target_dir, arch, data, cache)
+            futures[future] = (manifest, arch)
+        succeeded = 0
+        for future in concurrent.futures.as_completed(futures):
+            if future.exception() is None:
+                succeeded += 1
+            else:
+                failures.append(futures[future])
+
+    click.echo(f"\nBatch complete: {succeeded} succeeded, {len(failures)} failed")
+    if failures:
+        for manifest, arch in sorted(failures, key=str):
+            click.echo(f"  ✗ {manifest}" + (f" ({arch})" if arch else ""), err=True)
+        raise click.Abort()
 
 
 if __name__ == "__main__":
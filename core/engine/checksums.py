@@ -0,0 +1,141 @@
+"""
+Upstream checksum files.
+
+Most upstream projects publish a checksum file (sha256sums.txt, checksums.txt,
+...) next to their release assets. It is fetched once per release: in memory
+for the life of the process, and on disk under CACHE_DIR/checksums since a
+published release does not change. A release that publishes none is not asked
+again for CHECKSUMS_MISSING_TTL (a checksum file may be uploaded later).
+"""
+
+import functools
+import json
+import os
+import re
+import time
+
+import requests
+
+from core.config import settings
+from core.engine import http_client
+
+# Names tried, in order, when the manifest does not set upstream.checksum_file
+CHECKSUM_FILE_CANDIDATES = (
+    "sha256sums.txt",
+    "checksums.txt",
+    "SHA256SUMS",
+    "{name}_{clean_version}_checksums.txt",
+)
+
+# "<digest>  <file>" (GNU, "*" marks binary mode) or "SHA256 (<file>) = <digest>"
+_GNU_LINE = re.compile(r"^([0-9a-fA-F]{64})\s+\*?(.+)$")
+_BSD_LINE = re.compile(r"^SHA256 \((.+)\) = ([0-9a-fA-F]{64})$")
+
+
+def parse_checksum_file(text):
+    """Return {filename: sha256} from a sha256sum-style checksum file."""
+    checksums = {}
+    for line in text.splitlines():
+        line = line.strip()
+        match = _GNU_LINE.match(line)
+        if match:
+            digest, filename = match.groups()
+        else:
+            match = _BSD_LINE.match(line)
+            if not match:
+                continue
+            filename, digest = match.groups()
+        # Some projects list paths (./dist/file.tar.gz): keep the basename
+        checksums[os.path.basename(filename.strip())] = digest.lower()
+    return checksums
+
+
+def _disk_path(repo, version):
+    return os.path.join(
+        settings.CACHE_DIR, "checksums", repo.replace("/", "__"), f"{version}.json"
+    )
+
+
+@functools.cache
+def get_upstream_checksums(repo, version, candidates):
+    """
+    Fetch the checksum file of a GitHub release.
+
+    Args:
+        repo: GitHub repository (owner/name)
+        version: Release tag
+        candidates: Tuple of checksum file names to try, in order
+
+    Returns:
+        (checksum_file_name, {filename: sha256}), or (None, {}) when the
+        release publishes none of the candidates.
+    """
+    path = _disk_path(repo, version)
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+        if cached["file"] in candidates:
+            return cached["file"], cached["checksums"]
+        if (
+            cached["file"] is None
+            and cached["candidates"] == list(candidates)
+            and time.time() - cached["checked_at"] < settings.CHECKSUMS_MISSING_TTL
+        ):
+            return None, {}
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    # Whether every candidate was answered for: a network or server error is
+    # not taken as "no checksum file"
+    answered = True
+    for name in candidates:
+        url = (
+            f"{settings.GITHUB_RELEASES_URL}/{repo}/releases/download/{version}/{name}"
+        )
+        try:
+            r = http_client.get(url, timeout=10)
+        except requests.exceptions.RequestException:
+            answered = False
+            continue
+        if r.status_code != 200:
+            answered = answered and r.status_code < 500
+            continue
+        checksums = parse_checksum_file(r.text)
+        if not checksums:
+            continue
+
+        _write_disk(path, {"file": name, "checksums": checksums})
+        return name, checksums
+
+    if answered:
+        _write_disk(
+            path,
+            {
+                "file": None,
+                "checksums": {},
+                "candidates": list(candidates),
+                "checked_at": time.time(),
+            },
+        )
+    return None, {}
+
+
+def _write_disk(path, entry):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(entry, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def checksum_candidates(data):
+    """Checksum file names to try for a manifest, with variables substituted."""
+    version = data["version"]
+    pattern = data["upstream"].get("checksum_file")
+    names = (pattern,) if pattern else CHECKSUM_FILE_CANDIDATES
+    return tuple(
+        name.format(
+            name=data["name"], version=version, clean_version=version.lstrip("v")
+        )
+        for name in names
+    )
@@ -0,0 +1,186 @@
+"""
+Content-addressed cache for upstream release archives.
+
+A full rebuild asks for the same upstream tarball once per RPM dist, DEB distro
+and Docker image of an exporter×arch. The cache keeps each archive on disk once,
+keyed by its URL and stored under its SHA-256, so only the first job pays for
+the download.
+
+Layout (under CACHE_DIR/downloads):
+    index.json          url -> {"sha256": ..., "size": ...}
+    blobs/ab/abcd...    archive content, named by its SHA-256
+    tmp/                in-flight (resumable) downloads, moved into blobs/ when
+                        complete, each with a .lock file held by the job
+                        downloading it
+    .lock               flock() guarding index.json and eviction across processes
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from core.config import settings
+
+
+class DownloadCache:
+    """
+    On-disk, size-capped, LRU cache of upstream archives.
+
+    Safe to share between concurrent builder processes: blobs are published with
+    an atomic rename and the index is only rewritten under an exclusive lock.
+    The hit/miss counters are guarded too, for the threads of a batch build.
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.path.join(settings.CACHE_DIR, "downloads")
+        self.max_bytes = (
+            settings.DOWNLOAD_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        self.blobs_dir = os.path.join(self.root, "blobs")
+        self.tmp_dir = os.path.join(self.root, "tmp")
+        self.index_path = os.path.join(self.root, "index.json")
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._counters_lock = threading.Lock()
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with open(os.path.join(self.root, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".index-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    def _cached(self, url, expected_sha256=None):
+        """
+        (path, size) of the cached archive for url, or None. A copy whose
+        SHA-256 is not expected_sha256 (when given) counts as missing.
+        """
+        with self._locked():
+            entry = self._read_index().get(url)
+
+        if entry and expected_sha256 and entry["sha256"] != expected_sha256:
+            return None
+        if entry:
+            path = self._blob_path(entry["sha256"])
+            if os.path.isfile(path) and os.path.getsize(path) == entry["size"]:
+                os.utime(path)
+                return path, entry["size"]
+        return None
+
+    def lookup(self, url):
+        """
+        Return the path of the cached archive for url, or None on a miss.
+        A hit refreshes the entry's position in the LRU order.
+        """
+        cached = self._cached(url)
+        with self._counters_lock:
+            if cached:
+                self.hits += 1
+                self.bytes_saved += cached[1]
+            else:
+                self.misses += 1
+        return cached[0] if cached else None
+
+    @contextlib.contextmanager
+    def download_lock(self, url, expected_sha256=None):
+        """
+        Hold the download of url, across processes and threads.
+
+        Jobs fetching the same archive would otherwise append to the same
+        tmp_path file and publish it while another one still writes it. The
+        lock is to be held from the resume of the download to add(). Yields
+        the cached copy when a job that held the lock before published it
+        (and it matches expected_sha256, when given), else None.
+        """
+        with open(f"{self.tmp_path(url)}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                cached = self._cached(url, expected_sha256)
+                yield cached[0] if cached else None
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def tmp_path(self, url):
+        """Stable in-flight path for url, so an interrupted download can resume."""
+        return os.path.join(self.tmp_dir, hashlib.sha256(url.encode()).hexdigest())
+
+    def add(self, url, tmp_path, digest, size):
+        """
+        Publish a complete file (moved from tmp_path) as the content of url.
+        Returns the path of the cached copy.
+        """
+        path = self._blob_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._locked():
+            if os.path.exists(path):
+                # Same content already cached under another URL (or by a
+                # concurrent job): keep the existing blob.
+                os.remove(tmp_path)
+                os.utime(path)
+            else:
+                os.replace(tmp_path, path)
+            index = self._read_index()
+            index[url] = {"sha256": digest, "size": size}
+            self._evict(index, keep=path)
+            self._write_index(index)
+        return path
+
+    def _evict(self, index, keep=None):
+        """Delete least recently used blobs until the cache fits max_bytes."""
+        blobs = []
+        for dirpath, _dirs, files in os.walk(self.blobs_dir):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                blobs.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _mtime, size, _path in blobs)
+        for _mtime, size, path in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+
+        for url in list(index):
+            if not os.path.exists(self._blob_path(index[url]["sha256"])):
+                del index[url]
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_saved": self.bytes_saved,
+        }
+
+    def summary(self):
+        return (
+            f"{self.hits} hit(s), {self.misses} miss(es), "
+            f"{self.bytes_saved / 1024**2:.1f} MiB saved"
+        )
@@ -0,0 +1,259 @@
+"""
+Resumable downloads of upstream files.
+
+Bytes are written to `<dest>.part`, which survives a failed attempt. The next
+attempt (a tenacity retry, or a later run) asks only for the missing bytes with
+an HTTP Range request, so a flaky connection costs the bytes that were left,
+not the whole file again. The SHA-256 is computed as the bytes arrive, and the
+completed file is checked against the size the server announced (and an
+expected SHA-256 when one is known) before it is renamed to `dest`.
+
+Large files can also be fetched as several ranged segments in parallel; each
+segment is resumable on its own.
+
+stream() hands the body to a single-pass reader (the archive extractor) as it
+arrives, while it is saved the same way, so the file is not read back.
+"""
+
+import concurrent.futures
+import contextlib
+import hashlib
+import os
+from collections import namedtuple
+
+from core.config import settings
+from core.engine import http_client
+from core.engine.archive import ChunkReader
+
+CHUNK_SIZE = 64 * 1024
+
+DownloadResult = namedtuple("DownloadResult", ["path", "sha256", "size"])
+
+
+class DownloadError(OSError):
+    """The downloaded file is not the one the server announced."""
+
+
+class IncompleteDownload(DownloadError):
+    """The server closed the transfer before every byte was received."""
+
+
+class ChecksumMismatch(DownloadError):
+    """The completed file does not match its expected SHA-256."""
+
+
+def download(url, dest, expected_sha256=None, segments=None, timeout=30):
+    """
+    Download url to dest, resuming from `<dest>.part` when it exists.
+
+    Args:
+        url: File to download
+        dest: Final path, only created once the file is complete and verified
+        expected_sha256: Optional digest the file must match
+        segments: Parallel ranged requests for large files
+            (default: settings.DOWNLOAD_SEGMENTS)
+        timeout: Connect/read timeout of each request
+
+    Returns:
+        DownloadResult(path, sha256, size)
+
+    Raises:
+        requests.exceptions.RequestException: Network or HTTP error; the .part
+            file is kept so the next attempt resumes
+        IncompleteDownload: Fewer bytes than announced were received (.part kept)
+        ChecksumMismatch: Digest differs from expected_sha256 (.part discarded)
+    """
+    part_path = f"{dest}.part"
+    segments = settings.DOWNLOAD_SEGMENTS if segments is None else segments
+
+    total = _probe_size(url, timeout) if segments > 1 else None
+    if total and total >= settings.DOWNLOAD_SEGMENT_MIN_BYTES:
+        sha256 = _download_segments(url, part_path, total, segments, timeout)
+    else:
+        total, sha256 = _fetch_range(url, part_path, timeout=timeout, digest=True)
+
+    return _complete(url, part_path, dest, total, sha256, expected_sha256)
+
+
+class _Stream:
+    reader = None
+    result = None
+
+
+@contextlib.contextmanager
+def stream(url, dest, expected_sha256=None, timeout=30):
+    """
+    Read url in one pass while it is downloaded to dest like download() does.
+
+    Yields an object whose `reader` is a readable file of the content: the
+    response body as it arrives, each chunk being appended to `<dest>.part`
+    on the way. Once the block exits, the rest of the body is read and the
+    file is checked and renamed to dest; `result` is then its DownloadResult.
+    On error the .part file is kept, for the next attempt to resume.
+
+    When a .part file is already there (an interrupted attempt), or segmented
+    downloads are enabled, the file is completed with download() first and
+    `reader` reads it from disk.
+
+    Raises:
+        The exceptions of download(); ChecksumMismatch only once the block
+        has consumed the content.
+    """
+    part_path = f"{dest}.part"
+    handle = _Stream()
+    if os.path.exists(part_path) or settings.DOWNLOAD_SEGMENTS > 1:
+        handle.result = download(url, dest, expected_sha256, timeout=timeout)
+        with open(dest, "rb") as handle.reader:
+            yield handle
+        return
+
+    sha256 = hashlib.sha256()
+    with http_client.get(url, stream=True, timeout=timeout) as r:
+        r.raise_for_status()
+        total = _content_length(r.headers)
+        with open(part_path, "wb") as f:
+
+            def chunks():
+                for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                    sha256.update(chunk)
+                    yield chunk
+
+            handle.reader = ChunkReader(chunks())
+            yield handle
+            handle.reader.drain()
+    handle.result = _complete(url, part_path, dest, total, sha256, expected_sha256)
+
+
+def _complete(url, part_path, dest, total, sha256, expected_sha256):
+    """Check the finished .part file and rename it to dest."""
+    size = os.path.getsize(part_path)
+    if total is not None and size != total:
+        raise IncompleteDownload(f"{url}: received {size} of {total} bytes")
+
+    digest = sha256.hexdigest()
+    if expected_sha256 and digest != expected_sha256.lower():
+        os.remove(part_path)
+        raise ChecksumMismatch(
+            f"{url}: expected sha256 {expected_sha256}, got {digest}"
+        )
+
+    os.replace(part_path, dest)
+    return DownloadResult(dest, digest, size)
+
+
+def _probe_size(url, timeout):
+    """Size of url if the server accepts byte ranges, else None."""
+    response = http_client.head(url, allow_redirects=True, timeout=timeout)
+    if response.status_code != 200:
+        return None
+    if response.headers.get("Accept-Ranges", "").lower() != "bytes":
+        return None
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def _fetch_range(url, path, start=0, end=None, timeout=30, digest=False):
+    """
+    Append the missing part of bytes [start, end] of url to path.
+
+    With end=None the rest of the file is requested. Returns (total, sha256):
+    the total size of the remote file when the server tells it (else None)
+    and, with digest=True, a SHA-256 object fed the whole content of path (the
+    bytes already there, then the streamed ones).
+    """
+    have = os.path.getsize(path) if os.path.exists(path) else 0
+    if end is not None and have >= end - start + 1:
+        return None, None
+
+    headers = {}
+    if have or start or end is not None:
+        headers["Range"] = f"bytes={start + have}-{'' if end is None else end}"
+
+    with http_client.get(url, headers=headers, stream=True, timeout=timeout) as r:
+        if r.status_code == 416 and have and end is None:
+            # The .part file is stale (or already complete): start over
+            os.remove(path)
+            return _fetch_range(url, path, timeout=timeout, digest=digest)
+        r.raise_for_status()
+
+        if r.status_code == 206:
+            mode = "ab"
+            total = _content_range_total(r.headers.get("Content-Range"))
+        elif start or end is not None:
+            raise DownloadError(f"{url}: server ignored the Range header")
+        else:
+            # Full body: whatever was in the .part file is replaced
+            mode = "wb"
+            total = _content_length(r.headers)
+
+        sha256 = None
+        if digest:
+            sha256 = _sha256_file(path) if mode == "ab" else hashlib.sha256()
+
+        with open(path, mode) as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                if sha256 is not None:
+                    sha256.update(chunk)
+    return total, sha256
+
+
+def _download_segments(url, part_path, total, segments, timeout):
+    """
+    Fetch total bytes as parallel ranged segments, then join them.
+    Returns the SHA-256 object of the joined file, hashed while joining.
+    """
+    step = -(-total // segments)
+    ranges = [(s, min(s + step, total) - 1) for s in range(0, total, step)]
+    paths = [f"{part_path}.{i}of{len(ranges)}" for i in range(len(ranges))]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [
+            pool.submit(_fetch_range, url, path, start, end, timeout)
+            for path, (start, end) in zip(paths, ranges)
+        ]
+    for future in futures:
+        future.result()
+
+    for path, (start, end) in zip(paths, ranges):
+        if os.path.getsize(path) != end - start + 1:
+            raise IncompleteDownload(f"{url}: segment {start}-{end} is incomplete")
+
+    sha256 = hashlib.sha256()
+    with open(part_path, "wb") as out:
+        for path in paths:
+            with open(path, "rb") as f:
+                for block in iter(lambda f=f: f.read(1024 * 1024), b""):
+                    out.write(block)
+                    sha256.update(block)
+    for path in paths:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+    return sha256
+
+
+def _content_range_total(value):
+    # "bytes 100-199/1000" -> 1000 ("*" when the server does not know)
+    if value and "/" in value:
+        total = value.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    return None
+
+
+def _content_length(headers):
+    # A Content-Encoding makes Content-Length describe the encoded body,
+    # while iter_content yields decoded bytes.
+    length = headers.get("Content-Length")
+    if headers.get("Content-Encoding") or not (length and length.isdigit()):
+        return None
+    return int(length)
+
+
+def _sha256_file(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(block)
+    return sha256
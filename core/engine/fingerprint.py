@@ -0,0 +1,106 @@
+"""
+Content fingerprints of the inputs that go into an exporter's artifacts.
+
+A fingerprint is computed per artifact type (rpm, deb, docker) from:
+
+- CORE_VERSION
+- the exporter's manifest.yaml
+- every file under exporters/<name>/assets and exporters/<name>/templates
+- the core templates that artifact type renders (unless the exporter
+  overrides them)
+
+The fingerprints of the last build are published in catalog/index.json, so
+the state manager can rebuild only what changed: editing an asset rebuilds
+every artifact of that exporter, while editing core/templates/Dockerfile.j2
+only rebuilds Docker images.
+"""
+
+import hashlib
+import os
+
+from core.config import settings
+from core.engine.manifests import load_validated
+
+# Templates rendered by the builder for each artifact type, in lookup order:
+# a custom template named after the exporter wins over the default one.
+ARTIFACT_TEMPLATES = {
+    "rpm": [("{name}.spec.j2", "default.spec.j2")],
+    "deb": [
+        ("debian_control.j2",),
+        ("debian_rules.j2",),
+        ("debian_changelog.j2",),
+        ("debian_service.j2",),
+    ],
+    "docker": [("{name}.Dockerfile.j2", "Dockerfile.j2")],
+}
+
+_EXPORTER_INPUT_DIRS = ("assets", "templates")
+
+
+def _hash_file(sha256, path):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+
+
+def _hash_tree(sha256, root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            sha256.update(os.path.relpath(path, root).encode() + b"\0")
+            _hash_file(sha256, path)
+            sha256.update(b"\0")
+
+
+def _resolve_template(candidates, name, search_path):
+    """Path of the first candidate template found along search_path."""
+    for candidate in candidates:
+        template = candidate.format(name=name)
+        for directory in search_path:
+            path = os.path.join(directory, template)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def compute(manifest_path, template_dir=None):
+    """
+    Return {artifact_type: sha256} for the artifact types enabled in the
+    manifest.
+
+    Raises:
+        FileNotFoundError: The manifest does not exist
+        marshmallow.ValidationError: The manifest does not match the schema
+    """
+    manifest = load_validated(manifest_path)
+    exporter_dir = os.path.dirname(manifest_path)
+    search_path = (
+        os.path.join(exporter_dir, "templates"),
+        template_dir or settings.TEMPLATES_DIR,
+    )
+
+    common = hashlib.sha256(settings.CORE_VERSION.encode() + b"\0")
+    _hash_file(common, manifest_path)
+    for subdir in _EXPORTER_INPUT_DIRS:
+        common.update(f"\0{subdir}\0".encode())
+        _hash_tree(common, os.path.join(exporter_dir, subdir))
+
+    fingerprints = {}
+    for artifact_type, templates in ARTIFACT_TEMPLATES.items():
+        if not (manifest["artifacts"].get(artifact_type) or {}).get("enabled"):
+            continue
+        sha256 = common.copy()
+        sha256.update(f"\0{artifact_type}\0".encode())
+        for candidates in templates:
+            path = _resolve_template(candidates, manifest["name"], search_path)
+            if path:
+                sha256.update(os.path.basename(path).encode() + b"\0")
+                _hash_file(sha256, path)
+        fingerprints[artifact_type] = sha256.hexdigest()
+    return fingerprints
+
+
+def changed_artifact_types(local, remote):
+    """Artifact types whose local fingerprint differs from the published one."""
+    return sorted(t for t, digest in local.items() if remote.get(t) != digest)
@@ -0,0 +1,260 @@
+"""
+Shared HTTP client for the engine and the scripts.
+
+Every network call goes through this module instead of the module-level
+requests functions, which gives us:
+- one pooled, keep-alive Session per host (no TCP+TLS handshake per call)
+- the same retry/backoff policy everywhere, honouring Retry-After on 429/503
+  up to HTTP_MAX_RETRY_AFTER
+- a cap on concurrent connections per host
+- an optional on-disk ETag/Last-Modified cache for conditional GETs
+- the last X-RateLimit-* headers seen per host and resource (rate_limit())
+
+Usage mirrors requests:
+    response = http_client.get(url, headers=headers, timeout=10)
+    response = http_client.get(url, conditional=True)  # 304 -> cached body
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from core.config import settings
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Headers kept with a cached body (the body is stored decoded, so encoding and
+# length headers of the original response no longer apply)
+_CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+_DROPPED_304_HEADERS = ("Content-Length", "Content-Encoding", "Transfer-Encoding")
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_rate_limits = {}
+
+
+class _CappedRetry(Retry):
+    """Retry honouring Retry-After for at most HTTP_MAX_RETRY_AFTER seconds."""
+
+    def get_retry_after(self, response):
+        seconds = super().get_retry_after(response)
+        if seconds is None:
+            return None
+        return min(seconds, settings.HTTP_MAX_RETRY_AFTER)
+
+
+def _new_session(retries=True):
+    retry = _CappedRetry(
+        total=settings.HTTP_RETRIES if retries else 0,
+        backoff_factor=1,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+        # Hand the last response back to the caller instead of raising
+        raise_on_status=False,
+    )
+    # pool_block: once every connection to the host is busy, further requests
+    # wait for one to be released instead of opening more.
+    adapter = HTTPAdapter(
+        pool_maxsize=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.hooks["response"].append(_record_rate_limit)
+    return session
+
+
+def _record_rate_limit(response, *args, **kwargs):
+    headers = response.headers
+    try:
+        state = {
+            "limit": int(headers["X-RateLimit-Limit"]),
+            "remaining": int(headers["X-RateLimit-Remaining"]),
+            "reset": int(headers["X-RateLimit-Reset"]),
+        }
+    except (KeyError, ValueError):
+        return
+    host = urlsplit(response.url).netloc
+    resource = headers.get("X-RateLimit-Resource", "core")
+    with _sessions_lock:
+        _rate_limits[(host, resource)] = state
+
+
+def rate_limit(url, resource="core"):
+    """
+    Last rate limit state seen for the host of url, from the X-RateLimit-*
+    headers of its answers: {"limit", "remaining", "reset" (epoch seconds)},
+    or None when no answer carried them yet.
+    """
+    with _sessions_lock:
+        state = _rate_limits.get((urlsplit(url).netloc, resource))
+        return dict(state) if state else None
+
+
+def session_for(url, retries=True):
+    """
+    Return the pooled Session dedicated to the host of url; with
+    retries=False, the one that sends every request once.
+    """
+    key = (urlsplit(url).netloc, retries)
+    with _sessions_lock:
+        if key not in _sessions:
+            _sessions[key] = _new_session(retries)
+        return _sessions[key]
+
+
+def close():
+    """Close every pooled session (they are recreated on next use)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _rate_limits.clear()
+
+
+def request(method, url, conditional=False, retries=True, **kwargs):
+    """
+    Send a request through the pooled session of the target host.
+
+    Args:
+        method: HTTP method
+        url: Target URL
+        conditional: For GET, revalidate against the on-disk cache with
+            If-None-Match/If-Modified-Since and serve the cached body on 304
+        retries: False for callers with their own retry loop, so a request
+            is not retried by both
+        **kwargs: Passed to requests.Session.request
+    """
+    if conditional and method.upper() == "GET":
+        return _conditional_get(url, **kwargs)
+    return session_for(url, retries).request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def head(url, **kwargs):
+    # Same default as requests.head
+    kwargs.setdefault("allow_redirects", False)
+    return request("HEAD", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return request("DELETE", url, **kwargs)
+
+
+def retry_after(response):
+    """
+    Seconds the server asked us to wait via Retry-After (at most
+    HTTP_MAX_RETRY_AFTER), or None. Accepts both the delta-seconds and the
+    HTTP-date forms.
+    """
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    if value.strip().isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(0.0, seconds), settings.HTTP_MAX_RETRY_AFTER)
+
+
+def _cache_paths(url, headers):
+    accept = (headers or {}).get("Accept", "")
+    key = hashlib.sha256(f"{url}\n{accept}".encode()).hexdigest()
+    root = os.path.join(settings.CACHE_DIR, "http")
+    return os.path.join(root, f"{key}.json"), os.path.join(root, f"{key}.body")
+
+
+def _atomic_write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+def _conditional_get(url, headers=None, **kwargs):
+    meta_path, body_path = _cache_paths(url, headers)
+    meta = None
+    if os.path.exists(meta_path) and os.path.exists(body_path):
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+
+    request_headers = dict(headers or {})
+    if meta:
+        if meta.get("etag"):
+            request_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            request_headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = session_for(url).get(url, headers=request_headers, **kwargs)
+
+    if response.status_code == 304 and meta:
+        return _cached_response(response, meta, body_path)
+
+    response.from_cache = False
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if response.status_code == 200 and (etag or last_modified):
+        _atomic_write(body_path, response.content)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "encoding": response.encoding,
+            "headers": {
+                name: response.headers[name]
+                for name in _CACHED_HEADERS
+                if name in response.headers
+            },
+        }
+        _atomic_write(meta_path, json.dumps(meta, indent=2).encode())
+    return response
+
+
+def _cached_response(not_modified, meta, body_path):
+    """Build a 200 response from the cache, keeping the fresh 304 headers."""
+    cached = requests.Response()
+    cached.status_code = 200
+    cached.reason = "OK"
+    cached.url = not_modified.url
+    cached.request = not_modified.request
+    cached.encoding = meta.get("encoding")
+    cached.headers = CaseInsensitiveDict(meta.get("headers", {}))
+    for name, value in not_modified.headers.items():
+        if name.title() not in _DROPPED_304_HEADERS:
+            cached.headers[name] = value
+    with open(body_path, "rb") as f:
+        cached._content = f.read()
+    cached.from_cache = True
+    return cached
@@ -0,0 +1,199 @@
+"""
+Persistent cache of upstream licenses (GitHub repo -> SPDX id).
+
+Manifests without a `license` get it from the GitHub /repos/{repo}/license
+API. The answer almost never changes, so it is kept in
+CACHE_DIR/licenses.json for LICENSE_CACHE_TTL and build jobs only call the
+API on a miss. A failed call (rate limit, timeout) is never cached; when an
+expired entry exists it is used instead of the caller's fallback.
+
+Seed the cache for every exporter in one pass (e.g. in a CI setup job):
+    python -m core.engine.license_cache --jobs 8
+"""
+
+import concurrent.futures
+import contextlib
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+
+import click
+
+from core.config import settings
+from core.engine import http_client
+from core.engine.manifests import load_raw
+
+
+def fetch_license(repo_slug):
+    """
+    Ask the GitHub API for the SPDX id of a repository's license.
+
+    Returns the SPDX id, or None when GitHub detects no license. Raises on
+    network errors and on unexpected statuses (e.g. 403 rate limit), so that
+    failures are not mistaken for "no license".
+    """
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    token = os.environ.get("GITHUB_TOKEN")
+    if token:
+        headers["Authorization"] = f"token {token}"
+
+    url = f"https://api.github.com/repos/{repo_slug}/license"
+    r = http_client.get(url, headers=headers, timeout=5, conditional=True)
+    if r.status_code == 404:
+        return None
+    r.raise_for_status()
+    return (r.json().get("license") or {}).get("spdx_id")
+
+
+class LicenseCache:
+    """
+    JSON file of {repo: {"spdx_id": ..., "fetched_at": ...}} entries.
+
+    Safe to share between concurrent builder processes: updates re-read the
+    file and are written atomically under an exclusive lock.
+    """
+
+    def __init__(self, path=None, ttl=None):
+        self.path = path or os.path.join(settings.CACHE_DIR, "licenses.json")
+        self.ttl = settings.LICENSE_CACHE_TTL if ttl is None else ttl
+        self._entries = None
+        self._mutex = threading.Lock()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def entries(self):
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    def get(self, repo_slug, allow_stale=False):
+        """Return the cached entry for repo_slug, or None if missing/expired."""
+        entry = self.entries().get(repo_slug)
+        if entry and (allow_stale or self.is_fresh(entry)):
+            return entry
+        return None
+
+    def update(self, licenses):
+        """Store {repo: spdx_id} results fetched just now."""
+        now = time.time()
+        with self._mutex, self._locked():
+            entries = self._read()
+            for repo_slug, spdx_id in licenses.items():
+                entries[repo_slug] = {"spdx_id": spdx_id, "fetched_at": now}
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.path), prefix=".licenses-"
+            )
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._entries = entries
+
+    def lookup(self, repo_slug, fetch=fetch_license):
+        """
+        Return the SPDX id for repo_slug, calling fetch only on a cache miss.
+        If fetch fails, an expired entry is returned when there is one;
+        otherwise the error propagates.
+        """
+        entry = self.get(repo_slug)
+        if entry:
+            return entry["spdx_id"]
+        try:
+            spdx_id = fetch(repo_slug)
+        except Exception:
+            stale = self.get(repo_slug, allow_stale=True)
+            if stale:
+                return stale["spdx_id"]
+            raise
+        self.update({repo_slug: spdx_id})
+        return spdx_id
+
+    def seed(self, repo_slugs, jobs=8, force=False, fetch=fetch_license):
+        """
+        Fetch the licenses of many repositories concurrently and store them in
+        one write. Fresh entries are skipped unless force is set.
+
+        Returns (fetched, failed): {repo: spdx_id} and {repo: error}.
+        """
+        todo = sorted(repo for repo in set(repo_slugs) if force or not self.get(repo))
+        fetched, failed = {}, {}
+        if not todo:
+            return fetched, failed
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(fetch, repo): repo for repo in todo}
+            for future in concurrent.futures.as_completed(futures):
+                repo = futures[future]
+                try:
+                    fetched[repo] = future.result()
+                except Exception as e:
+                    failed[repo] = e
+
+        if fetched:
+            self.update(fetched)
+        return fetched, failed
+
+
+def repos_needing_license(exporters_dir):
+    """GitHub repos of the manifests that do not set a license."""
+    repos = set()
+    for name in sorted(os.listdir(exporters_dir)):
+        manifest_path = os.path.join(exporters_dir, name, "manifest.yaml")
+        if not os.path.exists(manifest_path):
+            continue
+        data = load_raw(manifest_path) or {}
+        upstream = data.get("upstream", {})
+        if upstream.get("type") == "github" and upstream.get("repo"):
+            # Manifests that set a license never ask the API
+            if data.get("license"):
+                continue
+            repos.add(upstream["repo"])
+    return sorted(repos)
+
+
+@click.command()
+@click.option(
+    "--exporters-dir",
+    default=settings.EXPORTERS_DIR,
+    show_default=True,
+    help="Directory containing the exporter manifests",
+)
+@click.option("--jobs", "-j", default=8, show_default=True, help="Parallel API calls")
+@click.option("--force", is_flag=True, help="Refresh entries that have not expired")
+def seed(exporters_dir, jobs, force):
+    """Seed the license cache for every exporter without a manifest license."""
+    cache = LicenseCache()
+    repos = repos_needing_license(exporters_dir)
+    fetched, failed = cache.seed(repos, jobs=jobs, force=force)
+
+    for repo, error in sorted(failed.items()):
+        click.echo(f"Warning: Could not fetch license for {repo}: {error}", err=True)
+    click.echo(
+        f"License cache: {len(repos)} repo(s), {len(fetched)} fetched, "
+        f"{len(repos) - len(fetched) - len(failed)} already cached, "
+        f"{len(failed)} failed ({cache.path})"
+    )
+
+
+if __name__ == "__main__":
+    seed()
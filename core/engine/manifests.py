@@ -0,0 +1,141 @@
+"""
+Manifest repository shared by every engine entry point and script.
+
+The same exporters/*/manifest.yaml files are read by the builder, the watcher,
+the state manager, the site generators and the validation scripts. This
+module parses (with the libyaml C loader when available) and validates each
+file once: results are cached by the SHA-256 of the file content, in memory
+and under CACHE_DIR/manifests, so an unchanged manifest is never parsed or
+validated twice, even across processes.
+
+Callers get their own copy of the data and may modify it freely.
+"""
+
+import copy
+import functools
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+import yaml
+from marshmallow import ValidationError
+
+from core.config import settings
+from core.engine.schema import ManifestSchema
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+# Validated results depend on the schema and on the defaults it takes from
+# settings, so both are part of the disk cache key.
+_SCHEMA_SOURCES = (
+    os.path.join(os.path.dirname(__file__), "schema.py"),
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "settings.py"),
+)
+
+_memory = {}
+
+
+@functools.cache
+def _schema_fingerprint():
+    sha256 = hashlib.sha256(yaml.__version__.encode())
+    for path in _SCHEMA_SOURCES:
+        with open(path, "rb") as f:
+            sha256.update(f.read())
+    return sha256.hexdigest()[:16]
+
+
+def _disk_path(digest):
+    return os.path.join(
+        settings.CACHE_DIR, "manifests", _schema_fingerprint(), f"{digest}.json"
+    )
+
+
+def _read_disk(digest):
+    try:
+        with open(_disk_path(digest)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_disk(digest, entry):
+    path = _disk_path(digest)
+    try:
+        content = json.dumps(entry)
+    except (TypeError, ValueError):
+        # YAML types without a JSON form (e.g. dates): memory cache only
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _entry(path):
+    """
+    Return the cached {"raw", "data", "errors"} entry for a manifest file.
+    data is the validated manifest (None when invalid), errors the
+    marshmallow messages (empty when valid).
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+
+    entry = _memory.get(digest)
+    if entry is None:
+        entry = _read_disk(digest)
+        if entry is None:
+            raw = yaml.load(content, Loader=SafeLoader)  # nosec B506 - SafeLoader
+            try:
+                entry = {
+                    "raw": raw,
+                    "data": ManifestSchema().load(raw),
+                    "errors": {},
+                }
+            except ValidationError as err:
+                messages = err.messages
+                if not isinstance(messages, dict):
+                    messages = {"_schema": messages}
+                entry = {"raw": raw, "data": None, "errors": messages}
+            _write_disk(digest, entry)
+        _memory[digest] = entry
+    return entry
+
+
+def load_raw(path):
+    """Parsed YAML of a manifest, without validation."""
+    return copy.deepcopy(_entry(path)["raw"])
+
+
+def load_validated(path):
+    """
+    Validated manifest, with schema defaults applied.
+
+    Raises:
+        marshmallow.ValidationError: The manifest does not match the schema
+    """
+    entry = _entry(path)
+    if entry["data"] is None:
+        raise ValidationError(entry["errors"])
+    return copy.deepcopy(entry["data"])
+
+
+def validation_errors(path):
+    """Schema errors of a manifest ({} when it is valid)."""
+    return copy.deepcopy(_entry(path)["errors"])
+
+
+def manifest_paths(exporters_dir=None):
+    """Paths of every exporters/*/manifest.yaml, in a stable order."""
+    exporters_dir = exporters_dir or settings.EXPORTERS_DIR
+    return sorted(glob.glob(os.path.join(exporters_dir, "*", "manifest.yaml")))
+
+
+def clear_memory_cache():
+    _memory.clear()
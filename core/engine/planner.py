@@ -0,0 +1,262 @@
+"""
+Build plan for the RPM and DEB jobs of the CI workflow.
+
+Every exporter to build expands into one unit per package type, target
+distribution and architecture. GitHub Actions refuses a matrix of more than
+256 jobs, so instead of one job per unit the units are packed into at most
+BUILD_PLAN_MAX_JOBS jobs per matrix, balancing the expected duration of each
+job (longest units first, each into the least loaded job).
+
+Expected durations come from a JSON file of past build times when one is
+given ({"rpm/node_exporter/el9/arm64": 312.5, ...}, in seconds), otherwise
+from a per package type estimate where arm64 units, built under QEMU
+emulation, cost more.
+
+The plan can be inspected locally:
+
+    python -m core.engine.planner --exporters '["node_exporter"]' --max-jobs 4
+
+Inside GitHub Actions the matrices are also written to $GITHUB_OUTPUT as
+rpm_matrix and deb_matrix, along with docker_exporters (the Docker job
+matrix). When the state manager only asks for some artifact types of an
+exporter (BUILD_TYPES, see core.engine.fingerprint), the other types are
+left out of the plan.
+"""
+
+import heapq
+import json
+import os
+import sys
+
+import click
+from marshmallow import ValidationError
+
+from core.config.settings import (
+    BUILD_PLAN_MAX_JOBS,
+    DEB_BUILD_IMAGES,
+    DEFAULT_CATALOG_URL,
+    EXPORTERS_DIR,
+    RPM_BUILD_IMAGES,
+    SUPPORTED_DEB_DISTROS,
+    SUPPORTED_DISTROS,
+)
+from core.engine import state_manager
+from core.engine.manifests import load_validated
+
+PACKAGE_TYPES = {
+    "rpm": (SUPPORTED_DISTROS, RPM_BUILD_IMAGES),
+    "deb": (SUPPORTED_DEB_DISTROS, DEB_BUILD_IMAGES),
+}
+
+# Estimated seconds per unit when there is no recorded duration
+DEFAULT_DURATIONS = {"rpm": 240.0, "deb": 180.0}
+ARCH_FACTORS = {"amd64": 1.0, "arm64": 3.0}
+
+
+def unit_key(kind, unit):
+    return f"{kind}/{unit['exporter']}/{unit['dist']}/{unit['arch']}"
+
+
+def expected_duration(kind, unit, durations=None):
+    """Recorded duration of a unit, or the default estimate for its type."""
+    if durations and unit_key(kind, unit) in durations:
+        return float(durations[unit_key(kind, unit)])
+    return DEFAULT_DURATIONS[kind] * ARCH_FACTORS.get(unit["arch"], 1.0)
+
+
+def build_units(exporters, exporters_dir=EXPORTERS_DIR, build_types=None):
+    """
+    Expand exporters into {"rpm": [units], "deb": [units]}, one unit
+    ({"exporter", "arch", "dist", "image"}) per enabled target distribution
+    and supported architecture. build_types ({exporter: [types]}) restricts
+    the package types planned for an exporter.
+    """
+    units = {kind: [] for kind in PACKAGE_TYPES}
+    for exporter in exporters:
+        manifest_path = os.path.join(exporters_dir, exporter, "manifest.yaml")
+        try:
+            manifest = load_validated(manifest_path)
+        except (OSError, ValidationError) as e:
+            print(f"Warning: Failed to process {exporter}: {e}", file=sys.stderr)
+            continue
+
+        archs = manifest["build"]["archs"]
+        for kind, (supported, images) in PACKAGE_TYPES.items():
+            artifact = manifest["artifacts"].get(kind) or {}
+            if not artifact.get("enabled"):
+                continue
+            if build_types and kind not in build_types.get(exporter, [kind]):
+                continue
+            for dist in artifact["targets"]:
+                if dist not in supported:
+                    continue
+                for arch in archs:
+                    units[kind].append(
+                        {
+                            "exporter": exporter,
+                            "arch": arch,
+                            "dist": dist,
+                            "image": images[dist],
+                        }
+                    )
+    return units
+
+
+def pack(kind, units, max_jobs=BUILD_PLAN_MAX_JOBS, durations=None):
+    """
+    Pack units into at most max_jobs jobs with balanced expected durations
+    (longest-processing-time-first). Returns the jobs in a stable order, each
+    as {"id", "name", "qemu", "expected_seconds", "units"}.
+    """
+    if not units:
+        return []
+
+    weighted = sorted(
+        ((expected_duration(kind, u, durations), u) for u in units),
+        key=lambda item: (
+            -item[0],
+            item[1]["exporter"],
+            item[1]["dist"],
+            item[1]["arch"],
+        ),
+    )
+    bins = [[] for _ in range(min(len(units), max_jobs))]
+    heap = [(0.0, i) for i in range(len(bins))]
+    for seconds, unit in weighted:
+        load, i = heapq.heappop(heap)
+        bins[i].append(unit)
+        heapq.heappush(heap, (load + seconds, i))
+    loads = {i: load for load, i in heap}
+
+    jobs = []
+    for i, job_units in enumerate(bins):
+        job_units.sort(key=lambda u: (u["exporter"], u["dist"], u["arch"]))
+        first = job_units[0]
+        name = f"{first['exporter']} ({first['dist']}/{first['arch']})"
+        if len(job_units) > 1:
+            name += f" +{len(job_units) - 1}"
+        jobs.append(
+            {
+                "id": f"{kind}-{i + 1:03d}",
+                "name": name,
+                "qemu": any(u["arch"] != "amd64" for u in job_units),
+                "expected_seconds": round(loads[i]),
+                "units": job_units,
+            }
+        )
+    return jobs
+
+
+def build_plan(
+    exporters,
+    max_jobs=BUILD_PLAN_MAX_JOBS,
+    durations=None,
+    exporters_dir=EXPORTERS_DIR,
+    build_types=None,
+):
+    """
+    Plan the RPM and DEB jobs for exporters.
+
+    Returns {"rpm": {"include": [jobs]}, "deb": {"include": [jobs]}}, ready
+    to be used as GitHub Actions matrices.
+    """
+    units = build_units(exporters, exporters_dir, build_types)
+    return {
+        kind: {"include": pack(kind, units[kind], max_jobs, durations)}
+        for kind in PACKAGE_TYPES
+    }
+
+
+def docker_exporters(exporters, build_types=None):
+    """Exporters whose Docker image has to be rebuilt."""
+    return [
+        e for e in exporters if not build_types or "docker" in build_types.get(e, [])
+    ]
+
+
+def summarize(plan):
+    lines = []
+    for kind, matrix in plan.items():
+        jobs = matrix["include"]
+        count = sum(len(job["units"]) for job in jobs)
+        longest = max((job["expected_seconds"] for job in jobs), default=0)
+        lines.append(
+            f"✓ {kind.upper()} plan: {count} unit(s) in {len(jobs)} job(s), "
+            f"longest job ~{longest // 60}m{longest % 60:02d}s"
+        )
+    return lines
+
+
+@click.command()
+@click.option(
+    "--exporters",
+    envvar="EXPORTERS_LIST",
+    help="JSON array of exporters to build "
+    "(default: the exporters the state manager finds out of date)",
+)
+@click.option(
+    "--build-types",
+    envvar="BUILD_TYPES",
+    help="JSON object of artifact types to build per exporter "
+    "(default: every enabled type)",
+)
+@click.option(
+    "--max-jobs",
+    type=click.IntRange(1, BUILD_PLAN_MAX_JOBS),
+    default=BUILD_PLAN_MAX_JOBS,
+    show_default=True,
+    help="Maximum number of jobs per package type",
+)
+@click.option(
+    "--durations",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON file of recorded unit durations in seconds",
+)
+@click.option(
+    "--exporters-dir",
+    default=EXPORTERS_DIR,
+    show_default=True,
+    help="Directory containing the exporter manifests",
+)
+def main(exporters, build_types, max_jobs, durations, exporters_dir):
+    """Plan the RPM and DEB build jobs and print them as JSON."""
+    if exporters:
+        exporters = json.loads(exporters)
+        build_types = json.loads(build_types) if build_types else None
+    else:
+        remote = state_manager.get_remote_entries(
+            os.environ.get("CATALOG_URL", DEFAULT_CATALOG_URL)
+        )
+        build_types = state_manager.exporters_to_build(
+            {name: item["version"] for name, item in remote.items()},
+            state_manager.get_local_state(exporters_dir),
+            os.environ.get("FORCE_REBUILD", "false").lower() == "true",
+            remote_fingerprints={
+                name: item["fingerprint"]
+                for name, item in remote.items()
+                if item.get("fingerprint")
+            },
+            local_fingerprints=state_manager.get_local_fingerprints(exporters_dir),
+        )
+        exporters = list(build_types)
+
+    if durations:
+        with open(durations) as f:
+            durations = json.load(f)
+
+    plan = build_plan(exporters, max_jobs, durations, exporters_dir, build_types)
+    for line in summarize(plan):
+        click.echo(line, err=True)
+
+    if "GITHUB_OUTPUT" in os.environ:
+        with open(os.environ["GITHUB_OUTPUT"], "a") as f:
+            for kind, matrix in plan.items():
+                f.write(f"{kind}_matrix={json.dumps(matrix)}\n")
+            docker = docker_exporters(exporters, build_types)
+            f.write(f"docker_exporters={json.dumps(docker)}\n")
+    else:
+        click.echo(json.dumps(plan, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Read manifest fields from shell scripts and workflows in a single call.
+
+Fields are dotted paths into the validated manifest (schema defaults
+applied), optionally renamed with NAME=PATH. Two derived fields are
+available: clean_version (version without the "v" prefix) and platforms
+(linux/<arch> for each build architecture).
+
+Shell output is meant for eval:
+
+    eval "$(python3 -m core.engine.query node_exporter \\
+        -f version=clean_version -f port=artifacts.docker.validation.port)"
+
+Booleans are printed as true/false, missing or null values as an empty
+string and lists of scalars space-separated. When several exporters are
+queried, each variable is prefixed with the exporter name
+(node_exporter_version=...). JSON output is {exporter: {name: value}}.
+"""
+
+import json
+import os
+import re
+import shlex
+
+import click
+from marshmallow import ValidationError
+
+from core.config.settings import EXPORTERS_DIR
+from core.engine.manifests import load_validated, manifest_paths
+from core.engine.schema import ManifestSchema
+
+DERIVED_FIELDS = {
+    "clean_version": lambda m: m["version"].lstrip("v"),
+    "platforms": lambda m: [f"linux/{arch}" for arch in m["build"]["archs"]],
+}
+
+
+def parse_field(spec):
+    """Split NAME=PATH (or PATH) into (shell-safe name, path)."""
+    name, _, path = spec.rpartition("=")
+    if not name:
+        name = path
+    root = path.split(".")[0]
+    if root not in ManifestSchema().fields and root not in DERIVED_FIELDS:
+        raise click.BadParameter(f"unknown manifest field '{root}'", param_hint=spec)
+    return re.sub(r"\W", "_", name), path
+
+
+def resolve(manifest, path):
+    """Value of a dotted path in a manifest, or None when it is not set."""
+    if path in DERIVED_FIELDS:
+        return DERIVED_FIELDS[path](manifest)
+    value = manifest
+    for key in path.split("."):
+        if isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        elif isinstance(value, dict) and key in value:
+            value = value[key]
+        else:
+            return None
+    return value
+
+
+def query(exporters, fields, exporters_dir=EXPORTERS_DIR):
+    """
+    Return {exporter: {name: value}} for the (name, path) fields.
+
+    Raises:
+        FileNotFoundError: An exporter has no manifest
+        marshmallow.ValidationError: A manifest does not match the schema
+    """
+    results = {}
+    for exporter in exporters:
+        manifest = load_validated(
+            os.path.join(exporters_dir, exporter, "manifest.yaml")
+        )
+        results[exporter] = {name: resolve(manifest, path) for name, path in fields}
+    return results
+
+
+def shell_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list) and all(isinstance(v, (str, int, float)) for v in value):
+        return " ".join(str(v) for v in value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return str(value)
+
+
+def format_shell(results):
+    prefixed = len(results) > 1
+    lines = []
+    for exporter, values in results.items():
+        prefix = re.sub(r"\W", "_", exporter) + "_" if prefixed else ""
+        for name, value in values.items():
+            lines.append(f"{prefix}{name}={shlex.quote(shell_value(value))}")
+    return "\n".join(lines)
+
+
+@click.command()
+@click.argument("exporters", nargs=-1)
+@click.option(
+    "--field",
+    "-f",
+    "fields",
+    multiple=True,
+    required=True,
+    help="Field to print, as PATH or NAME=PATH (e.g. port=artifacts.docker."
+    "validation.port)",
+)
+@click.option("--all", "all_exporters", is_flag=True, help="Query every exporter")
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["shell", "json"]),
+    default="shell",
+    show_default=True,
+)
+@click.option(
+    "--exporters-dir",
+    default=EXPORTERS_DIR,
+    show_default=True,
+    help="Directory containing the exporter manifests",
+)
+def main(exporters, fields, all_exporters, output_format, exporters_dir):
+    """Print manifest fields of one or more exporters."""
+    if all_exporters:
+        exporters = [
+            os.path.basename(os.path.dirname(path))
+            for path in manifest_paths(exporters_dir)
+        ]
+    if not exporters:
+        raise click.UsageError("Give at least one exporter, or --all")
+
+    try:
+        results = query(exporters, [parse_field(f) for f in fields], exporters_dir)
+    except FileNotFoundError as e:
+        raise click.ClickException(f"Manifest not found: {e.filename}") from e
+    except ValidationError as e:
+        raise click.ClickException(f"Invalid manifest: {e.messages}") from e
+
+    if output_format == "json":
+        click.echo(json.dumps(results, indent=2))
+    else:
+        click.echo(format_shell(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Pacing of GitHub API calls within the rate limit.
+
+GitHub answers every API call with X-RateLimit-Limit/Remaining/Reset headers,
+recorded per host and resource by http_client. A Budget spends the calls left
+in one resource ("core" for REST calls, "graphql" for GraphQL points) and
+keeps GITHUB_RATE_LIMIT_RESERVE of them for the jobs that run afterwards.
+Once the budget is spent it waits for the reset when it comes within
+max_wait; otherwise acquire() returns False, so the caller stops and keeps
+its partial results instead of sending calls that GitHub refuses (and that
+get retried) until the reset.
+
+    budget = Budget.for_github("core", token)
+    if budget.acquire():
+        http_client.get("https://api.github.com/...")
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from core.config import settings
+from core.engine import http_client
+
+API_URL = "https://api.github.com"
+
+
+def fetch_rate_limit(token=None):
+    """
+    State of every rate limit resource from the /rate_limit endpoint (which
+    costs no call): {resource: {"limit", "remaining", "reset"}}, or {} when
+    it cannot be fetched.
+    """
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    try:
+        r = http_client.get(f"{API_URL}/rate_limit", headers=headers, timeout=10)
+        r.raise_for_status()
+        return r.json().get("resources") or {}
+    except (requests.exceptions.RequestException, ValueError):
+        return {}
+
+
+class Budget:
+    """
+    Calls a scan may still send in one rate limit resource.
+
+    Thread-safe. The budget follows the answers received meanwhile (a 304
+    costs nothing, other clients may spend calls too); up to one call per
+    worker thread can be in flight unaccounted, so the reserve should exceed
+    the number of workers.
+    """
+
+    def __init__(self, resource="core", state=None, reserve=None, max_wait=None):
+        self.resource = resource
+        self.reserve = (
+            settings.GITHUB_RATE_LIMIT_RESERVE if reserve is None else reserve
+        )
+        self.max_wait = (
+            settings.GITHUB_RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        )
+        # None until GitHub tells: the scan is not held back
+        self.remaining = state["remaining"] if state else None
+        self.reset = state["reset"] if state else None
+        self.spent = 0
+        self._seen = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_github(cls, resource="core", token=None, **kwargs):
+        """Budget starting from the current state of the GitHub rate limit."""
+        return cls(resource, fetch_rate_limit(token).get(resource), **kwargs)
+
+    def _sync(self):
+        state = http_client.rate_limit(API_URL, self.resource)
+        if state and state != self._seen:
+            self._seen = state
+            self.remaining, self.reset = state["remaining"], state["reset"]
+
+    def acquire(self):
+        """
+        Take one call from the budget. Returns False, without waiting, when
+        the budget is spent until a reset more than max_wait seconds away.
+        """
+        while True:
+            with self._lock:
+                self._sync()
+                if self.remaining is None or self.remaining > self.reserve:
+                    if self.remaining is not None:
+                        self.remaining -= 1
+                    self.spent += 1
+                    return True
+                wait = self.reset - time.time() + 1
+                if wait > self.max_wait:
+                    return False
+            time.sleep(max(wait, 0))
+            with self._lock:
+                if self.reset is not None and time.time() >= self.reset:
+                    # A new window: the next answers tell its budget
+                    self.remaining = self.reset = None
+
+    def reset_time(self):
+        if self.reset is None:
+            return "unknown"
+        return f"{datetime.fromtimestamp(self.reset, timezone.utc):%H:%M} UTC"
+
+    def describe(self):
+        if self.remaining is None:
+            return f"{self.spent} {self.resource} call(s), rate limit unknown"
+        return (
+            f"{self.spent} {self.resource} call(s), {self.remaining} left "
+            f"until {self.reset_time()}"
+        )
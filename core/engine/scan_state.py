@@ -0,0 +1,124 @@
+"""
+When the watcher last checked each upstream, what it found, and how often the
+upstream releases.
+
+CACHE_DIR/watcher/scan-state.json holds {repo: {"checked_at": epoch seconds,
+"tag": latest release tag or None, "releases": [epoch seconds]}}, where
+releases are the times the watcher saw the latest tag change (the last
+WATCHER_RELEASE_HISTORY of them).
+
+The watcher looks the stalest repositories up first, so a scan cut short by
+the GitHub rate limit resumes, on the next run, with the upstreams it did not
+reach. The release history sets how often each upstream is polled: an
+upstream that releases weekly is checked every day or two, one that releases
+yearly every few days (polling_interval), and `watcher --due-only` only
+checks the upstreams whose next check is due.
+"""
+
+import contextlib
+import fcntl
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from core.config import settings
+
+
+def polling_interval(releases):
+    """
+    Seconds between two checks of an upstream given the times its releases
+    were observed: WATCHER_CADENCE_FRACTION of the median gap between them,
+    within [WATCHER_MIN_INTERVAL, WATCHER_MAX_INTERVAL], or
+    WATCHER_DEFAULT_INTERVAL until two releases have been observed.
+    """
+    if len(releases) < 2:
+        return settings.WATCHER_DEFAULT_INTERVAL
+    gap = statistics.median(b - a for a, b in zip(releases, releases[1:]))
+    interval = gap * settings.WATCHER_CADENCE_FRACTION
+    return min(
+        max(interval, settings.WATCHER_MIN_INTERVAL), settings.WATCHER_MAX_INTERVAL
+    )
+
+
+class ScanState:
+    """
+    JSON file of the last check of every upstream repository.
+
+    Updates re-read the file and are written atomically under an exclusive
+    lock, like core.engine.license_cache.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(
+            settings.CACHE_DIR, "watcher", "scan-state.json"
+        )
+
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def entries(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def stalest_first(self, repos):
+        """repos without duplicates, never checked ones first, then oldest."""
+        entries = self.entries()
+        repos = list(dict.fromkeys(repos))
+        return sorted(repos, key=lambda r: entries.get(r, {}).get("checked_at", 0))
+
+    def next_check(self, repo, entries=None):
+        """When repo is due for a check (0 when it never was checked)."""
+        entry = (self.entries() if entries is None else entries).get(repo)
+        if not entry:
+            return 0
+        return entry["checked_at"] + polling_interval(entry.get("releases", []))
+
+    def due(self, repos, now=None):
+        """The repos whose next check is due, stalest first."""
+        now = time.time() if now is None else now
+        entries = self.entries()
+        return [
+            r for r in self.stalest_first(repos) if self.next_check(r, entries) <= now
+        ]
+
+    def update(self, tags, now=None):
+        """
+        Record the {repo: tag} found just now; a tag that differs from the
+        previous one is a release observed now. A None tag (the upstream has
+        no release) records the check and keeps the previous tag.
+        """
+        if not tags:
+            return
+        now = time.time() if now is None else now
+        with self._locked():
+            entries = self.entries()
+            for repo, tag in tags.items():
+                entry = entries.get(repo, {})
+                releases = entry.get("releases", [])
+                if tag is None:
+                    tag = entry.get("tag")
+                elif entry.get("tag") and entry["tag"] != tag:
+                    releases = releases + [now]
+                entries[repo] = {
+                    "checked_at": now,
+                    "tag": tag,
+                    "releases": releases[-settings.WATCHER_RELEASE_HISTORY :],
+                }
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.path), prefix=".scan-state-"
+            )
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
@@ -84,6 +84,8 @@ class UpstreamSchema(Schema):
     archive_name = fields.Raw(
         allow_none=True
     )  # String pattern OR dict mapping arch to filename pattern
+    # Checksum file published with the release (default: common names are tried)
+    checksum_file = fields.Str(allow_none=True)
 
     # Local source support
     local_binary = fields.Str(allow_none=True)  # Path to raw binary
@@ -2,8 +2,6 @@ import glob
 import os
 
 import click
-import yaml
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from core.config.settings import (
     CORE_VERSION,
@@ -11,8 +9,9 @@ from core.config.settings import (
     PORTAL_VERSION,
     SUPPORTED_DEB_DISTROS,
     SUPPORTED_DISTROS,
-    TEMPLATES_DIR,
 )
+from core.engine import templating
+from core.engine.manifests import load_raw
 
 
 def load_release_urls(release_urls_dir):
@@ -149,230 +148,217 @@ def generate(output, repo_dir, release_urls_dir, skip_catalog):
 
     for manifest_path in manifests:
         try:
-            with open(manifest_path) as f:
-                data = yaml.safe_load(f)
+            data = load_raw(manifest_path)
+
+            data["version"] = data["version"].lstrip("v")
+
+            # Read README.md content if exists
+            readme_path = os.path.join(os.path.dirname(manifest_path), "README.md")
+            if os.path.exists(readme_path):
+                with open(readme_path) as r:
+                    data["readme"] = r.read()
+            else:
+                data["readme"] = "No documentation available."
+
+            # RPM Availability Tracking (GitHub Releases)
+            data["availability"] = {}
+            rpm_targets = data.get("artifacts", {}).get("rpm", {}).get("targets", [])
+            # Get supported architectures from manifest
+            supported_archs = data.get("build", {}).get("archs", ["amd64", "arm64"])
+            # Map to RPM arch names
+            arch_map = {"amd64": "x86_64", "arm64": "aarch64"}
+            rpm_archs = [arch_map[a] for a in supported_archs if a in arch_map]
+
+            for dist in SUPPORTED_DISTROS:
+                data["availability"][dist] = {}
+                for arch in ["x86_64", "aarch64"]:
+                    version = data["version"]
+                    rpm_name = data["name"]
+                    filename = f"{rpm_name}-{version}-1.{dist}.{arch}.rpm"
+
+                    # Check if architecture is supported
+                    if arch not in rpm_archs:
+                        data["availability"][dist][arch] = {
+                            "status": "na",
+                            "path": None,
+                        }
+                        continue
+
+                    # Check if package was actually uploaded (using release_urls artifacts)
+                    real_url = release_url_map.get((rpm_name, filename))
+
+                    # Map RPM arch back to manifest arch for build_attempts lookup
+                    arch_reverse_map = {"x86_64": "amd64", "aarch64": "arm64"}
+                    manifest_arch = arch_reverse_map.get(arch, arch)
+                    build_key = (rpm_name, manifest_arch, dist, "rpm")
+                    build_attempted = build_key in build_attempts
+
+                    if real_url:
+                        # Package was uploaded successfully
+                        data["availability"][dist][arch] = {
+                            "status": "success",
+                            "path": real_url,
+                        }
+                    elif build_attempted:
+                        # Build was attempted but no artifact uploaded = failed
+                        tag = f"{rpm_name}-v{version}"
+                        github_url = f"https://github.com/SckyzO/monitoring-hub/releases/download/{tag}/{filename}"
+                        data["availability"][dist][arch] = {
+                            "status": "failed",
+                            "path": github_url,
+                        }
+                    elif dist in rpm_targets:
+                        # Targeted but not yet attempted = pending
+                        tag = f"{rpm_name}-v{version}"
+                        github_url = f"https://github.com/SckyzO/monitoring-hub/releases/download/{tag}/{filename}"
+                        data["availability"][dist][arch] = {
+                            "status": "pending",
+                            "path": github_url,
+                        }
+                    else:
+                        # Not a target
+                        data["availability"][dist][arch] = {
+                            "status": "na",
+                            "path": None,
+                        }
+
+            # DEB Availability Tracking (GitHub Releases)
+            deb_targets = data.get("artifacts", {}).get("deb", {}).get("targets", [])
+            data["deb_availability"] = {}
+            # DEB uses same arch names as manifest (amd64, arm64)
+            deb_archs = supported_archs  # Already computed above
+
+            for dist in SUPPORTED_DEB_DISTROS:
+                data["deb_availability"][dist] = {}
+                for arch in ["amd64", "arm64"]:
+                    # DEB package names use dashes instead of underscores
+                    deb_name = data["name"].replace("_", "-")
+                    version = data["version"]
+                    filename = f"{deb_name}_{version}-1_{arch}.deb"
+
+                    # Check if architecture is supported
+                    if arch not in deb_archs:
+                        data["deb_availability"][dist][arch] = {
+                            "status": "na",
+                            "path": None,
+                        }
+                        continue
+
+                    # Check if package was actually uploaded (using release_urls artifacts)
+                    real_url = release_url_map.get((data["name"], filename))
+
+                    # DEB uses same arch names as manifest (amd64, arm64)
+                    build_key = (data["name"], arch, dist, "deb")
+                    build_attempted = build_key in build_attempts
+
+                    if real_url:
+                        # Package was uploaded successfully
+                        data["deb_availability"][dist][arch] = {
+                            "status": "success",
+                            "path": real_url,
+                        }
+                    elif build_attempted:
+                        # Build was attempted but no artifact uploaded = failed
+                        tag = f"{data['name']}-v{version}"
+                        github_url = f"https://github.com/SckyzO/monitoring-hub/releases/download/{tag}/{filename}"
+                        data["deb_availability"][dist][arch] = {
+                            "status": "failed",
+                            "path": github_url,
+                        }
+                    elif dist in deb_targets:
+                        # Targeted but not yet attempted = pending
+                        tag = f"{data['name']}-v{version}"
+                        github_url = f"https://github.com/SckyzO/monitoring-hub/releases/download/{tag}/{filename}"
+                        data["deb_availability"][dist][arch] = {
+                            "status": "pending",
+                            "path": github_url,
+                        }
+                    else:
+                        # Not a target
+                        data["deb_availability"][dist][arch] = {
+                            "status": "na",
+                            "path": None,
+                        }
+
+            # Aggregate Build Statuses
+            rpm_enabled = data.get("artifacts", {}).get("rpm", {}).get("enabled", True)
+            if rpm_enabled:
+                # Success only if ALL targeted distributions have at least one arch successful
+                targets = data.get("artifacts", {}).get("rpm", {}).get("targets", [])
+                failed_targets = []
+                pending_targets = []
+
+                for t in targets:
+                    has_success = any(
+                        data["availability"].get(t, {}).get(a, {}).get("status")
+                        == "success"
+                        for a in ["x86_64", "aarch64"]
+                    )
+                    has_pending = any(
+                        data["availability"].get(t, {}).get(a, {}).get("status")
+                        == "pending"
+                        for a in ["x86_64", "aarch64"]
+                    )
 
-                data["version"] = data["version"].lstrip("v")
+                    if not has_success:
+                        if has_pending:
+                            pending_targets.append(t)
+                        else:
+                            failed_targets.append(t)
 
-                # Read README.md content if exists
-                readme_path = os.path.join(os.path.dirname(manifest_path), "README.md")
-                if os.path.exists(readme_path):
-                    with open(readme_path) as r:
-                        data["readme"] = r.read()
+                if failed_targets:
+                    data["rpm_status"] = "failed"
+                elif pending_targets:
+                    data["rpm_status"] = "pending"
                 else:
-                    data["readme"] = "No documentation available."
-
-                # RPM Availability Tracking (GitHub Releases)
-                data["availability"] = {}
-                rpm_targets = (
-                    data.get("artifacts", {}).get("rpm", {}).get("targets", [])
-                )
-                # Get supported architectures from manifest
-                supported_archs = data.get("build", {}).get("archs", ["amd64", "arm64"])
-                # Map to RPM arch names
-                arch_map = {"amd64": "x86_64", "arm64": "aarch64"}
-                rpm_archs = [arch_map[a] for a in supported_archs if a in arch_map]
-
-                for dist in SUPPORTED_DISTROS:
-                    data["availability"][dist] = {}
-                    for arch in ["x86_64", "aarch64"]:
-                        version = data["version"]
-                        rpm_name = data["name"]
-                        filename = f"{rpm_name}-{version}-1.{dist}.{arch}.rpm"
-
-                        # Check if architecture is supported
-                        if arch not in rpm_archs:
-                            data["availability"][dist][arch] = {
-                                "status": "na",
-                                "path": None,
-                            }
-                            continue
-
-                        # Check if package was actually uploaded (using release_urls artifacts)
-                        real_url = release_url_map.get((rpm_name, filename))
-
-                        # Map RPM arch back to manifest arch for build_attempts lookup
-                        arch_reverse_map = {"x86_64": "amd64", "aarch64": "arm64"}
-                        manifest_arch = arch_reverse_map.get(arch, arch)
-                        build_key = (rpm_name, manifest_arch, dist, "rpm")
-                        build_attempted = build_key in build_attempts
-
-                        if real_url:
-                            # Package was uploaded successfully
-                            data["availability"][dist][arch] = {
-                                "status": "success",
-                                "path": real_url,
-                            }
-                        elif build_attempted:
-                            # Build was attempted but no artifact uploaded = failed
-                            tag = f"{rpm_name}-v{version}"
-                            github_url = f"https://github.com/SckyzO/monitoring-hub/releases/download/{tag}/{filename}"
-                            data["availability"][dist][arch] = {
-                                "status": "failed",
-                                "path": github_url,
-                            }
-                        elif dist in rpm_targets:
-                            # Targeted but not yet attempted = pending
-                            tag = f"{rpm_name}-v{version}"
-                            github_url = f"https://github.com/SckyzO/monitoring-hub/releases/download/{tag}/{filename}"
-                            data["availability"][dist][arch] = {
-                                "status": "pending",
-                                "path": github_url,
-                            }
-                        else:
-                            # Not a target
-                            data["availability"][dist][arch] = {
-                                "status": "na",
-                                "path": None,
-                            }
-
-                # DEB Availability Tracking (GitHub Releases)
-                deb_targets = (
-                    data.get("artifacts", {}).get("deb", {}).get("targets", [])
-                )
-                data["deb_availability"] = {}
-                # DEB uses same arch names as manifest (amd64, arm64)
-                deb_archs = supported_archs  # Already computed above
-
-                for dist in SUPPORTED_DEB_DISTROS:
-                    data["deb_availability"][dist] = {}
-                    for arch in ["amd64", "arm64"]:
-                        # DEB package names use dashes instead of underscores
-                        deb_name = data["name"].replace("_", "-")
-                        version = data["version"]
-                        filename = f"{deb_name}_{version}-1_{arch}.deb"
-
-                        # Check if architecture is supported
-                        if arch not in deb_archs:
-                            data["deb_availability"][dist][arch] = {
-                                "status": "na",
-                                "path": None,
-                            }
-                            continue
-
-                        # Check if package was actually uploaded (using release_urls artifacts)
-                        real_url = release_url_map.get((data["name"], filename))
-
-                        # DEB uses same arch names as manifest (amd64, arm64)
-                        build_key = (data["name"], arch, dist, "deb")
-                        build_attempted = build_key in build_attempts
-
-                        if real_url:
-                            # Package was uploaded successfully
-                            data["deb_availability"][dist][arch] = {
-                                "status": "success",
-                                "path": real_url,
-                            }
-                        elif build_attempted:
-                            # Build was attempted but no artifact uploaded = failed
-                            tag = f"{data['name']}-v{version}"
-                            github_url = f"https://github.com/SckyzO/monitoring-hub/releases/download/{tag}/{filename}"
-                            data["deb_availability"][dist][arch] = {
-                                "status": "failed",
-                                "path": github_url,
-                            }
-                        elif dist in deb_targets:
-                            # Targeted but not yet attempted = pending
-                            tag = f"{data['name']}-v{version}"
-                            github_url = f"https://github.com/SckyzO/monitoring-hub/releases/download/{tag}/{filename}"
-                            data["deb_availability"][dist][arch] = {
-                                "status": "pending",
-                                "path": github_url,
-                            }
-                        else:
-                            # Not a target
-                            data["deb_availability"][dist][arch] = {
-                                "status": "na",
-                                "path": None,
-                            }
-
-                # Aggregate Build Statuses
-                rpm_enabled = (
-                    data.get("artifacts", {}).get("rpm", {}).get("enabled", True)
-                )
-                if rpm_enabled:
-                    # Success only if ALL targeted distributions have at least one arch successful
-                    targets = (
-                        data.get("artifacts", {}).get("rpm", {}).get("targets", [])
+                    data["rpm_status"] = "success"
+            else:
+                data["rpm_status"] = "na"
+
+            # DEB Status
+            deb_enabled = data.get("artifacts", {}).get("deb", {}).get("enabled", False)
+            if deb_enabled:
+                targets = data.get("artifacts", {}).get("deb", {}).get("targets", [])
+                failed_targets = []
+                pending_targets = []
+
+                for t in targets:
+                    has_success = any(
+                        data["deb_availability"].get(t, {}).get(a, {}).get("status")
+                        == "success"
+                        for a in ["amd64", "arm64"]
                     )
-                    failed_targets = []
-                    pending_targets = []
-
-                    for t in targets:
-                        has_success = any(
-                            data["availability"].get(t, {}).get(a, {}).get("status")
-                            == "success"
-                            for a in ["x86_64", "aarch64"]
-                        )
-                        has_pending = any(
-                            data["availability"].get(t, {}).get(a, {}).get("status")
-                            == "pending"
-                            for a in ["x86_64", "aarch64"]
-                        )
-
-                        if not has_success:
-                            if has_pending:
-                                pending_targets.append(t)
-                            else:
-                                failed_targets.append(t)
-
-                    if failed_targets:
-                        data["rpm_status"] = "failed"
-                    elif pending_targets:
-                        data["rpm_status"] = "pending"
-                    else:
-                        data["rpm_status"] = "success"
-                else:
-                    data["rpm_status"] = "na"
-
-                # DEB Status
-                deb_enabled = (
-                    data.get("artifacts", {}).get("deb", {}).get("enabled", False)
-                )
-                if deb_enabled:
-                    targets = (
-                        data.get("artifacts", {}).get("deb", {}).get("targets", [])
+                    has_pending = any(
+                        data["deb_availability"].get(t, {}).get(a, {}).get("status")
+                        == "pending"
+                        for a in ["amd64", "arm64"]
                     )
-                    failed_targets = []
-                    pending_targets = []
-
-                    for t in targets:
-                        has_success = any(
-                            data["deb_availability"].get(t, {}).get(a, {}).get("status")
-                            == "success"
-                            for a in ["amd64", "arm64"]
-                        )
-                        has_pending = any(
-                            data["deb_availability"].get(t, {}).get(a, {}).get("status")
-                            == "pending"
-                            for a in ["amd64", "arm64"]
-                        )
-
-                        if not has_success:
-                            if has_pending:
-                                pending_targets.append(t)
-                            else:
-                                failed_targets.append(t)
-
-                    if failed_targets:
-                        data["deb_status"] = "failed"
-                    elif pending_targets:
-                        data["deb_status"] = "pending"
-                    else:
-                        data["deb_status"] = "success"
-                else:
-                    data["deb_status"] = "na"
 
-                data["docker_status"] = (
-                    "success"
-                    if data.get("artifacts", {}).get("docker", {}).get("enabled", False)
-                    else "na"
-                )
+                    if not has_success:
+                        if has_pending:
+                            pending_targets.append(t)
+                        else:
+                            failed_targets.append(t)
+
+                if failed_targets:
+                    data["deb_status"] = "failed"
+                elif pending_targets:
+                    data["deb_status"] = "pending"
+                else:
+                    data["deb_status"] = "success"
+            else:
+                data["deb_status"] = "na"
+
+            data["docker_status"] = (
+                "success"
+                if data.get("artifacts", {}).get("docker", {}).get("enabled", False)
+                else "na"
+            )
 
-                # Add build date from artifacts
-                data["build_date"] = build_dates.get(data["name"])
+            # Add build date from artifacts
+            data["build_date"] = build_dates.get(data["name"])
 
-                exporters_data.append(data)
+            exporters_data.append(data)
         except Exception as e:
             print(f"Error: {e}")
 
@@ -391,10 +377,7 @@ def generate(output, repo_dir, release_urls_dir, skip_catalog):
     categories_json = json.dumps(categories)
     security_stats_json = json.dumps(security_stats)
 
-    env = Environment(
-        loader=FileSystemLoader(TEMPLATES_DIR),
-        autoescape=select_autoescape(["html", "xml"]),
-    )
+    env = templating.get_environment("portal")
     template = env.get_template("index.html.j2")
     rendered = template.render(
         exporters=exporters_data,
@@ -13,18 +13,20 @@ import glob
 import json
 import os
 import subprocess
+from datetime import datetime, timezone
 from pathlib import Path
 
 import click
-import yaml
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from core.config.settings import (
     CORE_VERSION,
+    DEFAULT_CATALOG_URL,
     EXPORTERS_DIR,
     PORTAL_VERSION,
-    TEMPLATES_DIR,
 )
+from core.engine import fingerprint, planner, templating
+from core.engine.manifests import load_raw
+from core.engine.state_manager import get_remote_entries
 
 
 def load_or_aggregate_metadata(exporter_name, catalog_dir, manifest_path):
@@ -90,6 +92,73 @@ def load_or_aggregate_metadata(exporter_name, catalog_dir, manifest_path):
         return None
 
 
+def parse_build_date(value):
+    """Aware datetime of an ISO 8601 build date (UTC if no offset), or None."""
+    try:
+        date = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    return date if date.tzinfo else date.replace(tzinfo=timezone.utc)
+
+
+def built_artifact_types(
+    exporter_name, catalog_dir, exporters_dir=EXPORTERS_DIR, built_since=None
+):
+    """
+    Artifact types of an exporter that this build produced successfully.
+
+    A package type counts as built when every unit planned for it (see
+    core.engine.planner) left a catalog/<exporter>/<type>_<arch>_<dist>.json
+    with a success status; a failed or skipped unit leaves none. When the
+    catalog also holds earlier builds (the gh-pages one), built_since limits
+    it to the metadata with a later build_date.
+    """
+    exporter_dir = Path(catalog_dir) / exporter_name
+
+    def succeeded(filename):
+        try:
+            with open(exporter_dir / filename) as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if metadata.get("status") != "success":
+            return False
+        if built_since is None:
+            return True
+        build_date = parse_build_date(metadata.get("build_date"))
+        return build_date is not None and build_date >= built_since
+
+    built = set()
+    units = planner.build_units([exporter_name], exporters_dir)
+    for kind, kind_units in units.items():
+        if kind_units and all(
+            succeeded(f"{kind}_{unit['arch']}_{unit['dist']}.json")
+            for unit in kind_units
+        ):
+            built.add(kind)
+    if succeeded("docker.json"):
+        built.add("docker")
+    return built
+
+
+def published_fingerprint(local, previous, built):
+    """
+    Fingerprint to publish for an exporter: the local one for the artifact
+    types built by this run, the previously published one for the rest.
+
+    Types with neither are left out, and None is returned when no type is
+    known, so the state manager keeps trusting catalogs without fingerprints.
+    """
+    previous = previous or {}
+    published = {}
+    for artifact_type, digest in local.items():
+        if artifact_type in built:
+            published[artifact_type] = digest
+        elif previous.get(artifact_type):
+            published[artifact_type] = previous[artifact_type]
+    return published or None
+
+
 def convert_metadata_to_legacy_format(metadata, manifest):
     """
     Convert V3 metadata format to legacy format expected by portal template.
@@ -192,19 +261,40 @@ def load_security_stats(repo_dir):
     help="Skip catalog.json generation (only update portal HTML)",
     default=False,
 )
-def generate(output, repo_dir, catalog_dir, skip_catalog):
+@click.option(
+    "--catalog-url",
+    envvar="CATALOG_URL",
+    help="Deployed catalog index (previously published fingerprints)",
+    default=DEFAULT_CATALOG_URL,
+)
+@click.option(
+    "--built-since",
+    help="Start of this build (ISO 8601), when the catalog holds earlier builds",
+    default=None,
+)
+def generate(output, repo_dir, catalog_dir, skip_catalog, catalog_url, built_since):
     """
     Generate the portal using V3 granular catalog structure.
     """
+    if built_since is not None:
+        built_since_date = parse_build_date(built_since)
+        if built_since_date is None:
+            raise click.BadParameter(
+                f"not an ISO 8601 date: {built_since}", param_hint="--built-since"
+            )
+        built_since = built_since_date
     manifests = glob.glob(f"{EXPORTERS_DIR}/*/manifest.yaml")
     exporters_data = []
+    # Build input fingerprints, published so the next build can skip what
+    # did not change (see core.engine.state_manager)
+    fingerprints = {}
+    built = {}
 
     print(f"Found {len(manifests)} exporters")
 
     for manifest_path in manifests:
         try:
-            with open(manifest_path) as f:
-                manifest = yaml.safe_load(f)
+            manifest = load_raw(manifest_path)
 
             exporter_name = manifest["name"]
             manifest["version"] = manifest["version"].lstrip("v")
@@ -226,6 +316,13 @@ def generate(output, repo_dir, catalog_dir, skip_catalog):
             exporter_data = convert_metadata_to_legacy_format(metadata, manifest)
 
             exporters_data.append(exporter_data)
+            fingerprints[exporter_name] = fingerprint.compute(manifest_path)
+            built[exporter_name] = built_artifact_types(
+                exporter_name,
+                catalog_dir,
+                os.path.dirname(os.path.dirname(manifest_path)),
+                built_since,
+            )
 
         except Exception as e:
             print(f"Error processing {manifest_path}: {e}")
@@ -249,10 +346,7 @@ def generate(output, repo_dir, catalog_dir, skip_catalog):
     security_stats_json = json.dumps(security_stats)
 
     # Render portal HTML
-    env = Environment(
-        loader=FileSystemLoader(TEMPLATES_DIR),
-        autoescape=select_autoescape(["html", "xml"]),
-    )
+    env = templating.get_environment("portal")
     template = env.get_template("index.html.j2")
     rendered = template.render(
         exporters=exporters_data,
@@ -278,6 +372,9 @@ def generate(output, repo_dir, catalog_dir, skip_catalog):
         os.makedirs(catalog_output_dir, exist_ok=True)
 
         # 1. Generate lightweight index.json
+        # Only built artifact types get a new fingerprint: a failed unit keeps
+        # the previous one, so the next build retries it
+        previous = get_remote_entries(catalog_url)
         index_data = {
             "version": "3.0",
             "exporters": [
@@ -286,6 +383,11 @@ def generate(output, repo_dir, catalog_dir, skip_catalog):
                     "version": e["version"],
                     "category": e.get("category", "System"),
                     "last_updated": e.get("build_date"),
+                    "fingerprint": published_fingerprint(
+                        fingerprints.get(e["name"], {}),
+                        previous.get(e["name"], {}).get("fingerprint"),
+                        built.get(e["name"], set()),
+                    ),
                 }
                 for e in exporters_data
             ],
@@ -0,0 +1,86 @@
+"""
+Stage input files into a build directory without duplicating their content.
+
+Local binaries and extra files are read-only inputs of the package builds, so
+stage_file tries the cheapest way to make them appear in the build directory,
+in the order of STAGING_METHODS (MONITORING_HUB_STAGING):
+
+- reflink: a copy-on-write clone (FICLONE on Btrfs, XFS, ...). The staged
+  file is independent from its source and takes no extra space.
+- hardlink: the same inode, on the same filesystem. Permissions are shared
+  with the source, so a hard link is only used when the source already has
+  the wanted mode.
+- copy: a regular copy, always the last resort.
+
+The destination is removed first and never written through, so staging over
+a previous build cannot modify the source of a hard link.
+"""
+
+import contextlib
+import errno
+import fcntl
+import hashlib
+import os
+import shutil
+
+from core.config import settings
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+
+def _reflink(src, dst, mode):
+    with open(src, "rb") as f_src, open(dst, "xb") as f_dst:
+        try:
+            fcntl.ioctl(f_dst.fileno(), FICLONE, f_src.fileno())
+        except OSError:
+            f_dst.close()
+            os.remove(dst)
+            raise
+    shutil.copymode(src, dst)
+    if mode is not None:
+        os.chmod(dst, mode)
+
+
+def _hardlink(src, dst, mode):
+    if mode is not None and os.stat(src).st_mode & 0o7777 != mode:
+        raise OSError(errno.EPERM, "source permissions differ", src)
+    os.link(src, dst)
+
+
+_LINKERS = {"reflink": _reflink, "hardlink": _hardlink}
+
+
+def stage_file(src, dst, mode=None, methods=None):
+    """
+    Make src available at dst, replacing dst; with mode, dst gets these
+    permissions. Returns the method used: "reflink", "hardlink" or "copy".
+    """
+    methods = settings.STAGING_METHODS if methods is None else methods
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(dst)
+
+    for method in methods:
+        if method not in _LINKERS:
+            continue
+        try:
+            _LINKERS[method](src, dst, mode)
+            return method
+        except OSError:
+            continue
+
+    shutil.copy(src, dst)
+    if mode is not None:
+        os.chmod(dst, mode)
+    return "copy"
+
+
+def file_digest(path):
+    """{"sha256", "size"} of a staged file, in the build manifest format."""
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(block)
+            size += len(block)
+    return {"sha256": sha256.hexdigest(), "size": size}
@@ -2,36 +2,25 @@ import json
 import os
 import sys
 
-import requests
-import yaml
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
-
 from core.config.settings import DEFAULT_CATALOG_URL, EXPORTERS_DIR
+from core.engine import fingerprint, http_client
+from core.engine.manifests import load_raw
 
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=2, max=10),
-    retry=retry_if_exception_type(requests.exceptions.RequestException),
-    reraise=True,
-)
-def get_remote_catalog(catalog_url=DEFAULT_CATALOG_URL):
+def get_remote_entries(catalog_url=DEFAULT_CATALOG_URL):
     """
-    Fetches the current state of the repository from the deployed catalog.json.
-    Returns a dictionary keyed by exporter name with version info.
+    Fetches the deployed catalog index and returns its entries keyed by
+    exporter name ({} when the catalog cannot be fetched).
+
+    The index is revalidated with its ETag, so an unchanged catalog is read
+    from the HTTP cache instead of being downloaded again.
     """
     try:
         print(f"Fetching remote catalog from {catalog_url}...", file=sys.stderr)
-        r = requests.get(catalog_url, timeout=10)
+        r = http_client.get(catalog_url, timeout=10, conditional=True)
         if r.status_code == 200:
             data = r.json()
-            # Convert list to dict for easier lookup: {'node_exporter': '1.8.1', ...}
-            return {item["name"]: item["version"] for item in data.get("exporters", [])}
+            return {item["name"]: item for item in data.get("exporters", [])}
         else:
             print(
                 f"Warning: Remote catalog not found (Status {r.status_code}). Assuming empty state.",
@@ -46,6 +35,16 @@ def get_remote_catalog(catalog_url=DEFAULT_CATALOG_URL):
         return {}
 
 
+def get_remote_catalog(catalog_url=DEFAULT_CATALOG_URL):
+    """
+    Fetches the current state of the repository from the deployed catalog.json.
+    Returns a dictionary keyed by exporter name with version info.
+    """
+    # Convert list to dict for easier lookup: {'node_exporter': '1.8.1', ...}
+    entries = get_remote_entries(catalog_url)
+    return {name: item["version"] for name, item in entries.items()}
+
+
 def get_local_state(exporters_dir=EXPORTERS_DIR):
     """
     Reads all local manifest.yaml files to build the current desired state.
@@ -58,27 +57,53 @@ def get_local_state(exporters_dir=EXPORTERS_DIR):
         manifest_path = os.path.join(exporters_dir, exporter_name, "manifest.yaml")
         if os.path.exists(manifest_path):
             try:
-                with open(manifest_path) as f:
-                    data = yaml.safe_load(f)
-                    # Normalize version (strip 'v' prefix if present to match catalog standard)
-                    version = data["version"].lstrip("v")
-                    local_state[exporter_name] = version
+                data = load_raw(manifest_path)
+                # Normalize version (strip 'v' prefix if present to match catalog standard)
+                version = data["version"].lstrip("v")
+                local_state[exporter_name] = version
             except Exception as e:
                 print(f"Error reading {manifest_path}: {e}", file=sys.stderr)
     return local_state
 
 
-def main():
-    # Allow overriding catalog URL for testing or forks
-    catalog_url = os.environ.get("CATALOG_URL", DEFAULT_CATALOG_URL)
-    force_rebuild = os.environ.get("FORCE_REBUILD", "false").lower() == "true"
-    # Allow filtering by specific exporter if running manually
-    target_exporter = os.environ.get("TARGET_EXPORTER")
+def get_local_fingerprints(exporters_dir=EXPORTERS_DIR):
+    """
+    Computes the input fingerprints ({artifact_type: sha256}) of every local
+    exporter (see core.engine.fingerprint).
+    """
+    fingerprints = {}
+    if not os.path.isdir(exporters_dir):
+        return {}
 
-    remote_state = get_remote_catalog(catalog_url)
-    local_state = get_local_state()
+    for exporter_name in os.listdir(exporters_dir):
+        manifest_path = os.path.join(exporters_dir, exporter_name, "manifest.yaml")
+        if os.path.exists(manifest_path):
+            try:
+                fingerprints[exporter_name] = fingerprint.compute(manifest_path)
+            except Exception as e:
+                print(f"Error fingerprinting {manifest_path}: {e}", file=sys.stderr)
+    return fingerprints
+
+
+def exporters_to_build(
+    remote_state,
+    local_state,
+    force_rebuild=False,
+    target_exporter=None,
+    remote_fingerprints=None,
+    local_fingerprints=None,
+):
+    """
+    Compare the local manifests with the deployed catalog.
 
-    to_build = []
+    Returns {exporter: [artifact types to build]}. An exporter whose version
+    differs (or that is new) is fully rebuilt. With the same version, only
+    the artifact types whose input fingerprint changed are rebuilt; catalogs
+    without published fingerprints are trusted.
+    """
+    remote_fingerprints = remote_fingerprints or {}
+    local_fingerprints = local_fingerprints or {}
+    to_build = {}
 
     print("\n--- Smart Build Analysis ---", file=sys.stderr)
     for name, local_version in local_state.items():
@@ -86,10 +111,11 @@ def main():
             continue
 
         remote_version = remote_state.get(name)
+        all_types = sorted(local_fingerprints.get(name, fingerprint.ARTIFACT_TEMPLATES))
 
         if force_rebuild:
             print(f"[BUILD] {name}: Forced rebuild.", file=sys.stderr)
-            to_build.append(name)
+            to_build[name] = all_types
             continue
 
         if remote_version is None:
@@ -97,24 +123,62 @@ def main():
                 f"[BUILD] {name}: New exporter (Local: {local_version}).",
                 file=sys.stderr,
             )
-            to_build.append(name)
+            to_build[name] = all_types
         elif str(local_version) != str(remote_version):
             print(
                 f"[BUILD] {name}: Version update ({remote_version} -> {local_version}).",
                 file=sys.stderr,
             )
-            to_build.append(name)
+            to_build[name] = all_types
+        elif name in remote_fingerprints and name in local_fingerprints:
+            changed = fingerprint.changed_artifact_types(
+                local_fingerprints[name], remote_fingerprints[name]
+            )
+            if changed:
+                print(
+                    f"[BUILD] {name}: Inputs changed ({', '.join(changed)}).",
+                    file=sys.stderr,
+                )
+                to_build[name] = changed
+            else:
+                print(f"[SKIP]  {name}: Up to date ({local_version}).", file=sys.stderr)
         else:
             print(f"[SKIP]  {name}: Up to date ({local_version}).", file=sys.stderr)
 
+    return to_build
+
+
+def main():
+    # Allow overriding catalog URL for testing or forks
+    catalog_url = os.environ.get("CATALOG_URL", DEFAULT_CATALOG_URL)
+    force_rebuild = os.environ.get("FORCE_REBUILD", "false").lower() == "true"
+    # Allow filtering by specific exporter if running manually
+    target_exporter = os.environ.get("TARGET_EXPORTER")
+
+    remote_entries = get_remote_entries(catalog_url)
+    to_build = exporters_to_build(
+        {name: item["version"] for name, item in remote_entries.items()},
+        get_local_state(),
+        force_rebuild,
+        target_exporter,
+        remote_fingerprints={
+            name: item["fingerprint"]
+            for name, item in remote_entries.items()
+            if item.get("fingerprint")
+        },
+        local_fingerprints=get_local_fingerprints(),
+    )
+
     # Output for GitHub Actions
     # Use json.dumps to ensure it's a valid JSON string for the matrix
-    json_output = json.dumps(to_build)
+    json_output = json.dumps(list(to_build))
 
     # Write to GITHUB_OUTPUT if running in Actions, otherwise stdout
     if "GITHUB_OUTPUT" in os.environ:
         with open(os.environ["GITHUB_OUTPUT"], "a") as f:
             f.write(f"exporters={json_output}\n")
+            # Artifact types to rebuild per exporter (used by the build planner)
+            f.write(f"build_types={json.dumps(to_build)}\n")
             # Set build_needed to true if list is not empty, else false
             f.write(f"build_needed={'true' if to_build else 'false'}\n")
     else:
@@ -0,0 +1,144 @@
+"""
+Shared Jinja2 template loading for the builder and the portal generators.
+
+Every environment gets a FileSystemBytecodeCache under CACHE_DIR/templates,
+so a template is only compiled again when its source changes (the cache is
+keyed by template path and checked against the source checksum; the loader
+also reloads on mtime change within a process).
+
+The core templates can also be precompiled ahead of time:
+
+    python -m core.engine.templating [--output DIR]
+
+which writes one compiled module per template and profile. Batch and CI
+builds then load those modules instead of compiling anything. A precompiled
+set is only used while it still matches the template sources and the Jinja2
+version it was compiled with; otherwise loading falls back to the sources.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+
+import click
+import jinja2
+from jinja2 import (
+    ChoiceLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    ModuleLoader,
+    select_autoescape,
+)
+
+from core.config import settings
+
+# Autoescape extensions per kind of output. The compiled code depends on them,
+# so each profile has its own precompiled set.
+PROFILES = {
+    "packaging": ("html", "xml", "j2"),
+    "portal": ("html", "xml"),
+}
+
+_STAMP_FILE = "sources.json"
+
+
+def _bytecode_cache_dir():
+    return os.path.join(settings.CACHE_DIR, "templates", "bytecode")
+
+
+def _precompiled_dir(profile, root=None):
+    return os.path.join(root or settings.PRECOMPILED_TEMPLATES_DIR, profile)
+
+
+def _source_digests(template_dir):
+    digests = {}
+    for name in FileSystemLoader(template_dir).list_templates():
+        with open(os.path.join(template_dir, name), "rb") as f:
+            digests[name] = hashlib.sha256(f.read()).hexdigest()
+    return digests
+
+
+def _precompiled_is_current(path, template_dir):
+    try:
+        with open(os.path.join(path, _STAMP_FILE)) as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return stamp.get("jinja2") == jinja2.__version__ and stamp.get(
+        "templates"
+    ) == _source_digests(template_dir)
+
+
+def get_environment(profile, override_dirs=()):
+    """
+    Return the shared Environment for a profile ("packaging" or "portal").
+
+    Templates in override_dirs (e.g. exporters/<name>/templates) win over the
+    core templates. Environments are cached per profile and search path, so
+    each compiled template is reused for the life of the process.
+    """
+    return _environment(profile, tuple(override_dirs), settings.TEMPLATES_DIR)
+
+
+@functools.cache
+def _environment(profile, override_dirs, template_dir):
+    loaders = []
+    if override_dirs:
+        loaders.append(FileSystemLoader(list(override_dirs)))
+    precompiled = _precompiled_dir(profile)
+    if _precompiled_is_current(precompiled, template_dir):
+        loaders.append(ModuleLoader(precompiled))
+    loaders.append(FileSystemLoader(template_dir))
+
+    os.makedirs(_bytecode_cache_dir(), exist_ok=True)
+    return Environment(
+        loader=loaders[0] if len(loaders) == 1 else ChoiceLoader(loaders),
+        autoescape=select_autoescape(list(PROFILES[profile])),
+        bytecode_cache=FileSystemBytecodeCache(_bytecode_cache_dir()),
+    )
+
+
+def precompile(output=None):
+    """
+    Compile every core template for every profile into output
+    (default: settings.PRECOMPILED_TEMPLATES_DIR). Returns the number of
+    templates compiled per profile.
+    """
+    template_dir = settings.TEMPLATES_DIR
+    digests = _source_digests(template_dir)
+    for profile, extensions in PROFILES.items():
+        path = _precompiled_dir(profile, output)
+        shutil.rmtree(path, ignore_errors=True)
+        env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(list(extensions)),
+        )
+        env.compile_templates(path, zip=None, ignore_errors=False)
+        with open(os.path.join(path, _STAMP_FILE), "w") as f:
+            json.dump({"jinja2": jinja2.__version__, "templates": digests}, f, indent=2)
+    _environment.cache_clear()
+    return len(digests)
+
+
+@click.command()
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(file_okay=False),
+    help="Directory receiving the compiled templates "
+    "(default: MONITORING_HUB_PRECOMPILED_TEMPLATES or the cache dir)",
+)
+def main(output):
+    """Precompile the core Jinja2 templates for batch and CI builds."""
+    count = precompile(output)
+    target = output or settings.PRECOMPILED_TEMPLATES_DIR
+    click.echo(
+        f"Precompiled {count} template(s) x {len(PROFILES)} profile(s) into {target}"
+    )
+
+
+if __name__ == "__main__":
+    main()
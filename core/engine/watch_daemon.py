@@ -0,0 +1,408 @@
+"""
+Long-running watch daemon.
+
+    python -m core.engine.watch_daemon [--port 8787] [--scan-interval 900]
+
+The watcher and the state manager are one-shot commands: every run parses
+the manifests, fingerprints the exporters and fetches the catalog and the
+upstream releases again. The daemon keeps all of it in memory instead:
+
+- the manifests and their fingerprints, reloaded when the files of an
+  exporter (manifest.yaml, assets/, templates/) or the core templates
+  change, polled every --reload-interval seconds (a stat() per file);
+- a snapshot of the remote catalog, revalidated every --catalog-interval
+  seconds (a 304 while it is unchanged, see state_manager);
+- the latest release tag of every upstream, from the scan state, from GitHub
+  release webhooks and from lookups of the upstreams due for a check every
+  --scan-interval seconds (see watcher --due-only).
+
+It serves, on 127.0.0.1 by default:
+
+    GET  /plan      {"build": {exporter: [artifact types]}, "updates": [...]}:
+                    what the state manager would build and the upstream
+                    releases newer than the manifests, computed from memory
+    GET  /healthz   sizes of the in-memory state
+    POST /webhook   GitHub "release" event; signed with X-Hub-Signature-256
+                    when WATCH_DAEMON_WEBHOOK_SECRET is set
+
+Manifests are never rewritten: the daemon reports updates, the scan-updates
+workflow still opens the pull requests.
+"""
+
+import contextlib
+import hashlib
+import hmac
+import http.server
+import json
+import os
+import signal
+import threading
+import time
+
+import click
+from packaging.version import InvalidVersion
+from packaging.version import parse as parse_version
+
+from core.config import settings
+from core.config.settings import DEFAULT_CATALOG_URL
+from core.engine import fingerprint, watcher
+from core.engine.manifests import load_validated, manifest_paths
+from core.engine.rate_limit import Budget, fetch_rate_limit
+from core.engine.scan_state import ScanState
+from core.engine.state_manager import exporters_to_build, get_remote_entries
+
+# Release webhook actions after which the release is the latest one
+_RELEASE_ACTIONS = ("published", "released")
+
+
+def _signature(*roots):
+    """(path, mtime, size) of every file under roots, changes with any edit."""
+    files = []
+    for root in roots:
+        if os.path.isfile(root):
+            stat = os.stat(root)
+            files.append((root, stat.st_mtime_ns, stat.st_size))
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((path, stat.st_mtime_ns, stat.st_size))
+    return sorted(files)
+
+
+def _newer(tag, version):
+    try:
+        return parse_version(tag) > parse_version(str(version))
+    except InvalidVersion:
+        return False
+
+
+class WatchDaemon:
+    """
+    In-memory manifests, catalog snapshot and upstream tags.
+
+    Thread-safe: the refresh loop and the HTTP handlers share one lock, held
+    only to swap or copy the state.
+    """
+
+    def __init__(self, exporters_dir=None, catalog_url=DEFAULT_CATALOG_URL, token=None):
+        self.exporters_dir = exporters_dir or settings.EXPORTERS_DIR
+        self.catalog_url = catalog_url
+        self.token = token
+        self.webhook_secret = settings.WATCH_DAEMON_WEBHOOK_SECRET
+        self.scan_state = ScanState()
+        self.manifests = {}
+        self.fingerprints = {}
+        self.remote_entries = {}
+        self.latest = {
+            repo: entry["tag"]
+            for repo, entry in self.scan_state.entries().items()
+            if entry.get("tag")
+        }
+        self._signatures = {}
+        self._templates_signature = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def reload_manifests(self):
+        """
+        Re-read the exporters whose files changed since the last call.
+        Returns the names of the exporters added, changed or removed.
+        """
+        templates = _signature(settings.TEMPLATES_DIR)
+        templates_changed = templates != self._templates_signature
+        self._templates_signature = templates
+
+        signatures = {}
+        changed = {}
+        for path in manifest_paths(self.exporters_dir):
+            exporter_dir = os.path.dirname(path)
+            name = os.path.basename(exporter_dir)
+            signatures[name] = _signature(
+                path,
+                os.path.join(exporter_dir, "assets"),
+                os.path.join(exporter_dir, "templates"),
+            )
+            if not templates_changed and signatures[name] == self._signatures.get(name):
+                continue
+            try:
+                changed[name] = (load_validated(path), fingerprint.compute(path))
+            except Exception as e:
+                click.echo(f"Error reading {path}: {e}", err=True)
+                changed[name] = None
+
+        removed = set(self._signatures) - set(signatures)
+        self._signatures = signatures
+        with self._lock:
+            for name in removed:
+                self.manifests.pop(name, None)
+                self.fingerprints.pop(name, None)
+            for name, loaded in changed.items():
+                if loaded:
+                    self.manifests[name], self.fingerprints[name] = loaded
+                else:
+                    self.manifests.pop(name, None)
+                    self.fingerprints.pop(name, None)
+        return sorted(set(changed) | removed)
+
+    def refresh_catalog(self):
+        """
+        Revalidate the remote catalog snapshot. An empty answer (catalog
+        unreachable) keeps the previous snapshot.
+        """
+        entries = get_remote_entries(self.catalog_url)
+        if entries or not self.remote_entries:
+            with self._lock:
+                self.remote_entries = entries
+        return len(self.remote_entries)
+
+    def repos(self):
+        """{repo: [exporters]} of the GitHub upstreams."""
+        with self._lock:
+            manifests = dict(self.manifests)
+        repos = {}
+        for name, data in sorted(manifests.items()):
+            upstream = data.get("upstream", {})
+            if upstream.get("type") == "github":
+                repos.setdefault(upstream.get("repo"), []).append(name)
+        return repos
+
+    def record_releases(self, tags):
+        """Record the {repo: tag} found just now (None: no release found)."""
+        self.scan_state.update(tags)
+        with self._lock:
+            self.latest.update({repo: tag for repo, tag in tags.items() if tag})
+
+    def scan_due(self):
+        """Look up the upstreams due for a check, within the rate limit."""
+        due = self.scan_state.due(self.repos())
+        if not due:
+            return {}
+        limits = fetch_rate_limit(self.token)
+        budgets = {
+            resource: Budget(resource, limits.get(resource)) for resource in limits
+        }
+        latest = watcher.fetch_latest_releases(due, self.token, budgets=budgets)
+        self.record_releases(latest)
+        return latest
+
+    def verify_signature(self, body, signature):
+        """Whether body is signed with the webhook secret (always without one)."""
+        if not self.webhook_secret:
+            return True
+        expected = hmac.new(
+            self.webhook_secret.encode(), body, hashlib.sha256
+        ).hexdigest()
+        return hmac.compare_digest(f"sha256={expected}", signature or "")
+
+    def handle_release(self, payload):
+        """
+        Record the release of a GitHub "release" event payload. Returns
+        (repo, tag), or None when the event is not a new latest release of a
+        watched upstream.
+        """
+        release = payload.get("release") or {}
+        repo = (payload.get("repository") or {}).get("full_name")
+        tag = release.get("tag_name")
+        if (
+            payload.get("action") not in _RELEASE_ACTIONS
+            or release.get("draft")
+            or release.get("prerelease")
+            or not tag
+            or repo not in self.repos()
+        ):
+            return None
+        self.record_releases({repo: tag})
+        return repo, tag
+
+    def plan(self):
+        """
+        The build diff of the in-memory state: what the state manager would
+        build, and the upstream releases newer than the manifests.
+        """
+        with self._lock:
+            manifests = dict(self.manifests)
+            fingerprints = dict(self.fingerprints)
+            remote_entries = dict(self.remote_entries)
+            latest = dict(self.latest)
+
+        build = exporters_to_build(
+            {name: item["version"] for name, item in remote_entries.items()},
+            {
+                name: str(data["version"]).lstrip("v")
+                for name, data in manifests.items()
+            },
+            remote_fingerprints={
+                name: item["fingerprint"]
+                for name, item in remote_entries.items()
+                if item.get("fingerprint")
+            },
+            local_fingerprints=fingerprints,
+        )
+        updates = []
+        for name, data in sorted(manifests.items()):
+            repo = data.get("upstream", {}).get("repo")
+            tag = latest.get(repo)
+            if tag and _newer(tag, data["version"]):
+                updates.append(
+                    {
+                        "name": name,
+                        "repo": repo,
+                        "current": str(data["version"]),
+                        "latest": tag,
+                    }
+                )
+        return {"build": build, "updates": updates}
+
+    def health(self):
+        with self._lock:
+            return {
+                "manifests": len(self.manifests),
+                "catalog_exporters": len(self.remote_entries),
+                "upstreams": len(self.latest),
+            }
+
+    def run(
+        self,
+        reload_interval=settings.WATCH_DAEMON_RELOAD_INTERVAL,
+        catalog_interval=settings.WATCH_DAEMON_CATALOG_INTERVAL,
+        scan_interval=settings.WATCH_DAEMON_SCAN_INTERVAL,
+    ):
+        """Refresh the state until stop() is called."""
+        next_catalog = next_scan = 0
+        while not self._stop.is_set():
+            changed = self.reload_manifests()
+            if changed:
+                click.echo(f"Reloaded {len(changed)} exporter(s): {', '.join(changed)}")
+            now = time.monotonic()
+            if now >= next_catalog:
+                self.refresh_catalog()
+                next_catalog = now + catalog_interval
+            if scan_interval and now >= next_scan:
+                for repo, tag in self.scan_due().items():
+                    click.echo(f"Checked {repo}: {tag}")
+                next_scan = now + scan_interval
+            self._stop.wait(reload_interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def _reply(self, status, body):
+        content = json.dumps(body, indent=2).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        daemon = self.server.watch_daemon
+        if self.path == "/plan":
+            self._reply(200, daemon.plan())
+        elif self.path == "/healthz":
+            self._reply(200, daemon.health())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        daemon = self.server.watch_daemon
+        if self.path != "/webhook":
+            self._reply(404, {"error": "not found"})
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not daemon.verify_signature(body, self.headers.get("X-Hub-Signature-256")):
+            self._reply(401, {"error": "invalid signature"})
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._reply(400, {"error": "invalid JSON"})
+            return
+
+        event = self.headers.get("X-GitHub-Event", "release")
+        recorded = daemon.handle_release(payload) if event == "release" else None
+        if recorded:
+            self._reply(202, {"repo": recorded[0], "tag": recorded[1]})
+        else:
+            self._reply(200, {"ignored": event})
+
+    def log_message(self, format, *args):
+        click.echo(f"{self.address_string()} {format % args}", err=True)
+
+
+class WatchServer:
+    """HTTP endpoints of a WatchDaemon, served in a background thread."""
+
+    def __init__(self, daemon, host=None, port=None):
+        self.daemon = daemon
+        self.host = host or settings.WATCH_DAEMON_HOST
+        self.port = settings.WATCH_DAEMON_PORT if port is None else port
+        self.url = None
+        self._httpd = None
+
+    def __enter__(self):
+        self._httpd = http.server.ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.watch_daemon = self.daemon
+        self.url = f"http://{self.host}:{self._httpd.server_port}"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@click.command()
+@click.option("--host", default=settings.WATCH_DAEMON_HOST, show_default=True)
+@click.option("--port", type=int, default=settings.WATCH_DAEMON_PORT, show_default=True)
+@click.option("--token", envvar="GITHUB_TOKEN", help="GitHub API Token")
+@click.option(
+    "--catalog-url",
+    envvar="CATALOG_URL",
+    default=DEFAULT_CATALOG_URL,
+    show_default=True,
+)
+@click.option(
+    "--reload-interval",
+    type=click.FloatRange(min=0.1),
+    default=settings.WATCH_DAEMON_RELOAD_INTERVAL,
+    show_default=True,
+    help="Seconds between two polls of the exporter files",
+)
+@click.option(
+    "--catalog-interval",
+    type=click.FloatRange(min=1),
+    default=settings.WATCH_DAEMON_CATALOG_INTERVAL,
+    show_default=True,
+    help="Seconds between two revalidations of the remote catalog",
+)
+@click.option(
+    "--scan-interval",
+    type=click.FloatRange(min=0),
+    default=settings.WATCH_DAEMON_SCAN_INTERVAL,
+    show_default=True,
+    help="Seconds between two lookups of the upstreams due (0: webhooks only)",
+)
+def main(
+    host, port, token, catalog_url, reload_interval, catalog_interval, scan_interval
+):
+    """
+    Keep the manifests, catalog and upstream releases in memory and serve
+    /plan and /webhook.
+    """
+    daemon = WatchDaemon(catalog_url=catalog_url, token=token)
+    signal.signal(signal.SIGTERM, lambda *_args: daemon.stop())
+    with WatchServer(daemon, host, port) as server:
+        click.echo(f"Serving /plan and /webhook on {server.url}")
+        with contextlib.suppress(KeyboardInterrupt):
+            daemon.run(reload_interval, catalog_interval, scan_interval)
+    click.echo("Stopped.", err=True)
+
+
+if __name__ == "__main__":
+    main()
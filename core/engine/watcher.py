@@ -1,29 +1,59 @@
-import glob
+"""
+Upstream release watcher.
+
+    python -m core.engine.watcher [--update] [--jobs 8]
+
+The latest release of every GitHub upstream is looked up concurrently (up to
+--jobs requests in flight, sharing the pooled api.github.com session), so a
+scan takes about one round trip instead of one per exporter. With a token,
+the releases are asked for --batch-size repositories at a time in aliased
+GraphQL queries, so the whole fleet costs a handful of requests; the REST
+/releases/latest endpoint stays the fallback. The results are
+then reported in manifest order, and with --update every outdated manifest
+is rewritten in one batch once the scan is complete.
+
+The scan stays within the GitHub rate limit (core.engine.rate_limit): the
+stalest upstreams (core.engine.scan_state) are looked up first, and when the
+budget runs out the scan stops with the results it has; the upstreams it did
+not reach, like those whose lookup failed, are the stalest of the next run.
+
+With --due-only, an upstream is only looked up once its next check is due:
+upstreams that release often are polled often, quiet ones rarely (see
+core.engine.scan_state.polling_interval), so the scan can run frequently
+without spending the rate limit on upstreams that seldom change.
+"""
+
+import concurrent.futures
 import os
+from datetime import datetime, timezone
 
 import click
 import requests
 import yaml
 from marshmallow import ValidationError
 from packaging.version import parse as parse_version
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
+
+from core.config.settings import (
+    EXPORTERS_DIR,
+    WATCHER_CONCURRENCY,
+    WATCHER_GRAPHQL_BATCH_SIZE,
 )
+from core.engine import http_client
+from core.engine.manifests import load_validated, manifest_paths
+from core.engine.rate_limit import Budget, fetch_rate_limit
+from core.engine.scan_state import ScanState
 
-from core.config.settings import EXPORTERS_DIR
-from core.engine.schema import ManifestSchema
+GRAPHQL_URL = "https://api.github.com/graphql"
 
+# Lookups not sent because the rate limit budget ran out
+_SKIPPED = object()
+# Lookups that failed (network error, error status other than 404)
+_FAILED = object()
 
-def load_manifest(path):
-    with open(path) as f:
-        data = yaml.safe_load(f)
 
-    schema = ManifestSchema()
+def load_manifest(path):
     try:
-        return schema.load(data)
+        return load_validated(path)
     except ValidationError as err:
         click.echo(f"Validation error in {path}: {err.messages}", err=True)
         raise click.Abort() from err
@@ -37,26 +67,136 @@ def save_manifest(path, data):
         yaml.dump(data, f, sort_keys=False, default_flow_style=False)
 
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=2, max=10),
-    retry=retry_if_exception_type(requests.exceptions.RequestException),
-    reraise=True,
-)
 def get_latest_github_release(repo_name, token=None):
+    """
+    Latest release tag of a repository from the REST API, None when it has
+    no release (a 404), or _FAILED when the lookup failed.
+
+    The request is conditional (If-None-Match on the ETag of the previous
+    answer, see http_client): an unchanged release costs a 304, which GitHub
+    does not count against the rate limit, and its tag is read from the
+    cached body.
+    """
     headers = {"Accept": "application/vnd.github.v3+json"}
     if token:
         headers["Authorization"] = f"token {token}"
 
     url = f"https://api.github.com/repos/{repo_name}/releases/latest"
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10, conditional=True)
+        if response.status_code == 404:
+            return None
         response.raise_for_status()
         data = response.json()
         return data.get("tag_name")
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
         click.echo(f"Error fetching release for {repo_name}: {e}", err=True)
-        return None
+        return _FAILED
+
+
+def get_latest_github_releases(repos, token):
+    """
+    Latest release tags of repos, from one aliased GraphQL query.
+
+    Returns {repo: tag, or None when it has no release} for the repositories
+    GitHub answered for; the others (unknown repository, failed query) are
+    left out, for the REST fallback.
+    """
+    variables = {}
+    params = []
+    fields = []
+    for i, repo in enumerate(repos):
+        variables[f"o{i}"], _, variables[f"n{i}"] = repo.partition("/")
+        params.append(f"$o{i}: String!, $n{i}: String!")
+        fields.append(
+            f"r{i}: repository(owner: $o{i}, name: $n{i}) "
+            "{ latestRelease { tagName } }"
+        )
+    query = f"query({', '.join(params)}) {{ {' '.join(fields)} }}"
+
+    try:
+        response = http_client.post(
+            GRAPHQL_URL,
+            json={"query": query, "variables": variables},
+            headers={"Authorization": f"bearer {token}"},
+            timeout=10,
+        )
+        response.raise_for_status()
+        data = response.json().get("data") or {}
+    except (requests.exceptions.RequestException, ValueError) as e:
+        click.echo(f"Error fetching releases with GraphQL: {e}", err=True)
+        return {}
+
+    tags = {}
+    for i, repo in enumerate(repos):
+        node = data.get(f"r{i}")
+        if node is not None:
+            tags[repo] = (node.get("latestRelease") or {}).get("tagName")
+    return tags
+
+
+def _acquire(budgets, resource):
+    budget = (budgets or {}).get(resource)
+    return budget is None or budget.acquire()
+
+
+def fetch_latest_releases(
+    repos,
+    token=None,
+    jobs=WATCHER_CONCURRENCY,
+    batch_size=WATCHER_GRAPHQL_BATCH_SIZE,
+    budgets=None,
+):
+    """
+    Latest release tag of each repo (None when it has no release), looked
+    up by up to jobs threads. Returns {repo: tag} in the order of repos; the
+    repos whose lookup failed are missing from it.
+
+    With a token the repos are asked for batch_size at a time through GraphQL
+    (batch_size=0 disables it); the repos it did not answer for, and every
+    repo without a token, go through the REST endpoint.
+
+    budgets ({"core": Budget, "graphql": Budget}) bound the calls; the repos
+    left when they run out are not looked up and missing from the result.
+    """
+    repos = list(dict.fromkeys(repos))
+    if not repos:
+        return {}
+
+    def graphql_lookup(chunk):
+        if not _acquire(budgets, "graphql"):
+            return {}
+        return get_latest_github_releases(chunk, token)
+
+    def rest_lookup(repo):
+        if not _acquire(budgets, "core"):
+            return _SKIPPED
+        return get_latest_github_release(repo, token)
+
+    latest = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        if token and batch_size:
+            chunks = [
+                repos[i : i + batch_size] for i in range(0, len(repos), batch_size)
+            ]
+            for tags in pool.map(graphql_lookup, chunks):
+                latest.update(tags)
+        rest = [repo for repo in repos if repo not in latest]
+        latest.update(zip(rest, pool.map(rest_lookup, rest)))
+    return {
+        repo: latest[repo]
+        for repo in repos
+        if latest[repo] is not _SKIPPED and latest[repo] is not _FAILED
+    }
+
+
+def apply_updates(updates):
+    """Rewrite the manifests of [(path, data, tag)] with their new version."""
+    for manifest_path, data, tag in updates:
+        click.echo(f"  -> Updating {manifest_path} to {tag}...")
+        data["version"] = tag
+        save_manifest(manifest_path, data)
+    click.echo(f"  -> Updated {len(updates)} manifest(s).")
 
 
 @click.command()
@@ -64,28 +204,71 @@ def get_latest_github_release(repo_name, token=None):
     "--update/--no-update", default=False, help="Update manifest files in place"
 )
 @click.option("--token", envvar="GITHUB_TOKEN", help="GitHub API Token")
-def watch(update, token):
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=WATCHER_CONCURRENCY,
+    show_default=True,
+    help="Release lookups in flight at once",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=0),
+    default=WATCHER_GRAPHQL_BATCH_SIZE,
+    show_default=True,
+    help="Repositories per GraphQL query (0: one REST call per repository)",
+)
+@click.option(
+    "--due-only",
+    is_flag=True,
+    help="Only check the upstreams due for a check given their release cadence",
+)
+def watch(update, token, jobs, batch_size, due_only):
     """
     Scan manifests and check for upstream updates.
     """
-    manifests = glob.glob(f"{EXPORTERS_DIR}/*/manifest.yaml")
-    updates_found = False
-    updated_exporters = []
-
-    for manifest_path in manifests:
+    manifests = []
+    for manifest_path in manifest_paths(EXPORTERS_DIR):
         try:
             data = load_manifest(manifest_path)
+        except Exception as e:
+            click.echo(f"Error processing {manifest_path}: {e}", err=True)
+            continue
+        if data.get("upstream", {}).get("type") == "github":
+            manifests.append((manifest_path, data))
+
+    state = ScanState()
+    repos = [data["upstream"].get("repo") for _path, data in manifests]
+    due = state.due(repos) if due_only else state.stalest_first(repos)
+    not_due = set(repos) - set(due)
+    limits = fetch_rate_limit(token)
+    budgets = {resource: Budget(resource, limits.get(resource)) for resource in limits}
+    latest = fetch_latest_releases(
+        due,
+        token,
+        jobs,
+        batch_size,
+        budgets,
+    )
+    state.update(latest)
+
+    updates = []
+    for manifest_path, data in manifests:
+        try:
             name = data.get("name")
             current_version = str(data.get("version"))  # Ensure string
-            upstream = data.get("upstream", {})
-
-            if upstream.get("type") != "github":
+            repo = data["upstream"].get("repo")
+            if repo in not_due:
                 continue
-
-            repo = upstream.get("repo")
             click.echo(f"Checking {name} ({current_version}) against {repo}...")
 
-            latest_tag = get_latest_github_release(repo, token)
+            if repo not in latest:
+                click.echo(
+                    "  -> Skipped: lookup failed or GitHub API rate limit reached."
+                )
+                continue
+            latest_tag = latest[repo]
             if not latest_tag:
                 continue
 
@@ -95,29 +278,38 @@ def watch(update, token):
                     f"  -> New version available: {latest_tag} (Current: {current_version})",
                     fg="green",
                 )
-                updates_found = True
-
-                if update:
-                    click.echo(f"  -> Updating {manifest_path}...")
-                    data["version"] = latest_tag
-                    save_manifest(manifest_path, data)
-                    updated_exporters.append(name)
-                    click.echo("  -> Updated.")
+                updates.append((manifest_path, data, latest_tag))
             else:
                 click.echo("  -> Up to date.")
 
         except Exception as e:
             click.echo(f"Error processing {manifest_path}: {e}", err=True)
 
-    if updates_found and update:
+    skipped = len(set(due) - set(latest))
+    for budget in budgets.values():
+        if budget.spent:
+            click.echo(f"Rate limit: {budget.describe()}")
+    if skipped:
+        click.echo(
+            f"{skipped} upstream(s) not checked (failed lookup or rate limit), "
+            "they are checked first next run."
+        )
+    if not_due:
+        next_check = min(state.next_check(repo) for repo in not_due)
+        click.echo(
+            f"{len(not_due)} upstream(s) not due yet, next check at "
+            f"{datetime.fromtimestamp(next_check, timezone.utc):%Y-%m-%d %H:%M} UTC."
+        )
+
+    if updates and update:
+        apply_updates(updates)
         click.echo("Updates applied.")
-        if updated_exporters:
-            names_str = ", ".join(sorted(updated_exporters))
-            github_output = os.environ.get("GITHUB_OUTPUT")
-            if github_output:
-                with open(github_output, "a") as f:
-                    f.write(f"updated_names={names_str}\n")
-    elif updates_found:
+        names_str = ", ".join(sorted(data["name"] for _path, data, _tag in updates))
+        github_output = os.environ.get("GITHUB_OUTPUT")
+        if github_output:
+            with open(github_output, "a") as f:
+                f.write(f"updated_names={names_str}\n")
+    elif updates:
         click.echo("Updates available. Run with --update to apply.")
     else:
         click.echo("All exporters are up to date.")
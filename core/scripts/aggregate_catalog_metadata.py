@@ -20,7 +20,10 @@ import sys
 from pathlib import Path
 from typing import Any, Dict, List
 
-import yaml
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.engine.manifests import load_raw
 
 
 def load_manifest(manifest_path: Path) -> Dict[str, Any]:
@@ -29,8 +32,7 @@ def load_manifest(manifest_path: Path) -> Dict[str, Any]:
         print(f"Warning: Manifest not found: {manifest_path}")
         return {}
 
-    with open(manifest_path) as f:
-        return yaml.safe_load(f)
+    return load_raw(manifest_path)
 
 
 def load_artifacts(exporter_dir: Path) -> List[Dict[str, Any]]:
@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 import json
+import os
 import shutil
 import subprocess
+import sys
 from pathlib import Path
 
 import click
-import requests
 import yaml
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from core.engine import http_client
+from core.engine.rate_limit import Budget
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 EXPORTERS_DIR = PROJECT_ROOT / "exporters"
 REFERENCE_FILE = PROJECT_ROOT / "manifest.reference.yaml"
@@ -16,7 +22,9 @@ REFERENCE_FILE = PROJECT_ROOT / "manifest.reference.yaml"
 def get_github_info(repo_name):
     """
     Fetches latest release info from GitHub.
-    Uses 'gh' CLI if available, otherwise falls back to requests.
+    Uses 'gh' CLI if available, otherwise falls back to the GitHub API
+    (authenticated with GITHUB_TOKEN when set), unless its rate limit is
+    exhausted.
     """
     gh_path = shutil.which("gh")
     data = None
@@ -38,13 +46,23 @@ def get_github_info(repo_name):
             result = subprocess.run(cmd, capture_output=True, text=True, check=True)
             data = json.loads(result.stdout)
         except Exception as e:
-            click.secho(f"⚠️ 'gh' failed: {e}. Falling back to requests...", fg="yellow")
+            click.secho(f"⚠️ 'gh' failed: {e}. Falling back to API...", fg="yellow")
 
     if not data:
         url = f"https://api.github.com/repos/{repo_name}/releases/latest"
+        token = os.environ.get("GITHUB_TOKEN")
+        budget = Budget.for_github("core", token, reserve=0, max_wait=0)
+        if not budget.acquire():
+            click.secho(
+                f"⚠️ GitHub API rate limit reached until {budget.reset_time()}, "
+                "set GITHUB_TOKEN or retry later.",
+                fg="red",
+            )
+            return None
+        headers = {"Authorization": f"token {token}"} if token else {}
         try:
             click.echo(f"🔍 Fetching latest release info from {repo_name} via API...")
-            resp = requests.get(url, timeout=5)
+            resp = http_client.get(url, headers=headers, timeout=5)
             resp.raise_for_status()
             data = resp.json()
             # Standardize 'gh' output to match API for 'tagName'
@@ -17,7 +17,10 @@ import tempfile
 from pathlib import Path
 from typing import Dict, List
 
-import requests
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.engine import http_client
 
 # Mapping from our dist names to Debian/Ubuntu codenames
 CODENAME_MAP = {
@@ -43,7 +46,7 @@ def get_deb_metadata(url: str, local_cache: Path) -> Dict:
         deb_path = cache_file
     else:
         print(f"Downloading DEB: {url}")
-        response = requests.get(url, timeout=60)
+        response = http_client.get(url, timeout=60)
         response.raise_for_status()
 
         cache_file.write_bytes(response.content)
@@ -29,7 +29,10 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict
 
-import requests
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.engine import http_client
 
 
 def get_rpm_metadata(url: str, cache_dir: Path) -> Dict[str, Any]:
@@ -46,7 +49,7 @@ def get_rpm_metadata(url: str, cache_dir: Path) -> Dict[str, Any]:
         rpm_path = cache_file
     else:
         print(f"Downloading RPM: {url}")
-        response = requests.get(url, timeout=120)
+        response = http_client.get(url, timeout=120)
         response.raise_for_status()
         cache_file.write_bytes(response.content)
         rpm_path = cache_file
@@ -91,7 +94,7 @@ def get_deb_metadata(url: str, cache_dir: Path) -> Dict[str, Any]:
         deb_path = cache_file
     else:
         print(f"Downloading DEB: {url}")
-        response = requests.get(url, timeout=120)
+        response = http_client.get(url, timeout=120)
         response.raise_for_status()
         cache_file.write_bytes(response.content)
         deb_path = cache_file
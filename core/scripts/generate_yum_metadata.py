@@ -18,7 +18,10 @@ import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Dict, List
 
-import requests
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.engine import http_client
 
 
 def get_rpm_metadata(url: str, local_cache: Path) -> Dict:
@@ -36,7 +39,7 @@ def get_rpm_metadata(url: str, local_cache: Path) -> Dict:
         rpm_path = cache_file
     else:
         print(f"Downloading RPM: {url}")
-        response = requests.get(url, timeout=60)
+        response = http_client.get(url, timeout=60)
         response.raise_for_status()
 
         cache_file.write_bytes(response.content)
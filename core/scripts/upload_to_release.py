@@ -17,9 +17,19 @@ from typing import Dict, List
 
 import requests
 
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.engine import http_client
+
 
 def retry_with_backoff(func, max_retries=5, initial_delay=15):
-    """Retry function with exponential backoff and jitter for transient errors."""
+    """
+    Retry function with exponential backoff and jitter for transient errors.
+    A Retry-After header on the failed response takes precedence if longer.
+    func is expected to send its request with http_client's retries disabled,
+    so it is only retried here.
+    """
     for attempt in range(max_retries):
         try:
             return func()
@@ -54,7 +64,9 @@ def retry_with_backoff(func, max_retries=5, initial_delay=15):
                 base_delay = initial_delay * (2**attempt)
                 # Add jitter (±20%) to avoid thundering herd
                 jitter = base_delay * 0.2 * (2 * random.random() - 1)
-                delay = base_delay + jitter
+                delay = max(
+                    base_delay + jitter, http_client.retry_after(e.response) or 0
+                )
                 print(
                     f"Attempt {attempt + 1} failed with HTTP {e.response.status_code}, "
                     f"retrying in {delay:.1f}s..."
@@ -81,7 +93,7 @@ def get_or_create_release(repo: str, tag: str, token: str, exporter_name: str) -
 
     # Check if release exists
     url = f"https://api.github.com/repos/{repo}/releases/tags/{tag}"
-    response = requests.get(url, headers=headers, timeout=30)
+    response = http_client.get(url, headers=headers, timeout=30)
 
     if response.status_code == 200:
         print(f"Release {tag} already exists")
@@ -98,7 +110,7 @@ def get_or_create_release(repo: str, tag: str, token: str, exporter_name: str) -
             delete_url = (
                 f"https://api.github.com/repos/{repo}/releases/{release_data['id']}"
             )
-            requests.delete(delete_url, headers=headers, timeout=30)
+            http_client.delete(delete_url, headers=headers, timeout=30)
             # Continue to create new release below
         else:
             return release_data
@@ -114,7 +126,7 @@ def get_or_create_release(repo: str, tag: str, token: str, exporter_name: str) -
         "prerelease": False,
     }
 
-    response = requests.post(create_url, headers=headers, json=data, timeout=30)
+    response = http_client.post(create_url, headers=headers, json=data, timeout=30)
     response.raise_for_status()
     print(f"Created release {tag}")
     return response.json()
@@ -127,7 +139,7 @@ def get_release_by_id(repo: str, release_id: int, token: str) -> Dict:
         "Accept": "application/vnd.github.v3+json",
     }
     url = f"https://api.github.com/repos/{repo}/releases/{release_id}"
-    response = requests.get(url, headers=headers, timeout=30)
+    response = http_client.get(url, headers=headers, timeout=30)
     response.raise_for_status()
     return response.json()
 
@@ -178,7 +190,7 @@ def upload_asset(release: Dict, file_path: Path, token: str, repo: str) -> Dict:
                 f"(local: {file_size}, remote: {existing_size}), replacing..."
             )
             delete_url = f"https://api.github.com/repos/{repo}/releases/assets/{existing_asset['id']}"
-            delete_response = requests.delete(
+            delete_response = http_client.delete(
                 delete_url,
                 headers={"Authorization": f"token {token}"},
                 timeout=30,
@@ -204,8 +216,15 @@ def upload_asset(release: Dict, file_path: Path, token: str, repo: str) -> Dict:
         with open(file_path, "rb") as f:
             params = {"name": file_name}
             # Use longer timeout for large files: (connect timeout, read timeout)
-            response = requests.post(
-                upload_url, headers=headers, params=params, data=f, timeout=(30, 600)
+            # Retried by retry_with_backoff, which reopens the file, not by
+            # the pooled session
+            response = http_client.post(
+                upload_url,
+                headers=headers,
+                params=params,
+                data=f,
+                timeout=(30, 600),
+                retries=False,
             )
             response.raise_for_status()
             return response.json()
@@ -9,12 +9,10 @@ Usage:
 import sys
 from pathlib import Path
 
-import yaml
-
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from core.engine.schema import ManifestSchema
+from core.engine.manifests import validation_errors
 
 
 def main():
@@ -26,15 +24,11 @@ def main():
     exporter_name = Path(manifest_path).parent.name
 
     try:
-        with open(manifest_path) as f:
-            data = yaml.safe_load(f)
+        errors = validation_errors(manifest_path)
     except Exception as e:
         print(f"❌ Failed to load {manifest_path}: {e}")
         sys.exit(1)
 
-    schema = ManifestSchema()
-    errors = schema.validate(data)
-
     if errors:
         print(f"❌ Validation failed for {exporter_name}:")
         for field, msgs in errors.items():
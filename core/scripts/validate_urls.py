@@ -18,6 +18,8 @@ from urllib.parse import quote
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from core.config.settings import EXPORTERS_DIR, ARCH_MAP
+from core.engine import http_client
+from core.engine.manifests import load_raw
 
 
 def normalize_version(version: str) -> str:
@@ -75,7 +77,7 @@ def validate_url(url: str, timeout: int = 10) -> Dict[str, Any]:
         Dictionary with status, status_code, and error info
     """
     try:
-        response = requests.head(url, timeout=timeout, allow_redirects=True)
+        response = http_client.head(url, timeout=timeout, allow_redirects=True)
         return {
             "status": "success" if response.status_code == 200 else "failed",
             "status_code": response.status_code,
@@ -89,8 +91,7 @@ def validate_url(url: str, timeout: int = 10) -> Dict[str, Any]:
 
 def load_manifest(manifest_path: Path) -> Dict[str, Any]:
     """Load and parse YAML manifest."""
-    with open(manifest_path, "r") as f:
-        return yaml.safe_load(f)
+    return load_raw(manifest_path)
 
 
 def validate_exporter(manifest_path: Path, architectures: List[str]) -> Dict[str, Any]:
@@ -112,3 +112,21 @@ def set_pythonpath(monkeypatch, tmp_path):
     """Ensure PYTHONPATH is set correctly for imports."""
     project_root = Path(__file__).parent.parent.parent
     monkeypatch.setenv("PYTHONPATH", str(project_root))
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(monkeypatch, tmp_path):
+    """Keep on-disk caches (templates, manifests, HTTP...) out of the user's home."""
+    from core.config import settings
+    from core.engine import manifests, templating
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(settings, "CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(
+        settings, "PRECOMPILED_TEMPLATES_DIR", str(cache_dir / "templates" / "compiled")
+    )
+    templating._environment.cache_clear()
+    manifests.clear_memory_cache()
+    yield cache_dir
+    templating._environment.cache_clear()
+    manifests.clear_memory_cache()
@@ -0,0 +1,163 @@
+"""
+Unit tests for core.engine.archive module.
+"""
+
+import gzip
+import io
+import os
+import tarfile
+
+from core.engine.archive import ChunkReader, extract_binaries
+
+
+def make_tarball(members):
+    """
+    Build an in-memory .tar.gz from a {name: bytes} mapping; a
+    ("symlink" | "hardlink", target) value adds a link member.
+    """
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            if isinstance(content, tuple):
+                kind, info.linkname = content
+                info.type = tarfile.SYMTYPE if kind == "symlink" else tarfile.LNKTYPE
+                tar.addfile(info)
+                continue
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def chunked(data, size=1024):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class TestExtractBinaries:
+    """Tests for extract_binaries function."""
+
+    def test_extracts_nested_binaries_flat(self, temp_dir):
+        """Nested members are written to the root of output_dir, others skipped."""
+        archive = make_tarball(
+            {
+                "exporter-1.0.0/LICENSE": b"license",
+                "exporter-1.0.0/exporter": b"main",
+                "exporter-1.0.0/tool": b"tool",
+            }
+        )
+
+        found = extract_binaries(
+            io.BytesIO(archive), "x.tar.gz", ["exporter", "tool"], str(temp_dir)
+        )
+
+        assert found == ["exporter", "tool"]
+        assert (temp_dir / "exporter").read_bytes() == b"main"
+        assert (temp_dir / "tool").read_bytes() == b"tool"
+        assert sorted(os.listdir(temp_dir)) == ["exporter", "tool"]
+        assert os.access(temp_dir / "exporter", os.X_OK)
+
+    def test_stops_reading_once_all_found(self, temp_dir):
+        """The stream is not consumed past the last wanted member."""
+        archive = make_tarball(
+            {"pkg/exporter": b"main", "pkg/big.bin": os.urandom(512 * 1024)}
+        )
+        chunks = chunked(archive)
+        consumed = []
+
+        def source():
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        extract_binaries(ChunkReader(source()), "x.tar.gz", ["exporter"], str(temp_dir))
+
+        assert len(consumed) < len(chunks)
+
+    def test_missing_binary_not_reported(self, temp_dir):
+        """Binaries absent from the archive are left out of the result."""
+        archive = make_tarball({"pkg/exporter": b"main"})
+
+        found = extract_binaries(
+            io.BytesIO(archive), "x.tar.gz", ["exporter", "tool"], str(temp_dir)
+        )
+
+        assert found == ["exporter"]
+
+    def test_symlinked_binary_resolved_in_stream(self, temp_dir):
+        """A link to a later member is extracted as that member streams by."""
+        archive = make_tarball(
+            {
+                "exporter-1.2.3/bin/exporter": ("symlink", "../exporter-1.2.3"),
+                "exporter-1.2.3/tool": ("symlink", "tool-1.2.3"),
+                "exporter-1.2.3/tool-1.2.3": b"tool",
+                "exporter-1.2.3/exporter-1.2.3": b"main",
+            }
+        )
+
+        found = extract_binaries(
+            ChunkReader(chunked(archive)),
+            "exporter.tar.gz",
+            ["exporter", "tool"],
+            str(temp_dir),
+        )
+
+        assert found == ["tool", "exporter"]
+        assert (temp_dir / "exporter").read_bytes() == b"main"
+        assert (temp_dir / "tool").read_bytes() == b"tool"
+        assert not (temp_dir / "exporter-1.2.3").exists()
+
+    def test_link_to_earlier_member(self, temp_dir):
+        """A seekable archive is read again for links to members already read."""
+        archive = make_tarball(
+            {
+                "dist/exporter-1.2.3": b"main",
+                "dist/exporter": ("hardlink", "dist/exporter-1.2.3"),
+                "dist/tool-1.2.3": b"tool",
+                "dist/tool": ("symlink", "tool-1.2.3"),
+            }
+        )
+
+        found = extract_binaries(
+            io.BytesIO(archive), "exporter.tar.gz", ["exporter", "tool"], str(temp_dir)
+        )
+        streamed = extract_binaries(
+            ChunkReader(chunked(archive)),
+            "exporter.tar.gz",
+            ["exporter"],
+            str(temp_dir / "streamed"),
+        )
+
+        assert sorted(found) == ["exporter", "tool"]
+        assert (temp_dir / "exporter").read_bytes() == b"main"
+        assert (temp_dir / "tool").read_bytes() == b"tool"
+        # Forward-only: left to the caller, which has the archive saved
+        assert streamed == []
+
+    def test_single_gz_binary(self, temp_dir):
+        """A plain .gz asset is decompressed to the first binary name."""
+        stream = io.BytesIO(gzip.compress(b"binary"))
+
+        found = extract_binaries(stream, "exporter.gz", ["exporter"], str(temp_dir))
+
+        assert found == ["exporter"]
+        assert (temp_dir / "exporter").read_bytes() == b"binary"
+
+
+class TestChunkReader:
+    """Tests for ChunkReader."""
+
+    def test_drain_consumes_every_chunk(self):
+        """Reading part of the stream then draining pulls every chunk."""
+        consumed = []
+
+        def source():
+            for chunk in (b"abc", b"def", b"ghi"):
+                consumed.append(chunk)
+                yield chunk
+
+        reader = ChunkReader(source())
+
+        assert reader.read(2) == b"ab"
+        reader.drain()
+
+        assert consumed == [b"abc", b"def", b"ghi"]
@@ -0,0 +1,121 @@
+"""
+Unit tests for core.engine.benchmark module.
+"""
+
+import json
+import tarfile
+
+import requests
+from click.testing import CliRunner
+
+from core.engine.benchmark import (
+    KiB,
+    ReleaseServer,
+    main,
+    make_asset,
+    publish,
+    regressions,
+    run_benchmarks,
+)
+
+TINY_CASES = {
+    "tar-4k-20": {
+        "kind": "download",
+        "format": "tar.gz",
+        "size": 4 * KiB,
+        "members": 20,
+    },
+    "gz-4k": {"kind": "download", "format": "gz", "size": 4 * KiB},
+    "local-4k": {"kind": "local", "size": 4 * KiB},
+}
+
+
+def test_make_asset_nests_members_before_the_binary(temp_dir):
+    path = make_asset(TINY_CASES["tar-4k-20"], str(temp_dir))
+
+    with tarfile.open(path) as tar:
+        names = tar.getnames()
+    assert len(names) == 20
+    assert names[-1] == "bench_exporter/bin/bench_exporter"
+    assert names[12] == "bench_exporter/docs/d2/d1/f12.txt"
+    # Generated once, then reused
+    assert make_asset(TINY_CASES["tar-4k-20"], str(temp_dir)) == path
+
+
+def test_release_server_serves_assets_and_checksums(temp_dir):
+    asset = make_asset(TINY_CASES["gz-4k"], str(temp_dir / "assets"))
+    publish("gz-4k", TINY_CASES["gz-4k"], asset, str(temp_dir / "releases"))
+
+    with ReleaseServer(str(temp_dir / "releases")) as server:
+        base = f"{server.url}/bench/gz-4k/releases/download/v1.0.0"
+        checksums = requests.get(f"{base}/sha256sums.txt", timeout=5).text
+        response = requests.get(
+            f"{base}/bench_exporter-1.0.0.linux-amd64.gz", timeout=5
+        )
+
+    assert checksums.endswith("  bench_exporter-1.0.0.linux-amd64.gz\n")
+    assert response.content == (temp_dir / "assets" / "4096-1.gz").read_bytes()
+
+
+def test_run_benchmarks(temp_dir, mock_exporter_dir):
+    results = run_benchmarks(
+        TINY_CASES,
+        str(temp_dir / "bench"),
+        repeat=2,
+        exporters_dir=str(temp_dir / "exporters"),
+    )
+
+    assert list(results) == list(TINY_CASES)
+    assert results["tar-4k-20"]["unit"] == "MiB/s"
+    assert results["gz-4k"]["throughput"] > 0
+    assert results["local-4k"]["peak_rss_mib"] > 0
+
+
+def test_regressions():
+    baseline = {
+        "cases": {
+            "slower": {"seconds": 1.0, "peak_rss_mib": 40.0},
+            "bigger": {"seconds": 1.0, "peak_rss_mib": 40.0},
+            "noise": {"seconds": 0.001, "peak_rss_mib": 40.0},
+        }
+    }
+    results = {
+        "slower": {"seconds": 1.3, "peak_rss_mib": 41.0},
+        "bigger": {"seconds": 1.1, "peak_rss_mib": 60.0},
+        "noise": {"seconds": 0.01, "peak_rss_mib": 40.0},
+        "new": {"seconds": 9.0, "peak_rss_mib": 400.0},
+    }
+
+    assert regressions(results, baseline) == [
+        ("bigger", "peak_rss_mib", 40.0, 60.0),
+        ("slower", "seconds", 1.0, 1.3),
+    ]
+
+
+def test_cli_rejects_unknown_case(temp_dir):
+    result = CliRunner().invoke(main, ["--case", "nope", "--workdir", str(temp_dir)])
+
+    assert result.exit_code == 2
+    assert "unknown case(s) ['nope']" in result.output
+
+
+def test_cli_saves_and_compares_baseline(temp_dir, mock_exporter_dir):
+    baseline = temp_dir / "baseline.json"
+    args = ["--case", "render", "--repeat", "1", "--workdir", str(temp_dir / "bench")]
+    args += [
+        "--exporters-dir",
+        str(temp_dir / "exporters"),
+        "--baseline",
+        str(baseline),
+    ]
+
+    result = CliRunner().invoke(main, args + ["--save-baseline"])
+    assert result.exit_code == 0, result.output
+    saved = json.loads(baseline.read_text())
+    assert saved["cases"]["render"]["unit"] == "targets/s"
+
+    saved["cases"]["render"]["peak_rss_mib"] = 1.0
+    baseline.write_text(json.dumps(saved))
+    result = CliRunner().invoke(main, args + ["--fail-on-regression"])
+    assert result.exit_code == 1
+    assert "render peak_rss_mib: 1.0" in result.output
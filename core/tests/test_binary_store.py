@@ -0,0 +1,87 @@
+"""
+Unit tests for core.engine.binary_store module.
+"""
+
+import io
+import os
+
+import pytest
+
+from core.engine.archive import write_executable
+from core.engine.binary_store import BinaryStore
+
+URL = "https://example.com/exporter.tar.gz"
+ARCHIVE = "a" * 64
+
+
+def extracted(directory, name, content):
+    directory.mkdir(parents=True, exist_ok=True)
+    return write_executable(io.BytesIO(content), str(directory / name))
+
+
+@pytest.fixture
+def store(temp_dir):
+    return BinaryStore(str(temp_dir / "store"))
+
+
+def test_unknown_archive(store, temp_dir):
+    assert store.stage(URL, ARCHIVE, ["exporter"], str(temp_dir)) is None
+
+
+def test_add_then_stage(store, temp_dir):
+    digest = extracted(temp_dir / "rpm", "exporter", b"binary")
+    store.add(
+        URL,
+        ARCHIVE,
+        100,
+        ["exporter", "tool"],
+        str(temp_dir / "rpm"),
+        {"exporter": digest},
+    )
+    (temp_dir / "deb").mkdir()
+
+    stored = store.stage(URL, ARCHIVE, ["exporter", "tool"], str(temp_dir / "deb"))
+
+    assert stored["archive_size"] == 100
+    # "tool" is known to be absent from the archive
+    assert stored["binaries"] == {"exporter": digest}
+    assert (temp_dir / "deb" / "exporter").read_bytes() == b"binary"
+    assert os.stat(temp_dir / "deb" / "exporter").st_mode & 0o777 == 0o755
+
+
+def test_other_binaries_or_archive_miss(store, temp_dir):
+    digest = extracted(temp_dir / "rpm", "exporter", b"binary")
+    store.add(
+        URL, ARCHIVE, 100, ["exporter"], str(temp_dir / "rpm"), {"exporter": digest}
+    )
+
+    assert store.stage(URL, ARCHIVE, ["exporter", "tool"], str(temp_dir)) is None
+    assert store.stage(URL, "b" * 64, ["exporter"], str(temp_dir)) is None
+
+
+def test_store_survives_rebuild_of_staged_dir(store, temp_dir):
+    digest = extracted(temp_dir / "rpm", "exporter", b"binary")
+    store.add(
+        URL, ARCHIVE, 100, ["exporter"], str(temp_dir / "rpm"), {"exporter": digest}
+    )
+
+    # A new extraction into the same directory replaces the staged file
+    extracted(temp_dir / "rpm", "exporter", b"other")
+
+    stored = store.stage(URL, ARCHIVE, ["exporter"], str(temp_dir / "rpm"))
+    assert stored is not None
+    assert (temp_dir / "rpm" / "exporter").read_bytes() == b"binary"
+
+
+def test_eviction_drops_index_entries(temp_dir):
+    store = BinaryStore(str(temp_dir / "store"), max_bytes=10)
+    first = extracted(temp_dir / "one", "exporter", b"12345678")
+    store.add(URL, ARCHIVE, 1, ["exporter"], str(temp_dir / "one"), {"exporter": first})
+    os.utime(store._blob_path(first["sha256"]), (0, 0))
+    second = extracted(temp_dir / "two", "exporter", b"abcdefgh")
+    store.add(
+        URL, "b" * 64, 1, ["exporter"], str(temp_dir / "two"), {"exporter": second}
+    )
+
+    assert store.stage(URL, ARCHIVE, ["exporter"], str(temp_dir)) is None
+    assert store.stage(URL, "b" * 64, ["exporter"], str(temp_dir)) is not None
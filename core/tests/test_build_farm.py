@@ -0,0 +1,117 @@
+"""
+Unit tests for core.engine.build_farm module.
+"""
+
+import json
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from core.engine.build_farm import collect_targets, main, summarize
+
+
+@pytest.fixture
+def exporters_dir(temp_dir, sample_manifest):
+    """A local-binary exporter on two archs, a broken one and an invalid one."""
+    root = temp_dir / "exporters"
+    local = {
+        **sample_manifest,
+        "license": "MIT",
+        "upstream": {"type": "local", "local_binary": "bin/test_exporter"},
+    }
+    broken = {
+        **local,
+        "name": "broken_exporter",
+        "build": {**local["build"], "archs": ["amd64"]},
+    }
+    for name, manifest in (("test_exporter", local), ("broken_exporter", broken)):
+        (root / name).mkdir(parents=True)
+        with open(root / name / "manifest.yaml", "w") as f:
+            yaml.dump(manifest, f)
+    (root / "test_exporter" / "bin").mkdir()
+    (root / "test_exporter" / "bin" / "test_exporter").write_bytes(b"\x7fELF")
+    (root / "invalid").mkdir()
+    (root / "invalid" / "manifest.yaml").write_text("name: invalid\n")
+    return root
+
+
+def test_collect_targets(exporters_dir):
+    targets, invalid = collect_targets(str(exporters_dir))
+
+    assert [(e, a) for e, a, _ in targets] == [
+        ("broken_exporter", "amd64"),
+        ("test_exporter", "amd64"),
+        ("test_exporter", "arm64"),
+    ]
+    assert [e for e, _ in invalid] == ["invalid"]
+
+
+def test_collect_targets_filters(exporters_dir):
+    targets, invalid = collect_targets(
+        str(exporters_dir), exporters=["test_exporter"], archs=["arm64"]
+    )
+
+    assert [(e, a) for e, a, _ in targets] == [("test_exporter", "arm64")]
+    assert invalid == []
+
+
+def test_summarize():
+    results = [
+        {"exporter": "b", "arch": "amd64", "ok": True, "seconds": 1.5},
+        {"exporter": "a", "arch": "arm64", "ok": False, "seconds": 2.0},
+        {"exporter": "a", "arch": "amd64", "ok": True, "seconds": 1.0},
+    ]
+
+    assert summarize(results) == {
+        "a": {"targets": 2, "failed": 1, "seconds": 3.0},
+        "b": {"targets": 1, "failed": 0, "seconds": 1.5},
+    }
+
+
+def test_cli_stages_targets_and_reports_failures(exporters_dir, temp_dir):
+    output_dir = temp_dir / "build"
+    summary_file = temp_dir / "summary.json"
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "--exporters-dir",
+            str(exporters_dir),
+            "--output-dir",
+            str(output_dir),
+            "--jobs",
+            "2",
+            "--no-cache",
+            "--summary-json",
+            str(summary_file),
+        ],
+    )
+
+    assert result.exit_code == 1
+    assert "Staged 2/3 target(s)" in result.output
+    assert "Local binary not found" in result.output
+    assert (output_dir / "test_exporter" / "arm64" / "Dockerfile").exists()
+    assert (output_dir / "logs" / "test_exporter-amd64.log").exists()
+
+    summary = json.loads(summary_file.read_text())
+    assert [(t["exporter"], t["arch"], t["ok"]) for t in summary["targets"]] == [
+        ("broken_exporter", "amd64", False),
+        ("test_exporter", "amd64", True),
+        ("test_exporter", "arm64", True),
+    ]
+    assert summary["invalid"][0]["exporter"] == "invalid"
+
+
+def test_cli_dry_run(exporters_dir, temp_dir):
+    output_dir = temp_dir / "build"
+
+    result = CliRunner().invoke(
+        main,
+        ["--exporters-dir", str(exporters_dir), "-o", str(output_dir), "--dry-run"],
+    )
+
+    assert result.exit_code == 1
+    assert "Checked 2/3 target(s)" in result.output
+    assert "Local upstream file not found: bin/test_exporter" in result.output
+    assert not output_dir.exists()
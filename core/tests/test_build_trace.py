@@ -0,0 +1,170 @@
+"""
+Unit tests for core.engine.build_trace module.
+"""
+
+import json
+
+import click
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from core.engine import build_trace
+from core.engine.build_trace import (
+    TRACE_FILE,
+    BuildTrace,
+    aggregate,
+    load_traces,
+    main,
+    regressions,
+)
+from core.engine.builder import build_target
+
+
+def trace(name, arch="amd64", seconds=10.0, ok=True, phases=None):
+    return {
+        "name": name,
+        "version": "v1.0.0",
+        "arch": arch,
+        "ok": ok,
+        "total_seconds": seconds,
+        "phases": phases or {"download": seconds},
+        "counters": {"bytes_downloaded": 100, "cache_hits": 1, "cache_misses": 0},
+    }
+
+
+class TestBuildTrace:
+    """Tests for the BuildTrace recorder."""
+
+    def test_phases_add_up(self, monkeypatch):
+        clock = iter([0.0, 1.0, 3.0, 10.0, 14.0])
+        monkeypatch.setattr(build_trace.time, "monotonic", lambda: next(clock))
+        t = BuildTrace("amd64")
+
+        with t.phase("download"):
+            pass
+        with t.phase("download"):
+            pass
+
+        assert t.phases == {"download": 6.0}
+
+    def test_phase_timed_on_error(self):
+        t = BuildTrace()
+
+        with pytest.raises(ValueError), t.phase("extract"):
+            raise ValueError("boom")
+
+        assert "extract" in t.phases
+
+    def test_write(self, temp_dir):
+        t = BuildTrace("arm64")
+        t.name = "test_exporter"
+        t.count("cache_misses")
+
+        path = t.write(str(temp_dir), error="boom")
+
+        with open(path) as f:
+            data = json.load(f)
+        assert data["arch"] == "arm64"
+        assert data["ok"] is False
+        assert data["error"] == "boom"
+        assert data["counters"]["cache_misses"] == 1
+
+
+def test_aggregate():
+    report = aggregate(
+        [
+            trace("b", seconds=4.0),
+            trace("a", "arm64", 30.0, ok=False),
+            trace("a", seconds=10.0, phases={"download": 6.0, "render": 4.0}),
+        ]
+    )
+
+    assert report["targets"] == 3
+    assert report["failed"] == 1
+    assert report["total_seconds"] == 44.0
+    assert report["phases"] == {"download": 40.0, "render": 4.0}
+    assert report["counters"]["bytes_downloaded"] == 300
+    assert list(report["exporters"]) == ["a", "b"]
+    assert report["exporters"]["a"]["mean_seconds"] == 20.0
+    assert report["exporters"]["a"]["max_seconds"] == 30.0
+
+
+def test_regressions():
+    baseline = aggregate([trace("slow", seconds=10.0), trace("fast", seconds=1.0)])
+    report = aggregate(
+        [
+            trace("slow", seconds=15.0),
+            trace("fast", seconds=3.0),
+            trace("new", seconds=60.0),
+        ]
+    )
+
+    # "fast" is under the noise floor, "new" has no baseline
+    assert regressions(report, baseline) == [("slow", 10.0, 15.0)]
+    assert regressions(report, baseline, threshold=1.0) == []
+
+
+def test_cli(temp_dir):
+    for job, name in (("rpm-001", "a"), ("deb-001", "b")):
+        (temp_dir / job / name).mkdir(parents=True)
+        (temp_dir / job / name / TRACE_FILE).write_text(json.dumps(trace(name)))
+    baseline = temp_dir / "baseline.json"
+    baseline.write_text(json.dumps(aggregate([trace("a", seconds=5.0)])))
+    summary = temp_dir / "summary.md"
+
+    result = CliRunner().invoke(
+        main,
+        [
+            str(temp_dir),
+            "--output",
+            str(temp_dir / "report.json"),
+            "--baseline",
+            str(baseline),
+            "--markdown",
+            str(summary),
+            "--fail-on-regression",
+        ],
+    )
+
+    assert result.exit_code == 1
+    assert "a: 5.0s → 10.0s (+100%)" in summary.read_text()
+    report = json.loads((temp_dir / "report.json").read_text())
+    assert report["targets"] == 2
+    assert report["regressions"] == [{"exporter": "a", "before": 5.0, "after": 10.0}]
+
+
+class TestBuilderTrace:
+    """The builder writes a trace for every target."""
+
+    @pytest.fixture
+    def manifest_path(self, mock_exporter_dir, sample_manifest):
+        sample_manifest["license"] = "MIT"
+        sample_manifest["upstream"] = {
+            "type": "local",
+            "local_binary": "bin/test_exporter",
+        }
+        with open(mock_exporter_dir / "manifest.yaml", "w") as f:
+            yaml.dump(sample_manifest, f)
+        return mock_exporter_dir / "manifest.yaml"
+
+    def test_trace_written(self, manifest_path, temp_dir):
+        (manifest_path.parent / "bin").mkdir()
+        (manifest_path.parent / "bin" / "test_exporter").write_bytes(b"\x7fELF")
+        output_dir = temp_dir / "build"
+
+        build_target(str(manifest_path), str(output_dir), "amd64")
+
+        [data] = load_traces([str(output_dir)])
+        assert data["name"] == "test_exporter"
+        assert data["ok"] is True
+        assert {"manifest", "extract", "staging", "render"} <= set(data["phases"])
+
+    def test_trace_written_on_failure(self, manifest_path, temp_dir):
+        output_dir = temp_dir / "build"
+
+        with pytest.raises(click.Abort):
+            build_target(str(manifest_path), str(output_dir), "amd64")
+
+        data = json.loads((output_dir / TRACE_FILE).read_text())
+        assert data["ok"] is False
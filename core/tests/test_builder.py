@@ -2,13 +2,17 @@
 Unit tests for core.engine.builder module.
 """
 
+import concurrent.futures
+import hashlib
+import json
 import tarfile
 from typing import Any
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 import requests
 
+from core.engine.archive import extract_binaries
 from core.engine.builder import (
     download_and_extract,
     download_extra_sources,
@@ -60,7 +64,19 @@ class TestDownloadAndExtract:
             "build": {"binary_name": "test_exporter", "extra_binaries": []},
         }
 
-    @patch("core.engine.builder.requests.get")
+    @pytest.fixture(autouse=True)
+    def upstream_checksums(self):
+        """Serve upstream checksum files from a dict instead of the network."""
+        published = {}
+        with patch(
+            "core.engine.builder.checksums.get_upstream_checksums",
+            side_effect=lambda *_: (
+                ("sha256sums.txt", published) if published else (None, {})
+            ),
+        ):
+            yield published
+
+    @patch("core.engine.downloader.http_client.get")
     def test_download_tarball_success(self, mock_get, temp_dir, mock_manifest_data):
         """Test successful download and extraction of tarball."""
         # Create a mock tarball
@@ -87,7 +103,7 @@ class TestDownloadAndExtract:
         # For now, just verify the mock was called correctly
         # Full integration test would require more complex setup
 
-    @patch("core.engine.builder.requests.get")
+    @patch("core.engine.downloader.http_client.get")
     def test_download_handles_http_error(self, mock_get, temp_dir, mock_manifest_data):
         """Test that HTTP errors are handled properly."""
         mock_get.return_value.__enter__.side_effect = requests.exceptions.HTTPError(
@@ -100,6 +116,195 @@ class TestDownloadAndExtract:
         with pytest.raises(requests.exceptions.HTTPError):
             download_and_extract(mock_manifest_data, str(output_dir), "amd64")
 
+    @patch("core.engine.downloader.http_client.get")
+    def test_download_uses_cache(self, mock_get, temp_dir, mock_manifest_data):
+        """Test that a cached archive is not downloaded a second time."""
+        from core.engine.download_cache import DownloadCache
+
+        mock_tarball = temp_dir / "test.tar.gz"
+        binary_path = temp_dir / "test_exporter"
+        binary_path.write_text("mock binary content")
+        with tarfile.open(mock_tarball, "w:gz") as tar:
+            tar.add(binary_path, arcname="test_exporter-1.0.0/test_exporter")
+
+        mock_response = Mock(status_code=200, headers={})
+        mock_response.raise_for_status = Mock()
+        mock_response.iter_content = Mock(return_value=[mock_tarball.read_bytes()])
+        mock_get.return_value.__enter__ = Mock(return_value=mock_response)
+        mock_get.return_value.__exit__ = Mock(return_value=False)
+
+        cache = DownloadCache(str(temp_dir / "cache"))
+        for job in ("rpm", "deb"):
+            output_dir = temp_dir / job
+            output_dir.mkdir()
+            download_and_extract(mock_manifest_data, str(output_dir), "amd64", cache)
+            assert (output_dir / "test_exporter").read_text() == "mock binary content"
+
+        assert mock_get.call_count == 1
+        assert cache.hits == 1
+
+    @patch("core.engine.builder.extract_binaries", wraps=extract_binaries)
+    @patch("core.engine.downloader.http_client.get")
+    def test_binaries_extracted_once(
+        self, mock_get, mock_extract, temp_dir, mock_manifest_data
+    ):
+        """Later jobs stage the binaries from the store, without extracting."""
+        from core.engine.download_cache import DownloadCache
+
+        self.mock_archive_response(mock_get, temp_dir)
+        cache = DownloadCache(str(temp_dir / "cache"))
+        for job in ("rpm", "deb", "docker"):
+            output_dir = temp_dir / job
+            output_dir.mkdir()
+            record = download_and_extract(
+                mock_manifest_data, str(output_dir), "amd64", cache
+            )
+            assert (output_dir / "test_exporter").read_text() == "mock binary content"
+            assert record["binaries"]["test_exporter"]["size"] == 19
+
+        assert mock_extract.call_count == 1
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_concurrent_jobs_download_once(
+        self, mock_get, temp_dir, mock_manifest_data
+    ):
+        """Jobs missing the same archive wait for the one downloading it."""
+        from core.engine.download_cache import DownloadCache
+
+        self.mock_archive_response(mock_get, temp_dir)
+        cache = DownloadCache(str(temp_dir / "cache"))
+        output_dirs = [temp_dir / job for job in ("rpm", "deb", "docker")]
+        for output_dir in output_dirs:
+            output_dir.mkdir()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+            records = list(
+                pool.map(
+                    lambda d: download_and_extract(
+                        mock_manifest_data, str(d), "amd64", cache
+                    ),
+                    output_dirs,
+                )
+            )
+
+        assert mock_get.call_count == 1
+        assert len({r["source"]["sha256"] for r in records}) == 1
+        for output_dir in output_dirs:
+            assert (output_dir / "test_exporter").read_text() == "mock binary content"
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_download_resolves_binary_linking_back(
+        self, mock_get, temp_dir, mock_manifest_data
+    ):
+        """A binary hard-linked to an earlier member comes from the saved archive."""
+        binary_path = temp_dir / "test_exporter-1.0.0"
+        binary_path.write_text("mock binary content")
+        mock_tarball = temp_dir / "test.tar.gz"
+        with tarfile.open(mock_tarball, "w:gz") as tar:
+            tar.add(binary_path, arcname="dist/test_exporter-1.0.0")
+            link = tarfile.TarInfo("dist/test_exporter")
+            link.type = tarfile.LNKTYPE
+            link.linkname = "dist/test_exporter-1.0.0"
+            tar.addfile(link)
+        mock_response = Mock(status_code=200, headers={})
+        mock_response.iter_content = Mock(return_value=[mock_tarball.read_bytes()])
+        mock_get.return_value.__enter__ = Mock(return_value=mock_response)
+        mock_get.return_value.__exit__ = Mock(return_value=False)
+        output_dir = temp_dir / "output"
+        output_dir.mkdir()
+
+        record = download_and_extract(mock_manifest_data, str(output_dir), "amd64")
+
+        assert mock_get.call_count == 1
+        assert (output_dir / "test_exporter").read_text() == "mock binary content"
+        assert record["binaries"]["test_exporter"]["size"] == 19
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_mismatched_cached_archive_downloaded_again(
+        self, mock_get, temp_dir, mock_manifest_data, upstream_checksums
+    ):
+        """A cached archive that fails the upstream checksum is never extracted."""
+        from core.engine.download_cache import DownloadCache
+
+        archive = self.mock_archive_response(mock_get, temp_dir)
+        digest = hashlib.sha256(archive).hexdigest()
+        upstream_checksums["test_exporter-1.0.0.linux-amd64.tar.gz"] = digest
+        url = (
+            "https://github.com/owner/test_exporter/releases/download/v1.0.0/"
+            "test_exporter-1.0.0.linux-amd64.tar.gz"
+        )
+        cache = DownloadCache(str(temp_dir / "cache"))
+        corrupted = cache.tmp_path(url)
+        with open(corrupted, "wb") as f:
+            f.write(b"corrupted")
+        cache.add(url, corrupted, hashlib.sha256(b"corrupted").hexdigest(), 9)
+        output_dir = temp_dir / "output"
+        output_dir.mkdir()
+
+        record = download_and_extract(
+            mock_manifest_data, str(output_dir), "amd64", cache
+        )
+
+        assert mock_get.call_count == 1
+        assert record["source"]["sha256"] == digest
+        assert record["source"]["verified_against"] == "sha256sums.txt"
+        assert (output_dir / "test_exporter").read_text() == "mock binary content"
+        assert cache.lookup(url) == cache._blob_path(digest)
+
+    @staticmethod
+    def mock_archive_response(mock_get, temp_dir):
+        """Serve a tarball holding test_exporter; return its bytes."""
+        binary_path = temp_dir / "test_exporter"
+        binary_path.write_text("mock binary content")
+        mock_tarball = temp_dir / "test.tar.gz"
+        with tarfile.open(mock_tarball, "w:gz") as tar:
+            tar.add(binary_path, arcname="test_exporter-1.0.0/test_exporter")
+
+        mock_response = Mock(status_code=200, headers={})
+        mock_response.iter_content = Mock(return_value=[mock_tarball.read_bytes()])
+        mock_get.return_value.__enter__ = Mock(return_value=mock_response)
+        mock_get.return_value.__exit__ = Mock(return_value=False)
+        return mock_tarball.read_bytes()
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_download_verified_against_upstream_checksums(
+        self, mock_get, temp_dir, mock_manifest_data, upstream_checksums
+    ):
+        """The archive digest is checked and returned with the binary digests."""
+        archive = self.mock_archive_response(mock_get, temp_dir)
+        digest = hashlib.sha256(archive).hexdigest()
+        upstream_checksums["test_exporter-1.0.0.linux-amd64.tar.gz"] = digest
+        output_dir = temp_dir / "output"
+        output_dir.mkdir()
+
+        record = download_and_extract(mock_manifest_data, str(output_dir), "amd64")
+
+        assert record["source"]["sha256"] == digest
+        assert record["source"]["verified_against"] == "sha256sums.txt"
+        assert record["binaries"]["test_exporter"] == {
+            "sha256": hashlib.sha256(b"mock binary content").hexdigest(),
+            "size": len(b"mock binary content"),
+        }
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_download_rejects_checksum_mismatch(
+        self, mock_get, temp_dir, mock_manifest_data, upstream_checksums
+    ):
+        """An archive that does not match the upstream checksum is not extracted."""
+        from core.engine.downloader import ChecksumMismatch
+
+        self.mock_archive_response(mock_get, temp_dir)
+        upstream_checksums["test_exporter-1.0.0.linux-amd64.tar.gz"] = "0" * 64
+        output_dir = temp_dir / "output"
+        output_dir.mkdir()
+
+        with pytest.raises(ChecksumMismatch):
+            download_and_extract(mock_manifest_data, str(output_dir), "amd64")
+
+        # Not retried: the same bytes would come back
+        assert mock_get.call_count == 1
+        assert list(output_dir.iterdir()) == []
+
     def test_archive_name_pattern_with_clean_version(self, mock_manifest_data):
         """Test archive name pattern with clean_version variable."""
         mock_manifest_data["upstream"]["archive_name"] = (
@@ -143,13 +348,18 @@ class TestDownloadAndExtract:
 class TestDownloadExtraSources:
     """Tests for download_extra_sources function."""
 
-    @patch("core.engine.builder.requests.get")
+    @staticmethod
+    def streamed_response(content):
+        """Build a mock streamed response usable as a context manager."""
+        mock_response = MagicMock(status_code=200, headers={})
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_content = Mock(return_value=[content])
+        return mock_response
+
+    @patch("core.engine.downloader.http_client.get")
     def test_download_extra_sources_success(self, mock_get, temp_dir):
         """Test downloading extra source files."""
-        mock_response = Mock()
-        mock_response.raise_for_status = Mock()
-        mock_response.content = b"config file content"
-        mock_get.return_value = mock_response
+        mock_get.return_value = self.streamed_response(b"config file content")
 
         manifest_data: dict[str, Any] = {
             "build": {
@@ -169,6 +379,48 @@ class TestDownloadExtraSources:
         assert expected_file.exists()
         assert expected_file.read_text() == "config file content"
 
+    @patch("core.engine.downloader.http_client.get")
+    def test_download_extra_sources_retries_per_file(self, mock_get, temp_dir):
+        """Test that a failing file is retried alone, not the whole list."""
+        from tenacity import wait_none
+
+        from core.engine.builder import download_extra_source
+
+        responses = {
+            "https://example.com/a.yml": [self.streamed_response(b"a")],
+            "https://example.com/b.yml": [
+                requests.exceptions.ConnectionError("reset"),
+                self.streamed_response(b"b"),
+            ],
+        }
+
+        def fake_get(url, **kwargs):
+            result = responses[url].pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        mock_get.side_effect = fake_get
+        manifest_data: dict[str, Any] = {
+            "build": {
+                "extra_sources": [
+                    {"url": "https://example.com/a.yml", "filename": "a.yml"},
+                    {"url": "https://example.com/b.yml", "filename": "b.yml"},
+                ]
+            }
+        }
+
+        output_dir = temp_dir / "output"
+        output_dir.mkdir()
+
+        with patch.object(download_extra_source.retry, "wait", wait_none()):
+            download_extra_sources(manifest_data, str(output_dir))
+
+        assert mock_get.call_count == 3
+        assert (output_dir / "a.yml").read_bytes() == b"a"
+        assert (output_dir / "b.yml").read_bytes() == b"b"
+        assert sorted(p.name for p in output_dir.iterdir()) == ["a.yml", "b.yml"]
+
     def test_download_extra_sources_empty_list(self, temp_dir):
         """Test that empty extra_sources list is handled."""
         manifest_data: dict[str, Any] = {"build": {}}
@@ -324,3 +576,205 @@ class TestLocalBinarySupport:
 
         with pytest.raises(Abort):
             load_manifest(str(manifest_file))
+
+
+class TestBatchBuild:
+    """Tests for the multi-target (batch) mode of the builder CLI."""
+
+    @pytest.fixture
+    def local_manifest(self, tmp_path):
+        """Create a local-binary exporter that builds without network access."""
+        import yaml
+
+        exporter_dir = tmp_path / "exporters" / "local_exporter"
+        (exporter_dir / "assets").mkdir(parents=True)
+        (exporter_dir / "assets" / "local_exporter").write_text("binary")
+        manifest_content = {
+            "name": "local_exporter",
+            "description": "Test local exporter",
+            "version": "1.0.0",
+            "license": "MIT",
+            "upstream": {"type": "local", "local_binary": "assets/local_exporter"},
+            "build": {
+                "method": "binary_repack",
+                "binary_name": "local_exporter",
+                "archs": ["amd64"],
+            },
+            "artifacts": {
+                "rpm": {"enabled": True, "summary": "Test"},
+                "docker": {"enabled": True, "entrypoint": ["/usr/bin/local_exporter"]},
+            },
+        }
+        manifest_file = exporter_dir / "manifest.yaml"
+        manifest_file.write_text(yaml.dump(manifest_content))
+        return manifest_file
+
+    def test_batch_writes_one_tree_per_target(self, tmp_path, local_manifest):
+        """Each manifest×arch is staged under <output>/<exporter>/<arch>."""
+        from click.testing import CliRunner
+
+        from core.engine.builder import build
+
+        output_dir = tmp_path / "build"
+        result = CliRunner().invoke(
+            build,
+            ["-m", str(local_manifest), "-a", "amd64", "-a", "arm64"]
+            + ["-o", str(output_dir), "--no-cache"],
+        )
+
+        assert result.exit_code == 0, result.output
+        target_dir = output_dir / "local_exporter" / "amd64"
+        assert (target_dir / "local_exporter").read_text() == "binary"
+        assert (target_dir / "local_exporter.spec").exists()
+        assert (target_dir / "Dockerfile").exists()
+        # arm64 is not listed in build.archs
+        assert not (output_dir / "local_exporter" / "arm64").exists()
+        assert "1 succeeded, 0 failed" in result.output
+
+        build_manifest = json.loads((target_dir / "build-manifest.json").read_text())
+        assert build_manifest["arch"] == "amd64"
+        assert build_manifest["binaries"]["local_exporter"]["sha256"] == (
+            hashlib.sha256(b"binary").hexdigest()
+        )
+
+    def test_batch_reports_failures(self, tmp_path, local_manifest):
+        """An invalid manifest fails the batch without stopping other targets."""
+        from click.testing import CliRunner
+
+        from core.engine.builder import build
+
+        invalid_manifest = "core/tests/fixtures/invalid_manifest.yaml"
+        output_dir = tmp_path / "build"
+        result = CliRunner().invoke(
+            build,
+            ["-m", str(local_manifest), "-m", invalid_manifest, "-a", "amd64"]
+            + ["-a", "arm64", "-o", str(output_dir), "--no-cache"],
+        )
+
+        assert result.exit_code != 0
+        assert (output_dir / "local_exporter" / "amd64" / "Dockerfile").exists()
+        assert "1 succeeded, 1 failed" in result.output
+
+
+class TestPlanTarget:
+    """Tests for the dry-run (plan-only) mode of the builder."""
+
+    @staticmethod
+    def write_manifest(exporter_dir, manifest):
+        import yaml
+
+        exporter_dir.mkdir(parents=True, exist_ok=True)
+        manifest_file = exporter_dir / "manifest.yaml"
+        manifest_file.write_text(yaml.dump(manifest))
+        return str(manifest_file)
+
+    def test_plan_resolves_url_and_renders(self, temp_dir, sample_manifest):
+        from core.engine.builder import plan_target
+
+        sample_manifest["upstream"]["archive_name"] = (
+            "{name}-{clean_version}.linux-{arch}.tar.gz"
+        )
+        manifest = self.write_manifest(temp_dir / "test_exporter", sample_manifest)
+
+        plan = plan_target(manifest, "arm64")
+
+        assert plan["errors"] == []
+        assert plan["url"] == (
+            "https://github.com/owner/test_exporter/releases/download/v1.0.0/"
+            "test_exporter-1.0.0.linux-arm64.tar.gz"
+        )
+        assert "default.spec.j2" in plan["rendered"]
+        assert "Dockerfile.j2" in plan["rendered"]
+        assert not any((temp_dir / "test_exporter").glob("*.spec"))
+
+    def test_plan_reports_every_error(self, temp_dir, sample_manifest):
+        from core.engine.builder import plan_target
+
+        sample_manifest["upstream"]["archive_name"] = {"amd64": "{name}.tar.gz"}
+        sample_manifest["artifacts"]["rpm"]["extra_files"] = [
+            {"source": "assets/missing.yml", "dest": "/etc/missing.yml"}
+        ]
+        exporter_dir = temp_dir / "test_exporter"
+        manifest = self.write_manifest(exporter_dir, sample_manifest)
+        (exporter_dir / "templates").mkdir()
+        (exporter_dir / "templates" / "Dockerfile.j2").write_text("{{ missing() }}")
+
+        plan = plan_target(manifest, "arm64")
+
+        assert plan["url"] is None
+        assert len(plan["errors"]) == 3
+        assert "Cannot resolve archive_name" in plan["errors"][0]
+        assert plan["errors"][1] == "rpm extra file not found: assets/missing.yml"
+        assert plan["errors"][2].startswith("Dockerfile.j2: UndefinedError")
+
+    def test_plan_unknown_placeholder(self, temp_dir, sample_manifest):
+        from core.engine.builder import plan_target
+
+        sample_manifest["upstream"]["archive_name"] = "{name}-{platform}.tar.gz"
+        manifest = self.write_manifest(temp_dir / "test_exporter", sample_manifest)
+
+        plan = plan_target(manifest, "amd64")
+
+        assert plan["errors"] == ["Cannot resolve archive_name: KeyError('platform')"]
+
+    def test_cli_dry_run(self, temp_dir, sample_manifest):
+        from click.testing import CliRunner
+
+        from core.engine.builder import build
+
+        sample_manifest["upstream"] = {
+            "type": "local",
+            "local_binary": "bin/test_exporter",
+        }
+        manifest = self.write_manifest(temp_dir / "test_exporter", sample_manifest)
+        output_dir = temp_dir / "build"
+
+        result = CliRunner().invoke(
+            build, ["-m", manifest, "-a", "amd64", "-o", str(output_dir), "--dry-run"]
+        )
+
+        assert result.exit_code != 0
+        assert "Local upstream file not found: bin/test_exporter" in result.output
+        assert not output_dir.exists()
+
+    def test_plan_unreadable_manifest(self, temp_dir):
+        from core.engine.builder import plan_target
+
+        broken = temp_dir / "broken" / "manifest.yaml"
+        broken.parent.mkdir()
+        broken.write_text("name: [unclosed")
+
+        assert plan_target(str(broken), "amd64")["errors"][0].startswith(
+            "Cannot read manifest:"
+        )
+        missing = plan_target(str(temp_dir / "missing.yaml"), "amd64")
+        assert missing["errors"][0].startswith("Cannot read manifest:")
+
+    def test_cli_dry_run_batch(self, temp_dir, sample_manifest):
+        from click.testing import CliRunner
+
+        from core.engine.builder import build
+
+        sample_manifest["upstream"]["archive_name"] = "{name}-{arch}.tar.gz"
+        manifest = self.write_manifest(temp_dir / "test_exporter", sample_manifest)
+        missing = str(temp_dir / "missing.yaml")
+
+        result = CliRunner().invoke(
+            build,
+            ["-m", manifest, "-m", missing, "-a", "amd64", "-a", "arm64"]
+            + ["--jobs", "4", "--dry-run"],
+        )
+
+        assert result.exit_code != 0
+        # Every target was checked, reported in order
+        lines = [line for line in result.output.splitlines() if line[:1] in "✓✗"]
+        assert lines == [
+            f"✓ {manifest} (amd64) "
+            "https://github.com/owner/test_exporter/releases/download/v1.0.0/"
+            "test_exporter-amd64.tar.gz",
+            f"✓ {manifest} (arm64) "
+            "https://github.com/owner/test_exporter/releases/download/v1.0.0/"
+            "test_exporter-arm64.tar.gz",
+            f"✗ {missing} (amd64) ",
+            f"✗ {missing} (arm64) ",
+        ]
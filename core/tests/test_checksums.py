@@ -0,0 +1,117 @@
+"""
+Unit tests for core.engine.checksums module.
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from core.config import settings
+from core.engine import checksums
+
+DIGEST_A = "a" * 64
+DIGEST_B = "B" * 64
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(temp_dir, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_DIR", str(temp_dir))
+    checksums.get_upstream_checksums.cache_clear()
+    yield
+    checksums.get_upstream_checksums.cache_clear()
+
+
+class TestParseChecksumFile:
+    """Tests for parse_checksum_file function."""
+
+    def test_gnu_and_bsd_formats(self):
+        text = (
+            f"{DIGEST_A}  exporter-1.0.0.linux-amd64.tar.gz\n"
+            f"{DIGEST_B} *./dist/exporter-1.0.0.linux-arm64.tar.gz\n"
+            f"SHA256 (exporter.gz) = {DIGEST_A}\n"
+            "not a checksum line\n"
+        )
+
+        assert checksums.parse_checksum_file(text) == {
+            "exporter-1.0.0.linux-amd64.tar.gz": DIGEST_A,
+            "exporter-1.0.0.linux-arm64.tar.gz": DIGEST_B.lower(),
+            "exporter.gz": DIGEST_A,
+        }
+
+
+class TestGetUpstreamChecksums:
+    """Tests for get_upstream_checksums function."""
+
+    @patch("core.engine.checksums.http_client.get")
+    def test_first_published_candidate_is_used_and_cached(self, mock_get):
+        """Missing candidates are skipped; the result is kept on disk."""
+        found = Mock(status_code=200, text=f"{DIGEST_A}  exporter.tar.gz\n")
+        mock_get.side_effect = [Mock(status_code=404), found]
+        candidates = ("sha256sums.txt", "checksums.txt")
+
+        result = checksums.get_upstream_checksums("owner/repo", "v1.0.0", candidates)
+
+        assert result == ("checksums.txt", {"exporter.tar.gz": DIGEST_A})
+        assert mock_get.call_args.args[0] == (
+            "https://github.com/owner/repo/releases/download/v1.0.0/checksums.txt"
+        )
+
+        checksums.get_upstream_checksums.cache_clear()
+        mock_get.reset_mock()
+        again = checksums.get_upstream_checksums("owner/repo", "v1.0.0", candidates)
+
+        assert again == result
+        mock_get.assert_not_called()
+
+    @patch("core.engine.checksums.http_client.get")
+    def test_no_checksum_file(self, mock_get):
+        mock_get.return_value = Mock(status_code=404)
+
+        result = checksums.get_upstream_checksums(
+            "owner/repo", "v1.0.0", ("sha256sums.txt",)
+        )
+
+        assert result == (None, {})
+
+    @patch("core.engine.checksums.http_client.get")
+    def test_missing_checksum_file_cached_with_ttl(self, mock_get, monkeypatch):
+        """A release without checksum file is not asked again until the TTL."""
+        mock_get.return_value = Mock(status_code=404)
+        candidates = ("sha256sums.txt", "checksums.txt")
+        checksums.get_upstream_checksums("owner/repo", "v1.0.0", candidates)
+        assert mock_get.call_count == 2
+
+        checksums.get_upstream_checksums.cache_clear()
+        assert checksums.get_upstream_checksums("owner/repo", "v1.0.0", candidates) == (
+            None,
+            {},
+        )
+        assert mock_get.call_count == 2
+
+        # Other candidates, or an expired entry, are asked again
+        checksums.get_upstream_checksums("owner/repo", "v1.0.0", ("SHA256SUMS",))
+        assert mock_get.call_count == 3
+        monkeypatch.setattr(settings, "CHECKSUMS_MISSING_TTL", 0)
+        checksums.get_upstream_checksums.cache_clear()
+        checksums.get_upstream_checksums("owner/repo", "v1.0.0", candidates)
+        assert mock_get.call_count == 5
+
+    @patch("core.engine.checksums.http_client.get")
+    def test_server_error_not_cached(self, mock_get):
+        mock_get.return_value = Mock(status_code=503)
+        checksums.get_upstream_checksums("owner/repo", "v1.0.0", ("sha256sums.txt",))
+
+        checksums.get_upstream_checksums.cache_clear()
+        checksums.get_upstream_checksums("owner/repo", "v1.0.0", ("sha256sums.txt",))
+
+        assert mock_get.call_count == 2
+
+
+def test_checksum_candidates_from_manifest_pattern():
+    data = {
+        "name": "exporter",
+        "version": "v1.2.3",
+        "upstream": {"checksum_file": "{name}_{clean_version}_SHA256SUMS"},
+    }
+
+    assert checksums.checksum_candidates(data) == ("exporter_1.2.3_SHA256SUMS",)
@@ -0,0 +1,108 @@
+"""
+Unit tests for core.engine.download_cache module.
+"""
+
+import concurrent.futures
+import hashlib
+import os
+import threading
+import time
+
+from core.engine.download_cache import DownloadCache
+
+
+def store(cache, url, content):
+    tmp_path = cache.tmp_path(url)
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    return cache.add(url, tmp_path, hashlib.sha256(content).hexdigest(), len(content))
+
+
+class TestDownloadCache:
+    """Tests for DownloadCache."""
+
+    def test_miss_then_hit(self, temp_dir):
+        """A stored archive is served from the cache on the next lookup."""
+        cache = DownloadCache(str(temp_dir / "cache"))
+        url = "https://example.com/a.tar.gz"
+
+        assert cache.lookup(url) is None
+        path = store(cache, url, b"archive")
+
+        assert cache.lookup(url) == path
+        with open(path, "rb") as f:
+            assert f.read() == b"archive"
+        assert cache.stats() == {"hits": 1, "misses": 1, "bytes_saved": 7}
+
+    def test_blob_named_by_content_hash(self, temp_dir):
+        """Blobs are stored under their SHA-256 and shared between URLs."""
+        cache = DownloadCache(str(temp_dir / "cache"))
+        digest = hashlib.sha256(b"same").hexdigest()
+
+        first = store(cache, "https://example.com/a", b"same")
+        second = store(cache, "https://mirror.example.com/a", b"same")
+
+        assert first == second
+        assert os.path.basename(first) == digest
+
+    def test_cache_shared_between_instances(self, temp_dir):
+        """A second process (new instance) sees entries written by the first."""
+        root = str(temp_dir / "cache")
+        store(DownloadCache(root), "https://example.com/a", b"data")
+
+        assert DownloadCache(root).lookup("https://example.com/a") is not None
+
+    def test_download_lock_is_exclusive(self, temp_dir):
+        """One job at a time holds a URL; the next one gets its cached copy."""
+        cache = DownloadCache(str(temp_dir / "cache"))
+        url = "https://example.com/a"
+        events = []
+
+        def job(name):
+            with cache.download_lock(url) as cached:
+                events.append((name, "start", cached))
+                if cached is None:
+                    time.sleep(0.1)
+                    store(cache, url, b"data")
+                events.append((name, "end", cached))
+
+        threads = [threading.Thread(target=job, args=(n,)) for n in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        first, second = events[0][0], events[2][0]
+        assert [(n, step) for n, step, _ in events] == [
+            (first, "start"),
+            (first, "end"),
+            (second, "start"),
+            (second, "end"),
+        ]
+        assert events[0][2] is None
+        assert events[2][2] == cache.lookup(url)
+
+    def test_lru_eviction(self, temp_dir):
+        """The least recently used archive is evicted when over the size cap."""
+        cache = DownloadCache(str(temp_dir / "cache"), max_bytes=10)
+        path_a = store(cache, "https://example.com/a", b"aaaa")
+        path_b = store(cache, "https://example.com/b", b"bbbb")
+        os.utime(path_a, (1, 1))
+        os.utime(path_b, (2, 2))
+
+        store(cache, "https://example.com/c", b"cccc")
+
+        assert cache.lookup("https://example.com/a") is None
+        assert cache.lookup("https://example.com/b") is not None
+        assert cache.lookup("https://example.com/c") is not None
+
+    def test_counters_shared_between_threads(self, temp_dir):
+        """Batch worker threads sharing one cache are all counted."""
+        cache = DownloadCache(str(temp_dir / "cache"))
+        store(cache, "https://example.com/a", b"data")
+        urls = ["https://example.com/a", "https://example.com/missing"] * 50
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(cache.lookup, urls))
+
+        assert cache.stats() == {"hits": 50, "misses": 50, "bytes_saved": 200}
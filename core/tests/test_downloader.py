@@ -0,0 +1,185 @@
+"""
+Unit tests for core.engine.downloader module.
+"""
+
+import hashlib
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from core.engine import downloader
+
+URL = "https://example.com/exporter.tar.gz"
+CONTENT = bytes(range(256)) * 40
+
+
+def fake_response(status_code, chunks, headers=None, fail_after=None):
+    """Streamed response yielding chunks, optionally dropping the connection."""
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    response.__enter__.return_value = response
+
+    def iter_content(chunk_size):
+        for i, chunk in enumerate(chunks):
+            if fail_after is not None and i == fail_after:
+                raise requests.exceptions.ChunkedEncodingError("connection reset")
+            yield chunk
+
+    response.iter_content = iter_content
+    return response
+
+
+def ranged_server(content, ignore_range=False):
+    """Fake GET honouring Range requests against content."""
+
+    def get(url, headers=None, **kwargs):
+        byte_range = (headers or {}).get("Range")
+        if not byte_range or ignore_range:
+            return fake_response(200, [content], {"Content-Length": str(len(content))})
+        start, _, end = byte_range[len("bytes=") :].partition("-")
+        end = int(end) if end else len(content) - 1
+        body = content[int(start) : end + 1]
+        return fake_response(
+            206, [body], {"Content-Range": f"bytes {start}-{end}/{len(content)}"}
+        )
+
+    return get
+
+
+class TestDownload:
+    """Tests for download function."""
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_resumes_after_interrupted_transfer(self, mock_get, temp_dir):
+        """A retry only asks for the bytes missing from the .part file."""
+        dest = temp_dir / "exporter.tar.gz"
+        first = fake_response(
+            200,
+            [CONTENT[:4000], CONTENT[4000:]],
+            {"Content-Length": str(len(CONTENT))},
+            fail_after=1,
+        )
+        mock_get.side_effect = [first]
+
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            downloader.download(URL, str(dest))
+        assert (temp_dir / "exporter.tar.gz.part").stat().st_size == 4000
+
+        mock_get.side_effect = ranged_server(CONTENT)
+        result = downloader.download(URL, str(dest))
+
+        assert mock_get.call_args.kwargs["headers"] == {"Range": "bytes=4000-"}
+        assert dest.read_bytes() == CONTENT
+        assert result.size == len(CONTENT)
+        assert result.sha256 == hashlib.sha256(CONTENT).hexdigest()
+        assert not (temp_dir / "exporter.tar.gz.part").exists()
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_restarts_when_range_ignored(self, mock_get, temp_dir):
+        """A 200 answer to a Range request replaces the .part file."""
+        dest = temp_dir / "exporter.tar.gz"
+        (temp_dir / "exporter.tar.gz.part").write_bytes(b"stale")
+        mock_get.side_effect = ranged_server(CONTENT, ignore_range=True)
+
+        downloader.download(URL, str(dest))
+
+        assert dest.read_bytes() == CONTENT
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_short_body_is_incomplete(self, mock_get, temp_dir):
+        """A body shorter than Content-Length is kept for resuming, not published."""
+        dest = temp_dir / "exporter.tar.gz"
+        mock_get.return_value = fake_response(
+            200, [CONTENT[:100]], {"Content-Length": str(len(CONTENT))}
+        )
+
+        with pytest.raises(downloader.IncompleteDownload):
+            downloader.download(URL, str(dest))
+
+        assert not dest.exists()
+        assert (temp_dir / "exporter.tar.gz.part").exists()
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_checksum_mismatch_discards_file(self, mock_get, temp_dir):
+        """A file that does not match the expected digest is deleted."""
+        dest = temp_dir / "exporter.tar.gz"
+        mock_get.side_effect = ranged_server(CONTENT)
+
+        with pytest.raises(downloader.ChecksumMismatch):
+            downloader.download(URL, str(dest), expected_sha256="0" * 64)
+
+        assert not dest.exists()
+        assert not (temp_dir / "exporter.tar.gz.part").exists()
+
+    @patch("core.engine.downloader.settings.DOWNLOAD_SEGMENT_MIN_BYTES", 1024)
+    @patch("core.engine.downloader.http_client.head")
+    @patch("core.engine.downloader.http_client.get")
+    def test_parallel_segments(self, mock_get, mock_head, temp_dir):
+        """Large files are fetched as ranged segments and joined in order."""
+        dest = temp_dir / "exporter.tar.gz"
+        mock_head.return_value = MagicMock(
+            status_code=200,
+            headers={"Accept-Ranges": "bytes", "Content-Length": str(len(CONTENT))},
+        )
+        mock_get.side_effect = ranged_server(CONTENT)
+
+        result = downloader.download(URL, str(dest), segments=4)
+
+        assert mock_get.call_count == 4
+        assert dest.read_bytes() == CONTENT
+        assert result.sha256 == hashlib.sha256(CONTENT).hexdigest()
+        assert sorted(p.name for p in temp_dir.iterdir()) == ["exporter.tar.gz"]
+
+
+class TestStream:
+    """Tests for stream function."""
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_reads_and_saves_in_one_pass(self, mock_get, temp_dir):
+        """The reader sees the body as it arrives; the rest is saved on exit."""
+        dest = temp_dir / "exporter.tar.gz"
+        mock_get.return_value = fake_response(
+            200, [CONTENT[:4000], CONTENT[4000:]], {"Content-Length": str(len(CONTENT))}
+        )
+
+        with downloader.stream(URL, str(dest)) as download:
+            assert download.reader.read(10) == CONTENT[:10]
+
+        assert mock_get.call_count == 1
+        assert dest.read_bytes() == CONTENT
+        assert download.result.sha256 == hashlib.sha256(CONTENT).hexdigest()
+        assert not (temp_dir / "exporter.tar.gz.part").exists()
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_interrupted_stream_resumes_from_part_file(self, mock_get, temp_dir):
+        """A retry completes the .part file with a Range request, then reads it."""
+        dest = temp_dir / "exporter.tar.gz"
+        mock_get.return_value = fake_response(
+            200,
+            [CONTENT[:4000], CONTENT[4000:]],
+            {"Content-Length": str(len(CONTENT))},
+            fail_after=1,
+        )
+        interrupted = pytest.raises(requests.exceptions.ChunkedEncodingError)
+        with interrupted, downloader.stream(URL, str(dest)) as download:
+            download.reader.read()
+
+        mock_get.return_value = None
+        mock_get.side_effect = ranged_server(CONTENT)
+        with downloader.stream(URL, str(dest)) as download:
+            assert download.reader.read() == CONTENT
+
+        assert mock_get.call_args.kwargs["headers"] == {"Range": "bytes=4000-"}
+        assert download.result.size == len(CONTENT)
+
+    @patch("core.engine.downloader.http_client.get")
+    def test_checksum_checked_once_read(self, mock_get, temp_dir):
+        """A mismatch is raised when the block exits and the file is discarded."""
+        dest = temp_dir / "exporter.tar.gz"
+        mock_get.side_effect = ranged_server(CONTENT)
+
+        mismatch = pytest.raises(downloader.ChecksumMismatch)
+        with mismatch, downloader.stream(URL, str(dest), expected_sha256="0" * 64):
+            pass
+
+        assert list(temp_dir.iterdir()) == []
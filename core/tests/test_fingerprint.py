@@ -0,0 +1,102 @@
+"""
+Unit tests for core.engine.fingerprint module.
+"""
+
+import pytest
+import yaml
+
+from core.config import settings
+from core.engine import fingerprint
+
+
+@pytest.fixture
+def template_dir(temp_dir):
+    root = temp_dir / "templates"
+    root.mkdir()
+    for name in ("default.spec.j2", "Dockerfile.j2", "debian_control.j2"):
+        (root / name).write_text(f"{name}\n")
+    return root
+
+
+@pytest.fixture
+def exporter_dir(mock_exporter_dir, sample_manifest):
+    sample_manifest["artifacts"]["deb"] = {"enabled": True}
+    with open(mock_exporter_dir / "manifest.yaml", "w") as f:
+        yaml.dump(sample_manifest, f)
+    (mock_exporter_dir / "assets" / "config.yml").write_text("a: 1\n")
+    return mock_exporter_dir
+
+
+def compute(exporter_dir, template_dir):
+    return fingerprint.compute(str(exporter_dir / "manifest.yaml"), str(template_dir))
+
+
+class TestCompute:
+    """Tests for compute."""
+
+    def test_enabled_types_only(self, exporter_dir, template_dir):
+        assert sorted(compute(exporter_dir, template_dir)) == ["deb", "docker", "rpm"]
+
+    def test_stable(self, exporter_dir, template_dir):
+        assert compute(exporter_dir, template_dir) == compute(
+            exporter_dir, template_dir
+        )
+
+    def test_asset_change_affects_every_type(self, exporter_dir, template_dir):
+        before = compute(exporter_dir, template_dir)
+        (exporter_dir / "assets" / "config.yml").write_text("a: 2\n")
+
+        after = compute(exporter_dir, template_dir)
+
+        assert fingerprint.changed_artifact_types(after, before) == [
+            "deb",
+            "docker",
+            "rpm",
+        ]
+
+    def test_core_template_change_affects_its_type(self, exporter_dir, template_dir):
+        before = compute(exporter_dir, template_dir)
+        (template_dir / "Dockerfile.j2").write_text("FROM scratch\n")
+
+        after = compute(exporter_dir, template_dir)
+
+        assert fingerprint.changed_artifact_types(after, before) == ["docker"]
+
+    def test_overridden_core_template_ignored(self, exporter_dir, template_dir):
+        (exporter_dir / "templates").mkdir()
+        (exporter_dir / "templates" / "Dockerfile.j2").write_text("FROM custom\n")
+        before = compute(exporter_dir, template_dir)
+        (template_dir / "Dockerfile.j2").write_text("FROM scratch\n")
+
+        assert compute(exporter_dir, template_dir) == before
+
+    def test_custom_template_by_name(self, exporter_dir, template_dir):
+        before = compute(exporter_dir, template_dir)
+        (exporter_dir / "templates").mkdir()
+        (exporter_dir / "templates" / "test_exporter.spec.j2").write_text("custom\n")
+        (template_dir / "default.spec.j2").write_text("changed\n")
+
+        after = compute(exporter_dir, template_dir)
+
+        # The new per-exporter template changes every type; the edited default
+        # spec is no longer used.
+        assert fingerprint.changed_artifact_types(after, before) == [
+            "deb",
+            "docker",
+            "rpm",
+        ]
+        assert compute(exporter_dir, template_dir) == after
+
+    def test_core_version_change(self, exporter_dir, template_dir, monkeypatch):
+        before = compute(exporter_dir, template_dir)
+        monkeypatch.setattr(settings, "CORE_VERSION", "v99.0.0")
+
+        after = compute(exporter_dir, template_dir)
+
+        assert all(after[t] != before[t] for t in before)
+
+
+def test_changed_artifact_types_new_type():
+    assert fingerprint.changed_artifact_types(
+        {"rpm": "a", "deb": "b"}, {"rpm": "a"}
+    ) == ["deb"]
@@ -0,0 +1,140 @@
+"""
+Unit tests for core.engine.http_client module.
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from core.config import settings
+from core.engine import http_client
+
+
+def make_response(status_code, content=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    response.encoding = "utf-8"
+    return response
+
+
+@pytest.fixture(autouse=True)
+def isolated_client(temp_dir, monkeypatch):
+    """Point the conditional cache at a temp dir and start with no sessions."""
+    monkeypatch.setattr(settings, "CACHE_DIR", str(temp_dir))
+    http_client.close()
+    yield
+    http_client.close()
+
+
+class TestSessions:
+    """Tests for per-host session pooling."""
+
+    def test_session_reused_per_host(self):
+        """Requests to one host share a session; other hosts get their own."""
+        first = http_client.session_for("https://api.github.com/repos/a/b")
+        second = http_client.session_for("https://api.github.com/repos/c/d")
+        other = http_client.session_for("https://github.com/a/b")
+
+        assert first is second
+        assert first is not other
+
+    def test_session_without_retries(self):
+        """Callers with their own retry loop get a session that sends once."""
+        url = "https://uploads.github.com/repos/a/b/releases/1/assets"
+        retrying = http_client.session_for(url).get_adapter(url).max_retries
+        once = http_client.session_for(url, retries=False).get_adapter(url)
+
+        assert retrying.total == settings.HTTP_RETRIES
+        assert once.max_retries.total == 0
+
+
+class TestRateLimit:
+    """Tests for the recorded X-RateLimit-* state."""
+
+    def test_rate_limit_recorded_per_host_and_resource(self):
+        url = "https://api.github.com/repos/owner/repo"
+        response = make_response(
+            200,
+            headers={
+                "X-RateLimit-Limit": "5000",
+                "X-RateLimit-Remaining": "4999",
+                "X-RateLimit-Reset": "1700000000",
+                "X-RateLimit-Resource": "graphql",
+            },
+        )
+        response.url = url
+        for hook in http_client.session_for(url).hooks["response"]:
+            hook(response)
+
+        assert http_client.rate_limit(url) is None
+        assert http_client.rate_limit(url, "graphql") == {
+            "limit": 5000,
+            "remaining": 4999,
+            "reset": 1700000000,
+        }
+        http_client.close()
+        assert http_client.rate_limit(url, "graphql") is None
+
+
+class TestConditionalGet:
+    """Tests for conditional GET caching."""
+
+    def test_not_modified_serves_cached_body(self):
+        """A 304 is turned into a 200 carrying the previously cached body."""
+        url = "https://api.github.com/repos/owner/repo/license"
+        session = Mock()
+        session.get.side_effect = [
+            make_response(200, b'{"license": "MIT"}', {"ETag": '"abc"'}),
+            make_response(304, headers={"ETag": '"abc"'}),
+        ]
+
+        with patch.object(http_client, "session_for", return_value=session):
+            fresh = http_client.get(url, conditional=True)
+            cached = http_client.get(url, conditional=True)
+
+        assert fresh.from_cache is False
+        assert cached.status_code == 200
+        assert cached.from_cache is True
+        assert cached.json() == {"license": "MIT"}
+        second_headers = session.get.call_args_list[1].kwargs["headers"]
+        assert second_headers["If-None-Match"] == '"abc"'
+
+    def test_response_without_validators_not_cached(self):
+        """Responses without ETag/Last-Modified are never revalidated."""
+        url = "https://example.com/data"
+        session = Mock()
+        session.get.return_value = make_response(200, b"data")
+
+        with patch.object(http_client, "session_for", return_value=session):
+            http_client.get(url, conditional=True)
+            http_client.get(url, conditional=True)
+
+        second_headers = session.get.call_args_list[1].kwargs["headers"]
+        assert "If-None-Match" not in second_headers
+
+
+class TestRetryAfter:
+    """Tests for retry_after function."""
+
+    def test_delta_seconds(self):
+        response = make_response(429, headers={"Retry-After": "7"})
+        assert http_client.retry_after(response) == 7
+
+    def test_missing_header(self):
+        assert http_client.retry_after(make_response(503)) is None
+        assert http_client.retry_after(None) is None
+
+    def test_long_wait_capped(self, monkeypatch):
+        """Neither the helper nor the pooled retries wait past the cap."""
+        monkeypatch.setattr(settings, "HTTP_MAX_RETRY_AFTER", 60)
+        response = make_response(429, headers={"Retry-After": "3600"})
+        url = "https://api.github.com/repos/a/b"
+        retry = http_client.session_for(url).get_adapter(url).max_retries
+
+        assert http_client.retry_after(response) == 60
+        assert retry.get_retry_after(Mock(headers={"Retry-After": "3600"})) == 60
+        assert retry.get_retry_after(Mock(headers={"Retry-After": "5"})) == 5
+        assert retry.get_retry_after(Mock(headers={})) is None
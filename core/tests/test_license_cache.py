@@ -0,0 +1,93 @@
+"""
+Unit tests for core.engine.license_cache module.
+"""
+
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from core.engine.license_cache import LicenseCache, fetch_license
+
+
+@pytest.fixture
+def cache(temp_dir):
+    return LicenseCache(str(temp_dir / "licenses.json"), ttl=3600)
+
+
+class TestLicenseCache:
+    """Tests for LicenseCache."""
+
+    def test_network_only_on_miss(self, cache, temp_dir):
+        """A second lookup, even from a new process, is served from disk."""
+        fetch = Mock(return_value="MIT")
+
+        assert cache.lookup("owner/repo", fetch) == "MIT"
+        reopened = LicenseCache(str(temp_dir / "licenses.json"), ttl=3600)
+        assert reopened.lookup("owner/repo", fetch) == "MIT"
+
+        fetch.assert_called_once_with("owner/repo")
+
+    def test_expired_entry_refetched(self, cache):
+        cache.update({"owner/repo": "MIT"})
+        cache.entries()["owner/repo"]["fetched_at"] = time.time() - 7200
+
+        assert cache.lookup("owner/repo", Mock(return_value="Apache-2.0")) == (
+            "Apache-2.0"
+        )
+
+    def test_failure_falls_back_to_expired_entry(self, cache):
+        """A rate-limited call keeps the last known license instead of a guess."""
+        cache.update({"owner/repo": "MIT"})
+        cache.entries()["owner/repo"]["fetched_at"] = time.time() - 7200
+        fetch = Mock(side_effect=requests.exceptions.HTTPError("403"))
+
+        assert cache.lookup("owner/repo", fetch) == "MIT"
+
+    def test_failure_not_cached(self, cache):
+        fetch = Mock(side_effect=requests.exceptions.Timeout("timeout"))
+
+        with pytest.raises(requests.exceptions.Timeout):
+            cache.lookup("owner/repo", fetch)
+
+        assert cache.get("owner/repo", allow_stale=True) is None
+
+    def test_seed_skips_fresh_entries(self, cache):
+        cache.update({"owner/cached": "MIT"})
+        licenses = {"owner/a": "Apache-2.0", "owner/b": None}
+
+        def fetch_one(repo):
+            if repo not in licenses:
+                raise requests.exceptions.Timeout("timeout")
+            return licenses[repo]
+
+        fetch = Mock(side_effect=fetch_one)
+
+        fetched, failed = cache.seed(
+            ["owner/cached", "owner/a", "owner/b", "owner/c"], jobs=2, fetch=fetch
+        )
+
+        assert fetched == {"owner/a": "Apache-2.0", "owner/b": None}
+        assert list(failed) == ["owner/c"]
+        assert cache.get("owner/b")["spdx_id"] is None
+        assert "owner/cached" not in [c.args[0] for c in fetch.call_args_list]
+
+
+class TestFetchLicense:
+    """Tests for fetch_license function."""
+
+    @patch("core.engine.license_cache.http_client.get")
+    def test_no_license_is_none(self, mock_get):
+        mock_get.return_value = Mock(status_code=404)
+
+        assert fetch_license("owner/repo") is None
+
+    @patch("core.engine.license_cache.http_client.get")
+    def test_rate_limit_raises(self, mock_get):
+        response = Mock(status_code=403)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError("403")
+        mock_get.return_value = response
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            fetch_license("owner/repo")
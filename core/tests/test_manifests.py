@@ -0,0 +1,81 @@
+"""
+Unit tests for core.engine.manifests module.
+"""
+
+from unittest.mock import patch
+
+import pytest
+import yaml
+from marshmallow import ValidationError
+
+from core.engine import manifests
+
+
+class TestLoadValidated:
+    """Tests for load_validated and the manifest caches."""
+
+    def test_applies_schema_defaults(self, sample_manifest_file):
+        data = manifests.load_validated(sample_manifest_file)
+
+        assert data["name"] == "test_exporter"
+        assert data["build"]["binary_name"] == "test_exporter"
+        assert data["artifacts"]["docker"]["base_image"]
+
+    def test_unchanged_file_parsed_once(self, sample_manifest_file):
+        with patch("core.engine.manifests.yaml.load", wraps=yaml.load) as load:
+            manifests.load_validated(sample_manifest_file)
+            manifests.load_raw(sample_manifest_file)
+            manifests.validation_errors(sample_manifest_file)
+
+        assert load.call_count == 1
+
+    def test_disk_cache_survives_process(self, sample_manifest_file):
+        manifests.load_validated(sample_manifest_file)
+        manifests.clear_memory_cache()
+
+        with patch("core.engine.manifests.yaml.load") as load:
+            data = manifests.load_validated(sample_manifest_file)
+
+        load.assert_not_called()
+        assert data["name"] == "test_exporter"
+
+    def test_changed_file_reloaded(self, sample_manifest_file, sample_manifest):
+        manifests.load_validated(sample_manifest_file)
+        sample_manifest["version"] = "v2.0.0"
+        with open(sample_manifest_file, "w") as f:
+            yaml.dump(sample_manifest, f)
+
+        assert manifests.load_validated(sample_manifest_file)["version"] == "v2.0.0"
+
+    def test_returns_independent_copies(self, sample_manifest_file):
+        data = manifests.load_validated(sample_manifest_file)
+        data["version"] = "mutated"
+        data["build"]["archs"].append("riscv64")
+
+        again = manifests.load_validated(sample_manifest_file)
+        assert again["version"] == "v1.0.0"
+        assert again["build"]["archs"] == ["amd64", "arm64"]
+
+    def test_invalid_manifest(self, temp_dir, sample_manifest):
+        del sample_manifest["upstream"]
+        path = temp_dir / "manifest.yaml"
+        with open(path, "w") as f:
+            yaml.dump(sample_manifest, f)
+
+        with pytest.raises(ValidationError) as exc_info:
+            manifests.load_validated(path)
+
+        assert "upstream" in exc_info.value.messages
+        assert "upstream" in manifests.validation_errors(path)
+        assert manifests.load_raw(path)["name"] == "test_exporter"
+
+
+def test_manifest_paths_sorted(temp_dir):
+    for name in ("b_exporter", "a_exporter"):
+        (temp_dir / name).mkdir()
+        (temp_dir / name / "manifest.yaml").write_text("name: x\n")
+    (temp_dir / "no_manifest").mkdir()
+
+    paths = manifests.manifest_paths(str(temp_dir))
+
+    assert [p.split("/")[-2] for p in paths] == ["a_exporter", "b_exporter"]
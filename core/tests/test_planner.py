@@ -0,0 +1,135 @@
+"""
+Unit tests for core.engine.planner module.
+"""
+
+import json
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from core.engine.planner import build_plan, build_units, main, pack
+
+
+@pytest.fixture
+def exporters_dir(temp_dir, sample_manifest):
+    """Two exporters: one RPM-only on two archs, one RPM+DEB on amd64."""
+    root = temp_dir / "exporters"
+    second = {
+        **sample_manifest,
+        "name": "other_exporter",
+        "build": {**sample_manifest["build"], "archs": ["amd64"]},
+        "artifacts": {
+            "rpm": {"enabled": True, "targets": ["el8", "el9"]},
+            "deb": {"enabled": True, "targets": ["debian-12", "unknown-1"]},
+        },
+    }
+    for name, manifest in (("test_exporter", sample_manifest), ("other", second)):
+        (root / name).mkdir(parents=True)
+        with open(root / name / "manifest.yaml", "w") as f:
+            yaml.dump(manifest, f)
+    return root
+
+
+def unit(exporter, arch="amd64", dist="el9"):
+    return {"exporter": exporter, "arch": arch, "dist": dist, "image": "img"}
+
+
+class TestBuildUnits:
+    """Tests for build_units."""
+
+    def test_expands_targets_and_archs(self, exporters_dir):
+        units = build_units(["test_exporter", "other"], str(exporters_dir))
+
+        assert [(u["exporter"], u["dist"], u["arch"]) for u in units["rpm"]] == [
+            ("test_exporter", "el9", "amd64"),
+            ("test_exporter", "el9", "arm64"),
+            ("other", "el8", "amd64"),
+            ("other", "el9", "amd64"),
+        ]
+        # Unsupported distributions are dropped
+        assert [u["dist"] for u in units["deb"]] == ["debian-12"]
+        assert units["deb"][0]["image"] == "debian:12"
+
+    def test_missing_manifest_skipped(self, exporters_dir, capsys):
+        units = build_units(["missing", "other"], str(exporters_dir))
+
+        assert {u["exporter"] for u in units["rpm"]} == {"other"}
+        assert "Failed to process missing" in capsys.readouterr().err
+
+    def test_build_types_restrict_package_types(self, exporters_dir):
+        units = build_units(
+            ["test_exporter", "other"],
+            str(exporters_dir),
+            build_types={"test_exporter": ["docker"], "other": ["deb"]},
+        )
+
+        assert units["rpm"] == []
+        assert [u["exporter"] for u in units["deb"]] == ["other"]
+
+
+class TestPack:
+    """Tests for pack."""
+
+    def test_one_unit_per_job_under_cap(self):
+        jobs = pack("rpm", [unit("a"), unit("b", "arm64")], max_jobs=256)
+
+        assert [len(job["units"]) for job in jobs] == [1, 1]
+        assert [job["qemu"] for job in jobs] == [True, False]
+
+    def test_respects_job_cap(self):
+        units = [unit(f"e{i}", arch) for i in range(200) for arch in ("amd64", "arm64")]
+
+        jobs = pack("rpm", units, max_jobs=256)
+
+        assert len(jobs) == 256
+        assert sum(len(job["units"]) for job in jobs) == 400
+
+    def test_balances_expected_durations(self):
+        durations = {
+            "rpm/a/el9/amd64": 100,
+            "rpm/b/el9/amd64": 60,
+            "rpm/c/el9/amd64": 50,
+            "rpm/d/el9/amd64": 40,
+        }
+        units = [unit(name) for name in "abcd"]
+
+        jobs = pack("rpm", units, max_jobs=2, durations=durations)
+
+        assert sorted(job["expected_seconds"] for job in jobs) == [110, 140]
+        assert sorted(len(job["units"]) for job in jobs) == [2, 2]
+
+    def test_stable_output(self):
+        units = [unit(f"e{i}", arch) for i in range(10) for arch in ("amd64", "arm64")]
+
+        assert pack("rpm", units, max_jobs=3) == pack(
+            "rpm", list(reversed(units)), max_jobs=3
+        )
+
+
+def test_cli_writes_github_output(exporters_dir, temp_dir, monkeypatch):
+    output = temp_dir / "github_output"
+    monkeypatch.setenv("GITHUB_OUTPUT", str(output))
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "--exporters",
+            '["test_exporter", "other"]',
+            "--max-jobs",
+            "2",
+            "--exporters-dir",
+            str(exporters_dir),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    lines = dict(line.split("=", 1) for line in output.read_text().splitlines())
+    assert (
+        json.loads(lines["rpm_matrix"])
+        == build_plan(["test_exporter", "other"], 2, exporters_dir=str(exporters_dir))[
+            "rpm"
+        ]
+    )
+    assert len(json.loads(lines["deb_matrix"])["include"]) == 1
+    assert json.loads(lines["docker_exporters"]) == ["test_exporter", "other"]
@@ -0,0 +1,106 @@
+"""
+Unit tests for core.engine.query module.
+"""
+
+import json
+import shlex
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from core.engine.query import main, shell_value
+
+
+@pytest.fixture
+def exporters_dir(temp_dir, sample_manifest):
+    root = temp_dir / "exporters"
+    for name, version in (("test_exporter", "v1.0.0"), ("other_exporter", "2.1.0")):
+        (root / name).mkdir(parents=True)
+        with open(root / name / "manifest.yaml", "w") as f:
+            yaml.dump({**sample_manifest, "name": name, "version": version}, f)
+    return root
+
+
+def run(exporters_dir, *args):
+    return CliRunner().invoke(main, [*args, "--exporters-dir", str(exporters_dir)])
+
+
+class TestQueryCli:
+    """Tests for the query command."""
+
+    def test_shell_output(self, exporters_dir):
+        result = run(
+            exporters_dir,
+            "test_exporter",
+            "-f",
+            "version=clean_version",
+            "-f",
+            "v_port=artifacts.docker.validation.port",
+            "-f",
+            "v_cmd=artifacts.docker.validation.command",
+            "-f",
+            "description",
+        )
+
+        assert result.exit_code == 0, result.output
+        assert result.output.splitlines() == [
+            "version=1.0.0",
+            "v_port=9100",
+            "v_cmd=''",
+            "description='Test exporter for unit tests'",
+        ]
+
+    def test_shell_output_prefixed_for_many(self, exporters_dir):
+        result = run(exporters_dir, "--all", "-f", "build.archs")
+
+        assert result.exit_code == 0, result.output
+        assert result.output.splitlines() == [
+            "other_exporter_build_archs='amd64 arm64'",
+            "test_exporter_build_archs='amd64 arm64'",
+        ]
+
+    def test_json_output_uses_schema_defaults(self, exporters_dir):
+        result = run(
+            exporters_dir,
+            "test_exporter",
+            "other_exporter",
+            "--format",
+            "json",
+            "-f",
+            "base_image=artifacts.docker.base_image",
+            "-f",
+            "platforms",
+        )
+
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.output)
+        assert data["other_exporter"]["platforms"] == ["linux/amd64", "linux/arm64"]
+        assert data["test_exporter"]["base_image"].startswith("registry.")
+
+    def test_unknown_field_rejected(self, exporters_dir):
+        result = run(exporters_dir, "test_exporter", "-f", "verison")
+
+        assert result.exit_code == 2
+        assert "unknown manifest field 'verison'" in result.output
+
+    def test_missing_exporter(self, exporters_dir):
+        result = run(exporters_dir, "missing", "-f", "version")
+
+        assert result.exit_code == 1
+        assert "Manifest not found" in result.output
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (None, ""),
+        (True, "true"),
+        (["a", "b"], "a b"),
+        ([{"source": "x"}], '[{"source": "x"}]'),
+        ("it's", "it's"),
+    ],
+)
+def test_shell_value(value, expected):
+    assert shell_value(value) == expected
+    assert shlex.split(shlex.quote(shell_value(value))) == [expected]
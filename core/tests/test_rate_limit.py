@@ -0,0 +1,105 @@
+"""
+Unit tests for core.engine.rate_limit module.
+"""
+
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from core.engine import http_client, rate_limit
+from core.engine.rate_limit import Budget
+
+
+@pytest.fixture(autouse=True)
+def no_recorded_limits():
+    http_client.close()
+    yield
+    http_client.close()
+
+
+def answer(url, remaining, reset, resource="core"):
+    """Run a response carrying rate limit headers through the session hook."""
+    response = requests.Response()
+    response.url = url
+    response.headers.update(
+        {
+            "X-RateLimit-Limit": "60",
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset),
+            "X-RateLimit-Resource": resource,
+        }
+    )
+    for hook in http_client.session_for(url).hooks["response"]:
+        hook(response)
+
+
+def test_unknown_budget_does_not_hold_back():
+    budget = Budget("core", None, reserve=10, max_wait=0)
+
+    assert all(budget.acquire() for _ in range(100))
+    assert budget.spent == 100
+    assert budget.describe() == "100 core call(s), rate limit unknown"
+
+
+def test_budget_stops_at_the_reserve():
+    reset = int(time.time()) + 3600
+    budget = Budget("core", {"remaining": 5, "reset": reset}, reserve=2, max_wait=60)
+
+    assert [budget.acquire() for _ in range(5)] == [True, True, True, False, False]
+    assert budget.spent == 3
+    assert budget.describe().startswith("3 core call(s), 2 left until ")
+
+
+def test_budget_waits_for_a_close_reset():
+    budget = Budget(
+        "core", {"remaining": 0, "reset": int(time.time())}, reserve=0, max_wait=60
+    )
+
+    with patch.object(rate_limit.time, "sleep") as sleep:
+        assert budget.acquire() is True
+
+    sleep.assert_called_once()
+    assert sleep.call_args.args[0] <= 1
+    assert budget.remaining is None
+
+
+def test_budget_follows_answers():
+    reset = int(time.time()) + 3600
+    budget = Budget("core", {"remaining": 50, "reset": reset}, reserve=10, max_wait=0)
+    assert budget.acquire()
+
+    # Another client spent the budget meanwhile
+    answer("https://api.github.com/repos/a/b", 10, reset)
+    assert not budget.acquire()
+
+    # GraphQL answers do not touch the core budget
+    answer("https://api.github.com/graphql", 0, reset, resource="graphql")
+    answer("https://api.github.com/repos/a/b", 30, reset)
+    assert budget.acquire()
+    assert budget.remaining == 29
+
+
+@patch("core.engine.rate_limit.http_client.get")
+def test_for_github_reads_rate_limit_endpoint(mock_get):
+    mock_get.return_value = Mock(status_code=200)
+    mock_get.return_value.json.return_value = {
+        "resources": {
+            "core": {"limit": 5000, "remaining": 4000, "reset": 1700000000},
+            "graphql": {"limit": 5000, "remaining": 12, "reset": 1700000000},
+        }
+    }
+
+    budget = Budget.for_github("graphql", "secret")
+
+    assert budget.remaining == 12
+    assert mock_get.call_args.kwargs["headers"]["Authorization"] == "token secret"
+
+
+@patch("core.engine.rate_limit.http_client.get")
+def test_fetch_rate_limit_failure(mock_get):
+    mock_get.side_effect = requests.exceptions.ConnectionError()
+
+    assert rate_limit.fetch_rate_limit() == {}
+    assert Budget.for_github().remaining is None
@@ -0,0 +1,95 @@
+"""
+Unit tests for core.engine.scan_state module.
+"""
+
+import json
+
+from core.config import settings
+from core.engine.scan_state import ScanState, polling_interval
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+def test_stalest_first(temp_dir):
+    state = ScanState(str(temp_dir / "scan-state.json"))
+    state.update({"owner/a": "v1.0.0"}, now=200)
+    state.update({"owner/b": "v2.0.0"}, now=100)
+
+    order = state.stalest_first(["owner/a", "owner/b", "owner/new", "owner/a"])
+
+    assert order == ["owner/new", "owner/b", "owner/a"]
+
+
+def test_update_keeps_other_entries(temp_dir):
+    path = temp_dir / "watcher" / "scan-state.json"
+    state = ScanState(str(path))
+    state.update({"owner/a": "v1.0.0", "owner/b": "v2.0.0"}, now=100)
+    state.update({"owner/a": "v1.1.0"}, now=200)
+
+    assert json.loads(path.read_text()) == {
+        "owner/a": {"checked_at": 200, "tag": "v1.1.0", "releases": [200]},
+        "owner/b": {"checked_at": 100, "tag": "v2.0.0", "releases": []},
+    }
+
+
+def test_update_without_tag_records_the_check(temp_dir):
+    state = ScanState(str(temp_dir / "scan-state.json"))
+    state.update({"owner/a": "v1.0.0"}, now=100)
+    state.update({"owner/a": None, "owner/b": None}, now=200)
+    state.update({"owner/a": "v1.0.0"}, now=300)
+
+    assert state.entries() == {
+        "owner/a": {"checked_at": 300, "tag": "v1.0.0", "releases": []},
+        "owner/b": {"checked_at": 200, "tag": None, "releases": []},
+    }
+    assert state.due(["owner/a", "owner/b"], now=300) == []
+
+
+def test_polling_interval(monkeypatch):
+    monkeypatch.setattr(settings, "WATCHER_CADENCE_FRACTION", 0.25)
+    monkeypatch.setattr(settings, "WATCHER_MIN_INTERVAL", HOUR)
+    monkeypatch.setattr(settings, "WATCHER_MAX_INTERVAL", 3 * DAY)
+    monkeypatch.setattr(settings, "WATCHER_DEFAULT_INTERVAL", DAY)
+
+    assert polling_interval([]) == DAY
+    assert polling_interval([0]) == DAY
+    # Weekly releases, one late: the median gap is a week
+    weekly = [0, 7 * DAY, 14 * DAY, 30 * DAY]
+    assert polling_interval(weekly) == 7 * DAY / 4
+    assert polling_interval([0, 60, 120]) == HOUR
+    assert polling_interval([0, 365 * DAY]) == 3 * DAY
+
+
+def test_release_history_sets_next_check(temp_dir, monkeypatch):
+    monkeypatch.setattr(settings, "WATCHER_RELEASE_HISTORY", 3)
+    state = ScanState(str(temp_dir / "scan-state.json"))
+    for day, tag in enumerate(["v1", "v1", "v2", "v3", "v3", "v4", "v5"]):
+        state.update({"owner/a": tag}, now=day * DAY)
+
+    # First sighting is no release; the last three releases are kept
+    assert state.entries()["owner/a"]["releases"] == [3 * DAY, 5 * DAY, 6 * DAY]
+    assert state.next_check("owner/a") == 6 * DAY + polling_interval(
+        [3 * DAY, 5 * DAY, 6 * DAY]
+    )
+    assert state.next_check("owner/new") == 0
+
+
+def test_due(temp_dir):
+    state = ScanState(str(temp_dir / "scan-state.json"))
+    state.update({"owner/b": "v1"}, now=0)
+    state.update({"owner/b": "v2"}, now=DAY)
+    state.update({"owner/a": "v1", "owner/b": "v3"}, now=2 * DAY)
+
+    repos = ["owner/a", "owner/b", "owner/new"]
+    assert state.due(repos, now=2 * DAY + HOUR) == ["owner/new"]
+    # b releases daily: checked every few hours, a at the default interval
+    assert state.due(repos, now=2 * DAY + 6 * HOUR) == ["owner/new", "owner/b"]
+    assert state.due(repos, now=4 * DAY) == ["owner/new", "owner/a", "owner/b"]
+
+
+def test_missing_or_corrupt_file(temp_dir):
+    path = temp_dir / "scan-state.json"
+    assert ScanState(str(path)).entries() == {}
+    path.write_text("{")
+    assert ScanState(str(path)).stalest_first(["owner/a"]) == ["owner/a"]
@@ -0,0 +1,83 @@
+"""
+Unit tests for core.engine.staging module.
+"""
+
+import hashlib
+import os
+
+import pytest
+
+from core.engine import staging
+from core.engine.staging import file_digest, stage_file
+
+
+@pytest.fixture
+def source(temp_dir):
+    path = temp_dir / "source"
+    path.write_bytes(b"binary content")
+    os.chmod(path, 0o755)
+    return path
+
+
+def fake_clone(dst_fd, request, src_fd):
+    assert request == staging.FICLONE
+    os.write(dst_fd, os.read(src_fd, 1024))
+
+
+def unsupported(dst_fd, request, src_fd):
+    raise OSError(95, "Operation not supported")
+
+
+class TestStageFile:
+    """Tests for stage_file."""
+
+    def test_reflink_first(self, source, temp_dir, monkeypatch):
+        monkeypatch.setattr(staging.fcntl, "ioctl", fake_clone)
+        dst = temp_dir / "dst"
+
+        assert stage_file(str(source), str(dst)) == "reflink"
+        assert dst.read_bytes() == b"binary content"
+        assert os.stat(dst).st_ino != os.stat(source).st_ino
+        assert os.stat(dst).st_mode & 0o777 == 0o755
+
+    def test_hardlink_when_reflink_unsupported(self, source, temp_dir, monkeypatch):
+        monkeypatch.setattr(staging.fcntl, "ioctl", unsupported)
+        dst = temp_dir / "dst"
+
+        assert stage_file(str(source), str(dst), mode=0o755) == "hardlink"
+        assert os.stat(dst).st_ino == os.stat(source).st_ino
+        assert not (temp_dir / "dst").is_symlink()
+
+    def test_no_hardlink_when_mode_differs(self, source, temp_dir, monkeypatch):
+        monkeypatch.setattr(staging.fcntl, "ioctl", unsupported)
+        dst = temp_dir / "dst"
+
+        assert stage_file(str(source), str(dst), mode=0o644) == "copy"
+        assert os.stat(dst).st_mode & 0o777 == 0o644
+        assert os.stat(source).st_mode & 0o777 == 0o755
+
+    def test_copy_only(self, source, temp_dir):
+        dst = temp_dir / "dst"
+
+        assert stage_file(str(source), str(dst), methods=("copy",)) == "copy"
+        assert dst.read_bytes() == b"binary content"
+        assert os.stat(dst).st_ino != os.stat(source).st_ino
+
+    def test_replaces_hardlinked_destination(self, source, temp_dir, monkeypatch):
+        monkeypatch.setattr(staging.fcntl, "ioctl", unsupported)
+        dst = temp_dir / "dst"
+        stage_file(str(source), str(dst))
+        other = temp_dir / "other"
+        other.write_bytes(b"new content")
+
+        stage_file(str(other), str(dst), methods=("copy",))
+
+        assert dst.read_bytes() == b"new content"
+        assert source.read_bytes() == b"binary content"
+
+
+def test_file_digest(source):
+    assert file_digest(str(source)) == {
+        "sha256": hashlib.sha256(b"binary content").hexdigest(),
+        "size": 14,
+    }
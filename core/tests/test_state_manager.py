@@ -2,12 +2,16 @@
 Unit tests for core.engine.state_manager module.
 """
 
+import json
 from unittest.mock import Mock, patch
 
 import pytest
 import requests
 
+from core.config import settings
+from core.engine import http_client
 from core.engine.state_manager import (
+    exporters_to_build,
     get_local_state,
     get_remote_catalog,
 )
@@ -16,7 +20,7 @@ from core.engine.state_manager import (
 class TestGetRemoteCatalog:
     """Tests for get_remote_catalog function."""
 
-    @patch("core.engine.state_manager.requests.get")
+    @patch("core.engine.state_manager.http_client.get")
     def test_get_remote_catalog_success(self, mock_get, mock_catalog):
         """Test successful fetch of remote catalog."""
         mock_response = Mock()
@@ -28,7 +32,7 @@ class TestGetRemoteCatalog:
 
         assert result == {"node_exporter": "1.8.0", "prometheus": "2.45.0"}
 
-    @patch("core.engine.state_manager.requests.get")
+    @patch("core.engine.state_manager.http_client.get")
     def test_get_remote_catalog_404(self, mock_get):
         """Test handling of 404 response."""
         mock_response = Mock()
@@ -40,7 +44,7 @@ class TestGetRemoteCatalog:
         # Should return empty dict on 404
         assert result == {}
 
-    @patch("core.engine.state_manager.requests.get")
+    @patch("core.engine.state_manager.http_client.get")
     def test_get_remote_catalog_timeout(self, mock_get):
         """Test handling of request timeout."""
         mock_get.side_effect = requests.exceptions.Timeout("Timeout")
@@ -50,7 +54,7 @@ class TestGetRemoteCatalog:
         # Should return empty dict on error
         assert result == {}
 
-    @patch("core.engine.state_manager.requests.get")
+    @patch("core.engine.state_manager.http_client.get")
     def test_get_remote_catalog_connection_error(self, mock_get):
         """Test handling of connection error."""
         mock_get.side_effect = requests.exceptions.ConnectionError("Connection failed")
@@ -60,7 +64,7 @@ class TestGetRemoteCatalog:
         # Should return empty dict on error
         assert result == {}
 
-    @patch("core.engine.state_manager.requests.get")
+    @patch("core.engine.state_manager.http_client.get")
     def test_get_remote_catalog_empty_exporters(self, mock_get):
         """Test handling of catalog with empty exporters list."""
         mock_response = Mock()
@@ -72,6 +76,26 @@ class TestGetRemoteCatalog:
 
         assert result == {}
 
+    def test_get_remote_catalog_not_modified(self, temp_dir, mock_catalog, monkeypatch):
+        """An unchanged catalog (304) is read from the HTTP cache."""
+        monkeypatch.setattr(settings, "CACHE_DIR", str(temp_dir))
+        fresh = requests.Response()
+        fresh.status_code = 200
+        fresh._content = json.dumps(mock_catalog).encode()
+        fresh.headers["ETag"] = '"v1"'
+        not_modified = requests.Response()
+        not_modified.status_code = 304
+        session = Mock()
+        session.get.side_effect = [fresh, not_modified]
+
+        with patch.object(http_client, "session_for", return_value=session):
+            first = get_remote_catalog("https://example.com/catalog.json")
+            second = get_remote_catalog("https://example.com/catalog.json")
+
+        assert first == second == {"node_exporter": "1.8.0", "prometheus": "2.45.0"}
+        second_headers = session.get.call_args_list[1].kwargs["headers"]
+        assert second_headers["If-None-Match"] == '"v1"'
+
 
 class TestGetLocalState:
     """Tests for get_local_state function."""
@@ -199,3 +223,58 @@ class TestForceRebuild:
         should_build = True if force_rebuild else local_version != remote_version
 
         assert should_build is False
+
+
+class TestExportersToBuild:
+    """Tests for exporters_to_build with input fingerprints."""
+
+    LOCAL_FP = {"exp": {"rpm": "r1", "deb": "d1", "docker": "k1"}}
+
+    def test_version_change_rebuilds_all_types(self):
+        result = exporters_to_build(
+            {"exp": "1.0.0"},
+            {"exp": "1.1.0"},
+            remote_fingerprints=self.LOCAL_FP,
+            local_fingerprints=self.LOCAL_FP,
+        )
+
+        assert result == {"exp": ["deb", "docker", "rpm"]}
+
+    def test_changed_inputs_rebuild_changed_types(self):
+        remote_fp = {"exp": {"rpm": "r1", "deb": "d1", "docker": "k0"}}
+
+        result = exporters_to_build(
+            {"exp": "1.0.0"},
+            {"exp": "1.0.0"},
+            remote_fingerprints=remote_fp,
+            local_fingerprints=self.LOCAL_FP,
+        )
+
+        assert result == {"exp": ["docker"]}
+
+    def test_unchanged_inputs_skipped(self):
+        result = exporters_to_build(
+            {"exp": "1.0.0"},
+            {"exp": "1.0.0"},
+            remote_fingerprints=self.LOCAL_FP,
+            local_fingerprints=self.LOCAL_FP,
+        )
+
+        assert result == {}
+
+    def test_catalog_without_fingerprints_trusted(self):
+        result = exporters_to_build(
+            {"exp": "1.0.0"}, {"exp": "1.0.0"}, local_fingerprints=self.LOCAL_FP
+        )
+
+        assert result == {}
+
+    def test_force_rebuild(self):
+        result = exporters_to_build(
+            {"exp": "1.0.0"},
+            {"exp": "1.0.0"},
+            force_rebuild=True,
+            local_fingerprints={"exp": {"rpm": "r1"}},
+        )
+
+        assert result == {"exp": ["rpm"]}
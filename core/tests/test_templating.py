@@ -0,0 +1,66 @@
+"""
+Unit tests for core.engine.templating module.
+"""
+
+import os
+
+from jinja2 import ModuleLoader
+
+from core.config import settings
+from core.engine import templating
+from core.engine.builder import load_manifest
+
+
+def loaders_of(env):
+    return getattr(env.loader, "loaders", [env.loader])
+
+
+class TestGetEnvironment:
+    """Tests for get_environment function."""
+
+    def test_environment_shared_per_search_path(self):
+        first = templating.get_environment("packaging")
+        assert templating.get_environment("packaging") is first
+        assert templating.get_environment("portal") is not first
+
+    def test_bytecode_cached_on_disk(self, isolated_cache_dir):
+        """Compiled templates are stored for the next process."""
+        templating.get_environment("packaging").get_template("Dockerfile.j2")
+
+        assert os.listdir(isolated_cache_dir / "templates" / "bytecode")
+
+    def test_override_dir_wins(self, temp_dir):
+        (temp_dir / "Dockerfile.j2").write_text("custom {{ name }}")
+
+        env = templating.get_environment("packaging", [str(temp_dir)])
+
+        assert env.get_template("Dockerfile.j2").render(name="x") == "custom x"
+
+
+class TestPrecompile:
+    """Tests for precompile function."""
+
+    def test_precompiled_set_used_and_renders_identically(self):
+        data = load_manifest("core/tests/fixtures/valid_manifest.yaml")
+        source_env = templating.get_environment("packaging")
+        expected = source_env.get_template("Dockerfile.j2").render(data)
+
+        count = templating.precompile()
+        env = templating.get_environment("packaging")
+
+        assert count == len(os.listdir(settings.TEMPLATES_DIR))
+        assert any(isinstance(loader, ModuleLoader) for loader in loaders_of(env))
+        assert env.get_template("Dockerfile.j2").render(data) == expected
+
+    def test_stale_precompiled_set_ignored(self, temp_dir, monkeypatch):
+        """Editing a template source disables the precompiled set."""
+        (temp_dir / "hello.j2").write_text("v1")
+        monkeypatch.setattr(settings, "TEMPLATES_DIR", str(temp_dir))
+        templating.precompile()
+        (temp_dir / "hello.j2").write_text("v2")
+        templating._environment.cache_clear()
+
+        env = templating.get_environment("packaging")
+
+        assert not any(isinstance(loader, ModuleLoader) for loader in loaders_of(env))
+        assert env.get_template("hello.j2").render() == "v2"
@@ -0,0 +1,186 @@
+"""
+Unit tests for core.engine.watch_daemon module.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import shutil
+import threading
+import time
+
+import pytest
+import requests
+import yaml
+
+from core.config import settings
+from core.engine import fingerprint, watch_daemon, watcher
+from core.engine.watch_daemon import WatchDaemon, WatchServer
+
+REPO = "owner/test_exporter"
+
+
+@pytest.fixture
+def daemon(mock_exporter_dir, monkeypatch):
+    """A daemon over test_exporter, deployed at v1.0.0 with the same inputs."""
+    deployed = {
+        "name": "test_exporter",
+        "version": "1.0.0",
+        "fingerprint": fingerprint.compute(str(mock_exporter_dir / "manifest.yaml")),
+    }
+    monkeypatch.setattr(
+        watch_daemon,
+        "get_remote_entries",
+        lambda url: {"test_exporter": deployed},
+    )
+    daemon = WatchDaemon(str(mock_exporter_dir.parent))
+    daemon.reload_manifests()
+    daemon.refresh_catalog()
+    return daemon
+
+
+def write_manifest(exporter_dir, **changes):
+    path = exporter_dir / "manifest.yaml"
+    data = {**yaml.safe_load(path.read_text()), **changes}
+    path.write_text(yaml.dump(data))
+    # A new mtime even on file systems with a coarse timestamp resolution
+    mtime = os.stat(path).st_mtime_ns + 10**9
+    os.utime(path, ns=(mtime, mtime))
+
+
+def release_event(tag, action="published", prerelease=False):
+    return {
+        "action": action,
+        "release": {"tag_name": tag, "draft": False, "prerelease": prerelease},
+        "repository": {"full_name": REPO},
+    }
+
+
+def test_reload_manifests_only_reads_changes(daemon, mock_exporter_dir):
+    assert daemon.reload_manifests() == []
+
+    write_manifest(mock_exporter_dir, version="v1.1.0")
+    assert daemon.reload_manifests() == ["test_exporter"]
+    assert daemon.manifests["test_exporter"]["version"] == "v1.1.0"
+
+    (mock_exporter_dir / "assets" / "extra.conf").write_text("x")
+    assert daemon.reload_manifests() == ["test_exporter"]
+    assert daemon.reload_manifests() == []
+
+    shutil.rmtree(mock_exporter_dir)
+    assert daemon.reload_manifests() == ["test_exporter"]
+    assert daemon.manifests == {}
+    assert daemon.fingerprints == {}
+
+
+def test_plan_from_memory(daemon, mock_exporter_dir, monkeypatch):
+    assert daemon.plan() == {"build": {}, "updates": []}
+
+    # An asset edit rebuilds every artifact type of the exporter
+    (mock_exporter_dir / "assets" / "extra.conf").write_text("x")
+    daemon.reload_manifests()
+    assert daemon.plan()["build"] == {"test_exporter": ["docker", "rpm"]}
+
+    daemon.record_releases({REPO: "v1.2.0"})
+    assert daemon.plan()["updates"] == [
+        {"name": "test_exporter", "repo": REPO, "current": "v1.0.0", "latest": "v1.2.0"}
+    ]
+
+    # An unreachable catalog keeps the previous snapshot
+    monkeypatch.setattr(watch_daemon, "get_remote_entries", lambda url: {})
+    assert daemon.refresh_catalog() == 1
+
+
+def test_known_tags_survive_a_restart(daemon, mock_exporter_dir):
+    daemon.record_releases({REPO: "v1.2.0"})
+
+    restarted = WatchDaemon(str(mock_exporter_dir.parent))
+
+    assert restarted.latest == {REPO: "v1.2.0"}
+
+
+def test_scan_due(daemon, monkeypatch):
+    monkeypatch.setattr(watch_daemon, "fetch_rate_limit", lambda token=None: {})
+    looked_up = []
+    monkeypatch.setattr(
+        watcher,
+        "get_latest_github_release",
+        lambda repo, token=None: looked_up.append(repo) or "v2.0.0",
+    )
+
+    assert daemon.scan_due() == {REPO: "v2.0.0"}
+    # Checked just now: not due again
+    assert daemon.scan_due() == {}
+    assert looked_up == [REPO]
+    assert daemon.plan()["updates"][0]["latest"] == "v2.0.0"
+
+
+def test_scan_due_retries_failed_lookups(daemon, monkeypatch):
+    monkeypatch.setattr(watch_daemon, "fetch_rate_limit", lambda token=None: {})
+    monkeypatch.setattr(
+        watcher, "get_latest_github_release", lambda repo, token=None: watcher._FAILED
+    )
+
+    assert daemon.scan_due() == {}
+    # Not recorded as checked: still due
+    assert daemon.scan_state.due(daemon.repos()) == [REPO]
+
+
+def test_webhook_and_plan_endpoints(mock_exporter_dir, monkeypatch):
+    monkeypatch.setattr(settings, "WATCH_DAEMON_WEBHOOK_SECRET", "s3cret")
+    monkeypatch.setattr(watch_daemon, "get_remote_entries", lambda url: {})
+    daemon = WatchDaemon(str(mock_exporter_dir.parent))
+    daemon.reload_manifests()
+
+    def post(payload, event="release", secret="s3cret"):
+        body = json.dumps(payload).encode()
+        digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return requests.post(
+            f"{server.url}/webhook",
+            data=body,
+            headers={
+                "X-GitHub-Event": event,
+                "X-Hub-Signature-256": f"sha256={digest}",
+            },
+            timeout=5,
+        )
+
+    with WatchServer(daemon, "127.0.0.1", 0) as server:
+        assert post(release_event("v1.5.0"), secret="wrong").status_code == 401
+        assert post({"zen": "hi"}, event="ping").json() == {"ignored": "ping"}
+        assert post(release_event("v2.0.0-rc.1", prerelease=True)).status_code == 200
+
+        response = post(release_event("v1.5.0"))
+        assert response.status_code == 202
+        assert response.json() == {"repo": REPO, "tag": "v1.5.0"}
+
+        plan = requests.get(f"{server.url}/plan", timeout=5).json()
+        health = requests.get(f"{server.url}/healthz", timeout=5).json()
+        missing = requests.get(f"{server.url}/nope", timeout=5)
+
+    # Not in the (empty) catalog: a new exporter
+    assert plan["build"] == {"test_exporter": ["docker", "rpm"]}
+    assert plan["updates"][0]["latest"] == "v1.5.0"
+    assert health == {"manifests": 1, "catalog_exporters": 0, "upstreams": 1}
+    assert missing.status_code == 404
+
+
+def test_run_until_stopped(daemon, mock_exporter_dir):
+    thread = threading.Thread(
+        target=daemon.run,
+        kwargs={"reload_interval": 0.01, "scan_interval": 0},
+    )
+    thread.start()
+    try:
+        write_manifest(mock_exporter_dir, version="v1.3.0")
+        for _ in range(500):
+            if daemon.manifests["test_exporter"]["version"] == "v1.3.0":
+                break
+            time.sleep(0.01)
+    finally:
+        daemon.stop()
+        thread.join(5)
+
+    assert not thread.is_alive()
+    assert daemon.plan()["build"] == {"test_exporter": ["docker", "rpm"]}
@@ -0,0 +1,313 @@
+"""
+Unit tests for core.engine.watcher module.
+"""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+import yaml
+from click.testing import CliRunner
+
+from core.config import settings
+from core.engine import http_client, watcher
+from core.engine.scan_state import ScanState
+
+
+@pytest.fixture
+def exporters_dir(temp_dir, sample_manifest, monkeypatch):
+    """Three GitHub exporters and a local one."""
+    root = temp_dir / "exporters"
+    for name, repo in (("b_exporter", "owner/b"), ("a_exporter", "owner/a")):
+        (root / name).mkdir(parents=True)
+        manifest = {**sample_manifest, "name": name}
+        manifest["upstream"] = {**sample_manifest["upstream"], "repo": repo}
+        with open(root / name / "manifest.yaml", "w") as f:
+            yaml.dump(manifest, f)
+    (root / "c_exporter").mkdir()
+    manifest = {**sample_manifest, "name": "c_exporter"}
+    manifest["upstream"] = {"type": "local", "local_binary": "bin/c"}
+    with open(root / "c_exporter" / "manifest.yaml", "w") as f:
+        yaml.dump(manifest, f)
+    monkeypatch.setattr(watcher, "EXPORTERS_DIR", str(root))
+    monkeypatch.setattr(settings, "CACHE_DIR", str(temp_dir / "cache"))
+    monkeypatch.setattr(watcher, "fetch_rate_limit", lambda token=None: {})
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    return root
+
+
+def test_fetch_latest_releases_is_concurrent_and_ordered(monkeypatch):
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_release(repo, token=None):
+        with lock:
+            in_flight.append(repo)
+            peak.append(len(in_flight))
+        # Later repos answer first
+        time.sleep(0.05 if repo == "owner/a" else 0.01)
+        with lock:
+            in_flight.remove(repo)
+        return None if repo == "owner/missing" else f"v1.{repo[-1]}"
+
+    monkeypatch.setattr(watcher, "get_latest_github_release", fake_release)
+
+    repos = ["owner/a", "owner/b", "owner/missing", "owner/a", "owner/c"]
+    latest = watcher.fetch_latest_releases(repos, jobs=4)
+
+    assert list(latest.items()) == [
+        ("owner/a", "v1.a"),
+        ("owner/b", "v1.b"),
+        ("owner/missing", None),
+        ("owner/c", "v1.c"),
+    ]
+    assert max(peak) > 1
+
+
+def test_fetch_latest_releases_empty():
+    assert watcher.fetch_latest_releases([]) == {}
+
+
+def test_watch_reports_in_manifest_order(exporters_dir, monkeypatch):
+    monkeypatch.setattr(
+        watcher,
+        "get_latest_github_release",
+        lambda repo, token=None: {"owner/a": "v2.0.0", "owner/b": "v1.0.0"}[repo],
+    )
+
+    result = CliRunner().invoke(watcher.watch, [])
+
+    assert result.exit_code == 0, result.output
+    lines = result.output.splitlines()
+    assert lines[:4] == [
+        "Checking a_exporter (v1.0.0) against owner/a...",
+        "  -> New version available: v2.0.0 (Current: v1.0.0)",
+        "Checking b_exporter (v1.0.0) against owner/b...",
+        "  -> Up to date.",
+    ]
+    assert "Updates available. Run with --update to apply." in result.output
+    manifest = yaml.safe_load(
+        (exporters_dir / "a_exporter" / "manifest.yaml").read_text()
+    )
+    assert manifest["version"] == "v1.0.0"
+
+
+def test_watch_update_applies_in_one_batch(exporters_dir, temp_dir, monkeypatch):
+    github_output = temp_dir / "github_output"
+    monkeypatch.setenv("GITHUB_OUTPUT", str(github_output))
+    monkeypatch.setattr(
+        watcher, "get_latest_github_release", lambda repo, token=None: "v3.0.0"
+    )
+    saved = []
+    save_manifest = watcher.save_manifest
+
+    def recording_save(path, data):
+        saved.append(path)
+        save_manifest(path, data)
+
+    monkeypatch.setattr(watcher, "save_manifest", recording_save)
+
+    result = CliRunner().invoke(watcher.watch, ["--update", "--jobs", "2"])
+
+    assert result.exit_code == 0, result.output
+    # Every lookup is reported before the first manifest is written
+    assert result.output.index("Checking b_exporter") < result.output.index("Updating")
+    assert [p.split("/")[-2] for p in saved] == ["a_exporter", "b_exporter"]
+    for name in ("a_exporter", "b_exporter"):
+        manifest = yaml.safe_load((exporters_dir / name / "manifest.yaml").read_text())
+        assert manifest["version"] == "v3.0.0"
+    assert github_output.read_text() == "updated_names=a_exporter, b_exporter\n"
+
+
+def graphql_response(data):
+    response = Mock(status_code=200)
+    response.json.return_value = {"data": data}
+    return response
+
+
+@patch("core.engine.watcher.http_client.post")
+def test_get_latest_github_releases_graphql(mock_post):
+    mock_post.return_value = graphql_response(
+        {
+            "r0": {"latestRelease": {"tagName": "v1.8.2"}},
+            "r1": {"latestRelease": None},
+            "r2": None,
+        }
+    )
+
+    tags = watcher.get_latest_github_releases(
+        ["prometheus/node_exporter", "owner/no-release", "owner/unknown"], "token"
+    )
+
+    # Unknown repositories are left to the REST fallback
+    assert tags == {"prometheus/node_exporter": "v1.8.2", "owner/no-release": None}
+    body = mock_post.call_args.kwargs["json"]
+    assert body["variables"]["o0"] == "prometheus"
+    assert body["variables"]["n0"] == "node_exporter"
+    assert "r2: repository(owner: $o2, name: $n2)" in body["query"]
+    assert mock_post.call_args.kwargs["headers"]["Authorization"] == "bearer token"
+
+
+@patch("core.engine.watcher.http_client.post")
+def test_fetch_latest_releases_batches_and_falls_back(mock_post, monkeypatch):
+    def answer(url, json, **kwargs):
+        repos = [json["variables"][f"n{i}"] for i in range(len(json["variables"]) // 2)]
+        if "r4" in repos:
+            raise requests.exceptions.ConnectionError("boom")
+        return graphql_response(
+            {
+                f"r{i}": {"latestRelease": {"tagName": f"v-{r}"}}
+                for i, r in enumerate(repos)
+            }
+        )
+
+    mock_post.side_effect = answer
+    rest_calls = []
+    monkeypatch.setattr(
+        watcher,
+        "get_latest_github_release",
+        lambda repo, token=None: rest_calls.append(repo) or "v-rest",
+    )
+
+    repos = [f"owner/r{i}" for i in range(6)]
+    latest = watcher.fetch_latest_releases(repos, "token", jobs=2, batch_size=2)
+
+    assert mock_post.call_count == 3
+    assert list(latest) == repos
+    assert latest["owner/r0"] == "v-r0"
+    assert latest["owner/r3"] == "v-r3"
+    # The chunk whose query failed is looked up over REST
+    assert sorted(rest_calls) == ["owner/r4", "owner/r5"]
+    assert latest["owner/r5"] == "v-rest"
+
+
+def test_fetch_latest_releases_without_token_uses_rest(monkeypatch):
+    monkeypatch.setattr(
+        watcher, "get_latest_github_release", lambda repo, token=None: "v1.0.0"
+    )
+
+    with patch("core.engine.watcher.http_client.post") as mock_post:
+        latest = watcher.fetch_latest_releases(["owner/a", "owner/b"])
+
+    mock_post.assert_not_called()
+    assert latest == {"owner/a": "v1.0.0", "owner/b": "v1.0.0"}
+
+
+def test_get_latest_github_release_revalidates(temp_dir, monkeypatch):
+    """An unchanged release (304) is answered from the cached body."""
+    monkeypatch.setattr(settings, "CACHE_DIR", str(temp_dir))
+    fresh = requests.Response()
+    fresh.status_code = 200
+    fresh._content = b'{"tag_name": "v1.8.2"}'
+    fresh.headers["ETag"] = '"abc"'
+    not_modified = requests.Response()
+    not_modified.status_code = 304
+    session = Mock()
+    session.get.side_effect = [fresh, not_modified]
+
+    with patch.object(http_client, "session_for", return_value=session):
+        assert watcher.get_latest_github_release("owner/repo", "token") == "v1.8.2"
+        assert watcher.get_latest_github_release("owner/repo", "token") == "v1.8.2"
+
+    second_headers = session.get.call_args_list[1].kwargs["headers"]
+    assert second_headers["If-None-Match"] == '"abc"'
+    assert second_headers["Authorization"] == "token token"
+
+
+def test_watch_stops_within_rate_limit_and_resumes(exporters_dir, monkeypatch):
+    """The stalest upstreams go first; the rest waits for the next run."""
+    reset = int(time.time()) + 3600
+    monkeypatch.setattr(
+        watcher,
+        "fetch_rate_limit",
+        lambda token=None: {"core": {"remaining": 11, "reset": reset}},
+    )
+    looked_up = []
+    monkeypatch.setattr(
+        watcher,
+        "get_latest_github_release",
+        lambda repo, token=None: looked_up.append(repo) or "v1.0.0",
+    )
+    ScanState().update({"owner/a": "v1.0.0"}, now=100)
+
+    result = CliRunner().invoke(watcher.watch, [])
+
+    assert result.exit_code == 0, result.output
+    # One call above the reserve (10): only b, never checked, is looked up
+    assert looked_up == ["owner/b"]
+    assert (
+        "  -> Skipped: lookup failed or GitHub API rate limit reached." in result.output
+    )
+    assert "1 upstream(s) not checked (failed lookup or rate limit)" in result.output
+    assert "Rate limit: 1 core call(s), 10 left until" in result.output
+
+    # Next run, a is the stalest
+    looked_up.clear()
+    CliRunner().invoke(watcher.watch, [])
+    assert looked_up == ["owner/a"]
+
+
+def test_watch_due_only_skips_upstreams_not_due(exporters_dir, monkeypatch):
+    looked_up = []
+    monkeypatch.setattr(
+        watcher,
+        "get_latest_github_release",
+        lambda repo, token=None: looked_up.append(repo) or "v1.0.0",
+    )
+    ScanState().update({"owner/a": "v1.0.0"}, now=time.time())
+
+    result = CliRunner().invoke(watcher.watch, ["--due-only"])
+
+    assert result.exit_code == 0, result.output
+    assert looked_up == ["owner/b"]
+    assert "Checking a_exporter" not in result.output
+    assert "Checking b_exporter (v1.0.0) against owner/b..." in result.output
+    assert "1 upstream(s) not due yet, next check at" in result.output
+
+    # Without --due-only every upstream is checked
+    looked_up.clear()
+    CliRunner().invoke(watcher.watch, [])
+    assert sorted(looked_up) == ["owner/a", "owner/b"]
+
+
+def test_watch_records_upstreams_without_release(exporters_dir, monkeypatch):
+    """An upstream without a release is not due again on the next run."""
+    looked_up = []
+    monkeypatch.setattr(
+        watcher,
+        "get_latest_github_release",
+        lambda repo, token=None: looked_up.append(repo) or None,
+    )
+    ScanState().update({"owner/a": "v1.0.0"}, now=100)
+
+    CliRunner().invoke(watcher.watch, ["--due-only"])
+    CliRunner().invoke(watcher.watch, ["--due-only"])
+
+    assert sorted(looked_up) == ["owner/a", "owner/b"]
+    assert ScanState().entries()["owner/a"]["tag"] == "v1.0.0"
+    assert ScanState().entries()["owner/b"]["tag"] is None
+
+
+def test_watch_leaves_failed_lookups_unrecorded(exporters_dir):
+    """A failed lookup stays due; a repository without a release (404) does not."""
+
+    def get(url, **kwargs):
+        response = requests.Response()
+        response.status_code = 404 if "/owner/a/" in url else 503
+        response.url = url
+        return response
+
+    session = Mock()
+    session.get.side_effect = get
+    with patch.object(http_client, "session_for", return_value=session):
+        result = CliRunner().invoke(watcher.watch, ["--due-only"])
+
+    assert result.exit_code == 0, result.output
+    assert "1 upstream(s) not checked (failed lookup or rate limit)" in result.output
+    state = ScanState()
+    assert state.entries()["owner/a"]["tag"] is None
+    assert "owner/b" not in state.entries()
+    assert state.due(["owner/a", "owner/b"]) == ["owner/b"]
@@ -4,7 +4,16 @@ Tests for site_generator_v2.py.
 Tests portal generation with V3 catalog structure.
 """
 
-from core.engine.site_generator_v2 import convert_metadata_to_legacy_format
+import json
+from datetime import datetime, timezone
+
+import yaml
+
+from core.engine.site_generator_v2 import (
+    built_artifact_types,
+    convert_metadata_to_legacy_format,
+    published_fingerprint,
+)
 
 
 class TestConvertMetadataToLegacyFormat:
@@ -176,3 +185,85 @@ class TestConvertMetadataToLegacyFormat:
         assert result["rpm_status"] == "failed"
         assert result["deb_status"] == "pending"
         assert result["docker_status"] == "success"
+
+
+class TestPublishedFingerprint:
+    """Only artifact types built by this run get a new fingerprint."""
+
+    MANIFEST = {
+        "name": "exp",
+        "description": "Test exporter",
+        "version": "v1.0.0",
+        "upstream": {"type": "github", "repo": "owner/exp"},
+        "build": {"method": "binary_repack", "binary_name": "exp", "archs": ["amd64"]},
+        "artifacts": {
+            "rpm": {"enabled": True, "targets": ["el8", "el9"]},
+            "docker": {"enabled": True},
+        },
+    }
+
+    def write_catalog(self, tmp_path, statuses, build_dates=None):
+        exporters_dir = tmp_path / "exporters"
+        (exporters_dir / "exp").mkdir(parents=True)
+        (exporters_dir / "exp" / "manifest.yaml").write_text(yaml.dump(self.MANIFEST))
+        catalog_dir = tmp_path / "catalog" / "exp"
+        catalog_dir.mkdir(parents=True)
+        for filename, status in statuses.items():
+            metadata = {"status": status}
+            if build_dates and filename in build_dates:
+                metadata["build_date"] = build_dates[filename]
+            (catalog_dir / filename).write_text(json.dumps(metadata))
+        return str(tmp_path / "catalog"), str(exporters_dir)
+
+    def test_built_types_need_every_unit(self, tmp_path):
+        catalog_dir, exporters_dir = self.write_catalog(
+            tmp_path / "partial",
+            {"rpm_amd64_el9.json": "success", "docker.json": "success"},
+        )
+
+        # el8 left no metadata: its build failed
+        assert built_artifact_types("exp", catalog_dir, exporters_dir) == {"docker"}
+
+        catalog_dir, exporters_dir = self.write_catalog(
+            tmp_path / "docker_failed",
+            {
+                "rpm_amd64_el8.json": "success",
+                "rpm_amd64_el9.json": "success",
+                "docker.json": "failed",
+            },
+        )
+
+        assert built_artifact_types("exp", catalog_dir, exporters_dir) == {"rpm"}
+
+    def test_earlier_builds_do_not_count(self, tmp_path):
+        """In the accumulated gh-pages catalog, only this run's metadata counts."""
+        catalog_dir, exporters_dir = self.write_catalog(
+            tmp_path,
+            {
+                "rpm_amd64_el8.json": "success",
+                "rpm_amd64_el9.json": "success",
+                "docker.json": "success",
+            },
+            build_dates={
+                # el8 failed in this run: its metadata is from the last release
+                "rpm_amd64_el8.json": "2026-01-01T10:00:00+00:00",
+                "rpm_amd64_el9.json": "2026-02-01T10:05:00.123456+00:00",
+                "docker.json": "2026-02-01T10:07:00+00:00",
+            },
+        )
+        built_since = datetime(2026, 2, 1, 10, tzinfo=timezone.utc)
+
+        built = built_artifact_types("exp", catalog_dir, exporters_dir, built_since)
+
+        assert built == {"docker"}
+
+    def test_failed_types_keep_previous_fingerprint(self):
+        local = {"rpm": "r2", "deb": "d2", "docker": "k2"}
+        previous = {"rpm": "r1", "docker": "k1"}
+
+        result = published_fingerprint(local, previous, {"docker"})
+
+        assert result == {"rpm": "r1", "docker": "k2"}
+        # Nothing known: the catalog entry stays without a fingerprint
+        assert published_fingerprint(local, None, set()) is None
+        assert published_fingerprint(local, {}, {"rpm"}) == {"rpm": "r2"}